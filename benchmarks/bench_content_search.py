@@ -0,0 +1,91 @@
+"""Measure content search throughput on a large synthetic tree.
+
+Usage:
+    python benchmarks/bench_content_search.py [--size-mb M] [--processes P]
+
+A tree of about M megabytes (1 GB by default) is written to a temporary
+directory: mostly small and medium text files, a few files large enough to
+be mapped and searched in chunks, and some binary files that must be
+skipped. Each pattern is searched once with everything on one thread and
+once with the worker pool, so the page cache is warm for both.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "wodabrowser"))
+
+from content_search import ContentSearchJob, compile_pattern, SEARCH_PROCESSES  # noqa: E402
+
+WORDS = ["report", "invoice", "photo", "holiday", "backup", "notes", "draft", "final",
+         "project", "budget", "scan", "video", "song", "thesis", "config", "readme"]
+# (pattern, regex) pairs: common word, rare word, no match, regex
+PATTERNS = [("budget", False), ("needle_7781", False), ("nothing-matches-this", False), (r"thesis \w+ final", True)]
+MAX_RESULTS = 50000
+
+
+def text_block(rng, size):
+    lines = []
+    length = 0
+    while length < size:
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 14)))
+        if rng.random() < 0.0001:
+            line += " needle_7781"
+        lines.append(line)
+        length += len(line) + 1
+    return ("\n".join(lines) + "\n").encode()
+
+
+def populate(root, total_bytes):
+    rng = random.Random(0)
+    # Files reuse a few blocks so generating a gigabyte stays fast
+    blocks = [text_block(rng, 256 * 1024) for _ in range(8)]
+    written = files = 0
+    while written < total_bytes:
+        directory = os.path.join(root, f"dir_{files // 200:04d}")
+        os.makedirs(directory, exist_ok=True)
+        kind = rng.random()
+        if kind < 0.002:
+            size, suffix = 64 * 1024 * 1024, ".log"
+        elif kind < 0.05:
+            size, suffix = 256 * 1024, ".bin"
+        else:
+            size, suffix = rng.choice([2, 16, 64, 512]) * 1024, ".txt"
+        with open(os.path.join(directory, f"file_{files}{suffix}"), "wb") as f:
+            if suffix == ".bin":
+                f.write(b"\0" + os.urandom(size - 1))
+            remaining = size if suffix != ".bin" else 0
+            while remaining > 0:
+                block = rng.choice(blocks)[:remaining]
+                f.write(block)
+                remaining -= len(block)
+        written += size
+        files += 1
+    return files, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--processes", type=int, default=SEARCH_PROCESSES)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        files, written = populate(root, args.size_mb * 1024 * 1024)
+        print(f"wrote {files} files, {written / 2 ** 20:.0f} MB in {time.perf_counter() - start:.1f} s")
+        for pattern, regex in PATTERNS:
+            for processes in (0, args.processes):
+                job = ContentSearchJob(root, root, compile_pattern(pattern, regex), MAX_RESULTS, processes=processes)
+                start = time.perf_counter()
+                summary = job.run()
+                elapsed = time.perf_counter() - start
+                print(f"{pattern!r:<24} processes={processes:<2} {summary['count']:>8} matches  "
+                      f"{elapsed:7.2f} s  {summary['bytes'] / 2 ** 20 / elapsed:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Measure filename search latency of the file index on a large synthetic tree.
+
+Usage:
+    python benchmarks/bench_file_index.py [--entries N] [--limit L]
+
+Rows are inserted straight into the index database instead of being crawled
+from disk, so a million-entry home tree can be simulated in seconds. Each
+query is timed end to end through ``FileIndex.search``.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "wodabrowser"))
+
+from file_index import FileIndex  # noqa: E402
+
+WORDS = ["report", "invoice", "photo", "holiday", "backup", "notes", "draft", "final",
+         "project", "budget", "scan", "video", "song", "thesis", "config", "readme"]
+EXTENSIONS = [".txt", ".pdf", ".jpg", ".png", ".mp3", ".md", ".py", ".json"]
+QUERIES = ["rep", "invoice 2019", "holiday jpg", "zz", "thesis_final", "nothing-matches-this"]
+
+
+def populate(index, count):
+    rng = random.Random(0)
+    rows = []
+    for i in range(count):
+        parent = f"dir_{i // 1000:04d}"
+        name = f"{rng.choice(WORDS)}_{rng.choice(WORDS)}_{2000 + i % 25}{rng.choice(EXTENSIONS)}"
+        rows.append((f"{parent}/{name}_{i}", parent, f"{name}_{i}", 0, i, i))
+    with index._lock:
+        index._db.executemany(
+            "INSERT INTO files(path, parent, name, is_dir, size, mtime) VALUES (?, ?, ?, ?, ?, ?)", rows)
+        index._db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        index = FileIndex(os.path.join(root, "index.sqlite"), root)
+        start = time.perf_counter()
+        populate(index, args.entries)
+        print(f"indexed {index.count()} entries in {time.perf_counter() - start:.1f} s (trigram: {index.has_fts})")
+        for query in QUERIES:
+            start = time.perf_counter()
+            results = index.search(query, args.limit)
+            print(f"{query!r:<24} {len(results):>5} results  {(time.perf_counter() - start) * 1000:8.2f} ms")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
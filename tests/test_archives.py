@@ -0,0 +1,99 @@
+import pytest
+import os
+import tarfile
+import zipfile
+from wodabrowser.archives import ArchiveIndex, ArchiveIndexes, ArchiveListingCursor, split_archive_path
+from wodabrowser.cache import LRUCache
+from wodabrowser.directory_listing import list_columns
+
+MEMBERS = {"docs/readme.txt": b"hello archive\n", "docs/sub/data.bin": bytes(range(256)) * 64, "top.txt": b"top"}
+
+@pytest.fixture
+def zip_path(tmp_path):
+    path = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in MEMBERS.items():
+            archive.writestr(name, data)
+    return str(path)
+
+@pytest.fixture(params=["w", "w:gz", "w:xz"])
+def tar_path(tmp_path, request):
+    path = tmp_path / "bundle.tar"
+    source = tmp_path / "source"
+    for name, data in MEMBERS.items():
+        (source / name).parent.mkdir(parents=True, exist_ok=True)
+        (source / name).write_bytes(data)
+    with tarfile.open(path, request.param) as archive:
+        for name in MEMBERS:
+            archive.add(source / name, arcname=name)
+    return str(path)
+
+def test_split_archive_path(zip_path, tmp_path):
+    """Test that only paths leading into an archive are split."""
+    assert split_archive_path(zip_path) == (zip_path, "")
+    assert split_archive_path(os.path.join(zip_path, "docs", "readme.txt")) == (zip_path, "docs/readme.txt")
+    assert split_archive_path(str(tmp_path)) is None
+    assert split_archive_path(str(tmp_path / "missing" / "file")) is None
+
+def test_zip_index_lists_implicit_directories(zip_path):
+    """Test listing directories that only appear in member names."""
+    index = ArchiveIndex(zip_path)
+    root = index.list("", "bundle.zip")
+    assert sorted((e["name"], e["is_dir"]) for e in root) == [("docs", True), ("top.txt", False)]
+    assert {e["path"] for e in index.list("docs", os.path.join("bundle.zip", "docs"))} == {
+        os.path.join("bundle.zip", "docs", "readme.txt"), os.path.join("bundle.zip", "docs", "sub")}
+    assert all(e["archive"] for e in root)
+    with pytest.raises(NotADirectoryError):
+        index.list("top.txt", "x")
+    with pytest.raises(FileNotFoundError):
+        index.member("docs/missing.txt")
+
+def test_tar_members_read_by_offset(tar_path):
+    """Test ranged reads of members of plain tars, which compressed tars refuse."""
+    index = ArchiveIndex(tar_path)
+    assert index.member("docs/sub/data.bin")["size"] == len(MEMBERS["docs/sub/data.bin"])
+    if index.seekable:
+        result = index.read_range("docs/readme.txt", 6, 100, "utf-8")
+        assert result["data"] == "archive\n" and result["eof"] and result["size"] == 14
+    else:
+        with pytest.raises(ValueError):
+            index.read_range("docs/readme.txt", 6, 100, "utf-8")
+    with index.open("docs/sub/data.bin") as f:
+        f.seek(1000)
+        assert f.read(10) == MEMBERS["docs/sub/data.bin"][1000:1010]
+
+def test_scandir_lists_like_os_scandir(zip_path):
+    """Test that archive directories can be listed by the directory_listing functions."""
+    index = ArchiveIndex(zip_path)
+    listing = list_columns(os.path.join(zip_path, "docs"), os.path.dirname(zip_path), ["name", "is_dir", "size"],
+                           scandir=index.scandir)
+    assert listing["columns"]["name"] == ["sub", "readme.txt"] and listing["columns"]["size"] == [0, 14]
+    with pytest.raises(NotADirectoryError):
+        index.scandir(os.path.join(zip_path, "top.txt"))
+    with pytest.raises(FileNotFoundError):
+        index.scandir(os.path.join(zip_path, "missing"))
+
+def test_extract_member(zip_path, tmp_path):
+    """Test streaming one member out of the archive."""
+    destination = tmp_path / "out.bin"
+    ArchiveIndex(zip_path).extract("docs/sub/data.bin", str(destination))
+    assert destination.read_bytes() == MEMBERS["docs/sub/data.bin"]
+
+def test_indexes_are_cached_by_mtime(zip_path):
+    """Test that an index is reused until the archive changes."""
+    indexes = ArchiveIndexes(LRUCache(4, 1024 * 1024))
+    first = indexes.get(zip_path)
+    assert indexes.get(zip_path) is first
+    with zipfile.ZipFile(zip_path, "a") as archive:
+        archive.writestr("new.txt", b"new")
+    os.utime(zip_path, ns=(0, 1))
+    assert indexes.peek(zip_path) is None
+    assert indexes.get(zip_path).member("new.txt")["size"] == 3
+    assert indexes.peek(zip_path) is not None
+
+def test_archive_listing_cursor():
+    """Test paging through archive entries."""
+    cursor = ArchiveListingCursor([{"name": str(i)} for i in range(5)], "/x.zip", 2)
+    pages = [cursor.next_page() for _ in range(3)]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert cursor.done and cursor.snapshot is None
@@ -0,0 +1,66 @@
+import pytest
+import os
+from wodabrowser.batch_operations import run_batch
+
+def resolver(root):
+    return lambda path: os.path.join(str(root), path)
+
+def test_batch_continues_past_failures(tmp_path):
+    """Test that a non-transactional batch reports each operation separately."""
+    ops = [
+        {"op": "createFile", "path": "new/a.txt", "content": "a"},
+        {"op": "deleteFile", "path": "missing.txt"},
+        {"op": "createDirectory", "path": "d/e"},
+    ]
+    result = run_batch(ops, resolver(tmp_path))
+    assert result["results"][0] is None and result["results"][1] and result["results"][2] is None
+    assert result["failed"] == 1 and not result["rolled_back"]
+    assert (tmp_path / "new" / "a.txt").read_text() == "a"
+    assert (tmp_path / "d" / "e").is_dir()
+
+def test_transactional_batch_rolls_back(tmp_path):
+    """Test that a failing transactional batch restores the tree it started from."""
+    (tmp_path / "keep.txt").write_text("original")
+    (tmp_path / "gone.txt").write_text("still here")
+    ops = [
+        {"op": "changeFileContent", "path": "keep.txt", "content": "first"},
+        {"op": "changeFileContent", "path": "keep.txt", "content": "second"},
+        {"op": "deleteFile", "path": "gone.txt"},
+        {"op": "createFile", "path": "sub/new.txt", "content": "x"},
+        {"op": "deleteDirectory", "path": "missing"},
+        {"op": "createFile", "path": "never.txt"},
+    ]
+    result = run_batch(ops, resolver(tmp_path), transactional=True)
+    assert result["rolled_back"] and result["results"][5] == "Skipped after an earlier failure"
+    assert (tmp_path / "keep.txt").read_text() == "original"
+    assert (tmp_path / "gone.txt").read_text() == "still here"
+    assert sorted(os.listdir(tmp_path)) == ["gone.txt", "keep.txt"]
+
+def test_transactional_batch_commits(tmp_path):
+    """Test that a successful transactional batch leaves no backups behind."""
+    (tmp_path / "old.txt").write_text("x")
+    ops = [{"op": "deleteFile", "path": "old.txt"}, {"op": "createFile", "path": "new.txt", "content": "y"}]
+    result = run_batch(ops, resolver(tmp_path), transactional=True)
+    assert result["results"] == [None, None]
+    assert os.listdir(tmp_path) == ["new.txt"]
+
+def test_transactional_overwrite_keeps_file_identity(tmp_path):
+    """Test that overwriting in a transactional batch keeps the file's mode and hard links."""
+    script = tmp_path / "run.sh"
+    script.write_text("#!/bin/sh\n")
+    os.chmod(script, 0o755)
+    os.link(script, tmp_path / "alias.sh")
+    inode = os.stat(script).st_ino
+    result = run_batch([{"op": "changeFileContent", "path": "run.sh", "content": "echo hi\n"}],
+                       resolver(tmp_path), transactional=True)
+    assert result["failed"] == 0
+    assert os.stat(script).st_mode & 0o777 == 0o755
+    assert os.stat(script).st_ino == inode
+    assert (tmp_path / "alias.sh").read_text() == "echo hi\n"
+
+    result = run_batch([{"op": "changeFileContent", "path": "run.sh", "content": "rm -rf\n"},
+                        {"op": "deleteFile", "path": "missing.sh"}], resolver(tmp_path), transactional=True)
+    assert result["rolled_back"]
+    assert (tmp_path / "alias.sh").read_text() == "echo hi\n"
+    assert os.stat(script).st_mode & 0o777 == 0o755 and os.stat(script).st_ino == inode
+    assert sorted(os.listdir(tmp_path)) == ["alias.sh", "run.sh"]
@@ -0,0 +1,41 @@
+import pytest
+from wodabrowser.cache import LRUCache, DirectoryCache
+
+def test_lru_evicts_by_entry_count():
+    """Test that the least recently used entry is evicted first."""
+    cache = LRUCache(max_entries=2, max_bytes=1000)
+    cache.put("a", 1, 1)
+    cache.put("b", 2, 1)
+    cache.get("a")
+    cache.put("c", 3, 1)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_lru_evicts_by_bytes():
+    """Test that the byte budget is enforced."""
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.put("a", "x", 6)
+    cache.put("b", "y", 6)
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 6
+    cache.put("huge", "z", 11)
+    assert cache.get("huge") is None
+
+def test_lru_tag_mismatch_is_miss():
+    """Test that a changed validator tag invalidates the entry."""
+    cache = LRUCache(max_entries=10, max_bytes=100)
+    cache.put("a", "v", 1, tag=1)
+    assert cache.get("a", tag=1) == "v"
+    assert cache.get("a", tag=2) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 1, 1)
+
+def test_directory_cache_invalidated_by_mtime(tmp_path):
+    """Test that a directory change invalidates its cached listing."""
+    cache = DirectoryCache()
+    mtime = (tmp_path.stat()).st_mtime_ns
+    cache.put(str(tmp_path), "[]", mtime)
+    assert cache.get(str(tmp_path)) == "[]"
+    cache.put(str(tmp_path), "[]", mtime - 1)
+    assert cache.get(str(tmp_path)) is None
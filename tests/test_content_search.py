@@ -0,0 +1,90 @@
+import pytest
+import os
+import subprocess
+import sys
+from wodabrowser import content_search
+from wodabrowser.content_search import ContentSearchJob, compile_pattern, search_file
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("import os\n# TODO: tidy\nprint('todo list')\n")
+    (tmp_path / "src" / "notes.md").write_text("nothing here\n")
+    (tmp_path / "image.bin").write_bytes(b"\x89PNG\0TODO")
+    (tmp_path / ".hidden").mkdir()
+    (tmp_path / ".hidden" / "secret.txt").write_text("TODO hidden\n")
+    return tmp_path
+
+def test_compile_pattern_options():
+    """Test literal, case-sensitive, whole-word and regex patterns."""
+    assert compile_pattern("a.b").search(b"a.b") and not compile_pattern("a.b").search(b"axb")
+    assert compile_pattern("a.b", regex=True).search(b"axb")
+    assert not compile_pattern("Todo", case_sensitive=True).search(b"TODO")
+    assert not compile_pattern("do", whole_word=True).search(b"todo")
+    with pytest.raises(ValueError):
+        compile_pattern("")
+
+def test_search_file_positions(tmp_path):
+    """Test line and character column numbers of matches."""
+    test_file = tmp_path / "text.txt"
+    test_file.write_text("first\nnaïve café\n", encoding="utf-8")
+    matches = search_file(str(test_file), "text.txt", compile_pattern("café"), 10)
+    assert matches == [{"path": "text.txt", "line": 2, "column": 7, "length": 4, "text": "naïve café"}]
+
+def test_search_match_across_lines(tmp_path):
+    """Test that a match spanning lines is reported at the line it starts on."""
+    test_file = tmp_path / "text.txt"
+    test_file.write_text("one\ntwo end\nnext three\n", encoding="utf-8")
+    matches = search_file(str(test_file), "text.txt", compile_pattern(r"end\s+next", regex=True), 10)
+    assert matches == [{"path": "text.txt", "line": 2, "column": 5, "length": 8, "text": "two end"}]
+
+def test_search_large_file_in_chunks(tmp_path, monkeypatch):
+    """Test that mapped files are searched chunk by chunk with correct line numbers."""
+    monkeypatch.setattr(content_search, "SEARCH_MMAP_THRESHOLD", 100)
+    monkeypatch.setattr(content_search, "SEARCH_CHUNK_BYTES", 64)
+    test_file = tmp_path / "big.log"
+    test_file.write_text("".join(f"line {i}{' needle' if i % 25 == 0 else ''}\n" for i in range(1, 101)))
+    matches = search_file(str(test_file), "big.log", compile_pattern("needle"), 100)
+    assert [m["line"] for m in matches] == [25, 50, 75, 100]
+
+def test_search_job_inline(tree):
+    """Test a search that skips binary and hidden files."""
+    batches = []
+    job = ContentSearchJob(str(tree), str(tree), compile_pattern("todo"), 100, processes=0, batch_callback=batches.append)
+    summary = job.run()
+    matches = [m for batch in batches for m in batch]
+    assert [(m["path"], m["line"]) for m in matches] == [(os.path.join("src", "main.py"), 2), (os.path.join("src", "main.py"), 3)]
+    assert summary["count"] == 2 and summary["binary"] == 1 and summary["files"] == 3
+    assert not summary["truncated"] and not summary["cancelled"]
+
+def test_search_job_options_and_cap(tree):
+    """Test the file name filter, hidden files and the result cap."""
+    batches = []
+    job = ContentSearchJob(str(tree), str(tree), compile_pattern("TODO", case_sensitive=True), 1,
+                           glob="*.txt", include_hidden=True, processes=0, batch_callback=batches.append)
+    summary = job.run()
+    assert [m["path"] for batch in batches for m in batch] == [os.path.join(".hidden", "secret.txt")]
+    assert summary["truncated"]
+
+def test_search_job_processes(tree):
+    """Test that worker processes find the same matches."""
+    batches = []
+    job = ContentSearchJob(str(tree), str(tree), compile_pattern("todo"), 100, processes=2, batch_callback=batches.append)
+    assert job.run()["count"] == 2
+    assert sorted(m["line"] for batch in batches for m in batch) == [2, 3]
+
+def test_search_job_cancel(tree):
+    """Test that a cancelled search stops before searching."""
+    job = ContentSearchJob(str(tree), str(tree), compile_pattern("todo"), 100, processes=0)
+    job.cancel()
+    summary = job.run()
+    assert summary["cancelled"] and summary["count"] == 0
+
+def test_import_leaves_multiprocessing_alone():
+    """Test that importing the module neither loads the browser nor changes the fork server's preload."""
+    code = ("import sys, multiprocessing.forkserver as forkserver, wodabrowser.content_search; "
+            "print('wodabrowser.browser' in sys.modules, forkserver._forkserver._preload_modules)")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True).stdout
+    assert output.split(None, 1)[0] == "False"
+    assert "content_search" not in output
@@ -0,0 +1,80 @@
+import pytest
+import json
+from PyQt6.QtCore import QJsonDocument
+from PyQt6.QtWebChannel import QWebChannel, QWebChannelAbstractTransport
+from wodabrowser.data_push import DataPushChannel
+
+class RecordingTransport(QWebChannelAbstractTransport):
+    """Transport that keeps the messages the channel sends to the page."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def sendMessage(self, message):
+        self.messages.append(json.loads(bytes(QJsonDocument(message).toJson()).decode()))
+
+def test_push_reaches_page_as_json_values(qapp):
+    """Test that payloads with quotes and backticks arrive as plain values."""
+    data_push = DataPushChannel()
+    channel = QWebChannel()
+    channel.registerObject('dataPush', data_push)
+    transport = RecordingTransport()
+    channel.connectTo(transport)
+    transport.messageReceived.emit({'type': 3, 'id': 1}, transport)  # Init, as qwebchannel.js sends it
+    signals = dict((name, index) for name, index in transport.messages[-1]['data']['dataPush']['signals'])
+    transport.messageReceived.emit({'type': 7, 'object': 'dataPush', 'signal': signals['dataPushed']}, transport)
+
+    payload = {'path': "it's `here`", 'entries': [{'name': "</script>", 'is_dir': False}]}
+    data_push.push('directoryContents', payload)
+    qapp.processEvents()
+    assert transport.messages[-1]['args'] == ['directoryContents', payload]
+
+def test_handler_pushes_directory_contents(qapp, tmp_path):
+    """Test that requestDirectoryContents pushes the listing with its version."""
+    from wodabrowser.file_system_handler import FileSystemHandler
+    handler = FileSystemHandler()
+    handler.base_path = str(tmp_path)
+    (tmp_path / "a'b.txt").write_text("x")
+    pushed = []
+    handler.data_push.dataPushed.connect(lambda topic, payload: pushed.append((topic, payload)))
+    handler.requestDirectoryContents("", "page-1")
+    assert pushed[0][0] == 'directoryContents'
+    assert pushed[0][1]['requestId'] == "page-1"
+    assert [e['name'] for e in pushed[0][1]['entries']] == ["a'b.txt"]
+    assert pushed[0][1]['version']
+
+def test_read_file_push_carries_request_id(qapp, tmp_path):
+    """Test that file contents are pushed with the id of the request that asked for them."""
+    from wodabrowser.file_system_handler import FileSystemHandler
+    handler = FileSystemHandler()
+    (tmp_path / "note.txt").write_text("hello")
+    pushed = []
+    handler.data_push.dataPushed.connect(lambda topic, payload: pushed.append((topic, payload)))
+    handler.readFile(str(tmp_path / "note.txt"), "read-7")
+    assert pushed == [('fileRead', {'requestId': "read-7", 'path': str(tmp_path / "note.txt"), 'content': "hello"})]
+
+def test_read_file_error_is_pushed(qapp, tmp_path):
+    """Test that a failed read is pushed to the requester so its promise can reject."""
+    from wodabrowser.file_system_handler import FileSystemHandler
+    handler = FileSystemHandler()
+    pushed = []
+    handler.data_push.dataPushed.connect(lambda topic, payload: pushed.append((topic, payload)))
+    handler.readFile(str(tmp_path / "missing.txt"), "read-8")
+    assert pushed[0][0] == 'fileRead'
+    assert pushed[0][1]['requestId'] == "read-8" and pushed[0][1]['error'] and 'content' not in pushed[0][1]
+
+def test_slots_keep_signatures_without_request_id(qapp, tmp_path):
+    """Test that pages calling the slots without a request id still reach them."""
+    from PyQt6.QtCore import QMetaObject, Q_ARG
+    from wodabrowser.file_system_handler import FileSystemHandler
+    handler = FileSystemHandler()
+    meta = handler.metaObject()
+    signatures = {meta.method(i).methodSignature().data().decode() for i in range(meta.methodCount())}
+    assert {"readFile(QString)", "readFile(QString,QString)", "requestDirectoryContents(QString)",
+            "openFile(QString)", "saveDroppedFile(QString,QString,QString)"} <= signatures
+    (tmp_path / "note.txt").write_text("hello")
+    pushed = []
+    handler.data_push.dataPushed.connect(lambda topic, payload: pushed.append((topic, payload)))
+    QMetaObject.invokeMethod(handler, "readFile", Q_ARG(str, str(tmp_path / "note.txt")))
+    assert pushed == [('fileRead', {'requestId': "", 'path': str(tmp_path / "note.txt"), 'content': "hello"})]
@@ -0,0 +1,146 @@
+import pytest
+import os
+from wodabrowser.directory_listing import scan_directory, list_columns, query_directory, ListingCursor, ListingVersions
+
+@pytest.fixture
+def listing_dir(tmp_path):
+    """Create a small directory tree for listing tests."""
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "notes.txt").write_text("notes")
+    (tmp_path / "docs" / "drafts").mkdir()
+    return tmp_path
+
+def test_scan_directory_entry_types(listing_dir):
+    """Test that entry types come back from a single scandir pass."""
+    entries = {e['name']: e for e in scan_directory(str(listing_dir / "docs"), str(listing_dir))}
+    assert entries['notes.txt']['is_file'] and not entries['notes.txt']['is_dir']
+    assert entries['drafts']['is_dir'] and not entries['drafts']['is_file']
+
+def test_scan_directory_paths_relative_to_base(listing_dir):
+    """Test that paths are relative to the base path."""
+    entries = scan_directory(str(listing_dir / "docs"), str(listing_dir))
+    assert sorted(e['path'] for e in entries) == [os.path.join("docs", "drafts"), os.path.join("docs", "notes.txt")]
+    root_entries = scan_directory(str(listing_dir), str(listing_dir))
+    assert [e['path'] for e in root_entries] == ["docs"]
+
+def test_scan_directory_missing(tmp_path):
+    """Test that listing a missing directory raises."""
+    with pytest.raises(FileNotFoundError):
+        scan_directory(str(tmp_path / "missing"), str(tmp_path))
+
+def test_listing_cursor_pages(tmp_path):
+    """Test that a cursor returns fixed-size pages until exhausted."""
+    for i in range(5):
+        (tmp_path / f"f{i}.txt").write_text("x")
+    cursor = ListingCursor(str(tmp_path), str(tmp_path), 2)
+    sizes = []
+    while not cursor.done:
+        sizes.append(len(cursor.next_page()))
+    assert sizes == [2, 2, 1]
+    assert cursor.position == 5
+
+def test_list_columns_natural_sort(tmp_path):
+    """Test that names sort naturally with directories first."""
+    for name in ["file10.txt", "File2.txt", "file1.txt"]:
+        (tmp_path / name).write_text("x")
+    (tmp_path / "zdir").mkdir()
+    listing = list_columns(str(tmp_path), str(tmp_path), columns=["name"])
+    assert listing == {"count": 4, "columns": {"name": ["zdir", "file1.txt", "File2.txt", "file10.txt"]}}
+
+def test_list_columns_stat_columns_and_sort(tmp_path):
+    """Test size, mime and mode columns and sorting by size."""
+    (tmp_path / "big.json").write_text("x" * 100)
+    (tmp_path / "small.png").write_text("x")
+    listing = list_columns(str(tmp_path), str(tmp_path), columns=["mime", "size", "name", "mode"],
+                           sort="size", descending=True)
+    assert list(listing["columns"]) == ["name", "size", "mode", "mime"]
+    assert listing["columns"]["name"] == ["big.json", "small.png"]
+    assert listing["columns"]["size"] == [100, 1]
+    assert listing["columns"]["mime"] == ["application/json", "image/png"]
+
+def test_list_columns_rejects_unknown_columns(tmp_path):
+    """Test that unknown columns and sort keys are reported."""
+    with pytest.raises(ValueError):
+        list_columns(str(tmp_path), str(tmp_path), columns=["owner"])
+    with pytest.raises(ValueError):
+        list_columns(str(tmp_path), str(tmp_path), sort="owner")
+
+def test_listing_versions_delta(tmp_path):
+    """Test that deltas report only added, removed and changed entries."""
+    from wodabrowser.cache import LRUCache
+    (tmp_path / "keep.txt").write_text("a")
+    (tmp_path / "edit.txt").write_text("a")
+    (tmp_path / "gone.txt").write_text("a")
+    versions = ListingVersions(LRUCache(16, 1024 * 1024))
+    first = versions.delta(str(tmp_path), str(tmp_path))
+    assert first["full"] and len(first["entries"]) == 3
+
+    unchanged = versions.delta(str(tmp_path), str(tmp_path), first["version"])
+    assert unchanged == {"version": first["version"], "full": False, "added": [], "removed": [], "changed": []}
+
+    (tmp_path / "gone.txt").unlink()
+    (tmp_path / "edit.txt").write_text("longer")
+    (tmp_path / "new").mkdir()
+    delta = versions.delta(str(tmp_path), str(tmp_path), first["version"])
+    assert delta["version"] != first["version"] and not delta["full"]
+    assert delta["removed"] == ["gone.txt"]
+    assert [e["name"] for e in delta["added"]] == ["new"]
+    assert [e["name"] for e in delta["changed"]] == ["edit.txt"]
+
+    assert versions.delta(str(tmp_path), str(tmp_path), "unknown")["full"]
+
+def test_listing_cursor_snapshot(tmp_path):
+    """Test that a finished cursor's snapshot can serve as a delta base."""
+    from wodabrowser.cache import LRUCache
+    (tmp_path / "a.txt").write_text("a")
+    cursor = ListingCursor(str(tmp_path), str(tmp_path), 10, track_snapshot=True)
+    cursor.next_page()
+    versions = ListingVersions(LRUCache(16, 1024 * 1024))
+    version = versions.register(str(tmp_path), cursor.snapshot)
+    (tmp_path / "b.txt").write_text("b")
+    delta = versions.delta(str(tmp_path), str(tmp_path), version)
+    assert [e["name"] for e in delta["added"]] == ["b.txt"]
+
+@pytest.fixture
+def query_dir(tmp_path):
+    """Create files of different names, sizes and types for queries."""
+    (tmp_path / "report.PDF").write_bytes(b"x" * 500)
+    (tmp_path / "notes.txt").write_bytes(b"x" * 10)
+    (tmp_path / "draft.txt").write_bytes(b"x" * 2000)
+    (tmp_path / ".hidden.txt").write_bytes(b"x")
+    (tmp_path / "texts").mkdir()
+    return tmp_path
+
+def names(result):
+    return sorted(e["name"] for e in result["entries"])
+
+def test_query_directory_glob_and_regex(query_dir):
+    """Test glob, regex and case-insensitive name matching."""
+    base = str(query_dir)
+    assert names(query_directory(base, base, {"glob": "*.txt"})) == [".hidden.txt", "draft.txt", "notes.txt"]
+    assert names(query_directory(base, base, {"glob": "*.pdf", "ignore_case": True})) == ["report.PDF"]
+    assert names(query_directory(base, base, {"regex": "^te"})) == ["texts"]
+
+def test_query_directory_type_size_hidden(query_dir):
+    """Test type, size range and hidden-file filters."""
+    base = str(query_dir)
+    assert names(query_directory(base, base, {"type": "dir"})) == ["texts"]
+    result = query_directory(base, base, {"type": "file", "min_size": 100, "max_size": 1000})
+    assert names(result) == ["report.PDF"] and result["entries"][0]["size"] == 500
+    assert names(query_directory(base, base, {"glob": "*.txt", "include_hidden": False})) == ["draft.txt", "notes.txt"]
+
+def test_query_directory_paging(query_dir):
+    """Test that offset and limit page through the matches."""
+    base = str(query_dir)
+    first = query_directory(base, base, {"type": "file", "limit": 2})
+    second = query_directory(base, base, {"type": "file", "limit": 2, "offset": 2})
+    assert len(first["entries"]) == 2 and first["more"]
+    assert len(second["entries"]) == 2 and not second["more"]
+    assert set(names(first)).isdisjoint(names(second))
+
+def test_query_directory_rejects_bad_queries(query_dir):
+    """Test that unknown keys and types are refused."""
+    with pytest.raises(ValueError):
+        query_directory(str(query_dir), str(query_dir), {"owner": "me"})
+    with pytest.raises(ValueError):
+        query_directory(str(query_dir), str(query_dir), {"type": "socket"})
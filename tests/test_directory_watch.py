@@ -0,0 +1,35 @@
+import pytest
+import time
+from wodabrowser.directory_watch import DirectoryWatchService
+
+def wait_for(qapp, condition, timeout=5.0):
+    """Process events until condition() holds or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+def test_watch_coalesces_bursts(qapp, tmp_path):
+    """Test that a burst of changes is reported once per watch."""
+    changes = []
+    service = DirectoryWatchService(lambda watch_id, path: changes.append((watch_id, path)))
+    watch_id = service.watch(str(tmp_path))
+    for i in range(20):
+        (tmp_path / f"file{i}.txt").write_text("x")
+    assert wait_for(qapp, lambda: changes)
+    wait_for(qapp, lambda: False, timeout=0.5)
+    assert changes == [(watch_id, str(tmp_path))]
+    service.close()
+
+def test_unwatch_stops_notifications(qapp, tmp_path):
+    """Test that unwatched directories are no longer reported."""
+    changes = []
+    service = DirectoryWatchService(lambda watch_id, path: changes.append(watch_id))
+    watch_id = service.watch(str(tmp_path))
+    assert service.unwatch(watch_id)
+    (tmp_path / "a.txt").write_text("x")
+    wait_for(qapp, lambda: False, timeout=0.5)
+    assert changes == []
+    with pytest.raises(NotADirectoryError):
+        service.watch(str(tmp_path / "a.txt"))
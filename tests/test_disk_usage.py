@@ -0,0 +1,55 @@
+import pytest
+import os
+from wodabrowser.cache import LRUCache
+from wodabrowser import disk_usage
+from wodabrowser.disk_usage import DiskUsageJob
+
+@pytest.fixture
+def tree(tmp_path):
+    """Create a small tree with known sizes."""
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "top.bin").write_bytes(b"x" * 100)
+    (tmp_path / "a" / "mid.bin").write_bytes(b"x" * 20)
+    (tmp_path / "a" / "b" / "deep.bin").write_bytes(b"x" * 3)
+    return tmp_path
+
+def test_directory_totals(tree):
+    """Test summing sizes, files and directories of a tree."""
+    cache = LRUCache(100, 1 << 20)
+    totals = DiskUsageJob(str(tree), cache).run()
+    assert totals == {"size": 123, "files": 3, "dirs": 2, "errors": 0}
+    assert cache.get(os.path.normpath(str(tree / "a")), os.stat(tree / "a").st_mtime_ns)["totals"]["size"] == 23
+
+def test_cached_subtrees_are_reused(tree):
+    """Test that unchanged subdirectories are taken from the cache instead of walked."""
+    cache = LRUCache(100, 1 << 20)
+    DiskUsageJob(str(tree), cache).run()
+    (tree / "new.bin").write_bytes(b"x" * 7)
+    misses = cache.misses
+    assert DiskUsageJob(str(tree), cache).run()["size"] == 130
+    # The root changed and is walked again; its subdirectory "a" is a hit
+    assert cache.misses == misses + 1
+
+def test_nested_changes_invalidate_ancestors(tree):
+    """Test that a change deep in the tree is seen even though its ancestors' mtimes did not change."""
+    cache = LRUCache(100, 1 << 20)
+    assert DiskUsageJob(str(tree), cache).run()["size"] == 123
+    (tree / "a" / "b" / "more.bin").write_bytes(b"x" * 1000)
+    assert DiskUsageJob(str(tree), cache).run()["size"] == 1123
+    assert DiskUsageJob(str(tree / "a"), cache).run()["size"] == 1023
+
+def test_cached_totals_expire(tree, monkeypatch):
+    """Test that cached totals are recomputed after the TTL, catching files that grew in place."""
+    cache = LRUCache(100, 1 << 20)
+    DiskUsageJob(str(tree), cache).run()
+    with open(tree / "a" / "mid.bin", "ab") as f:
+        f.write(b"x" * 50)
+    assert DiskUsageJob(str(tree), cache).run()["size"] == 123
+    monkeypatch.setattr(disk_usage, "DISK_USAGE_CACHE_TTL", -1)
+    assert DiskUsageJob(str(tree), cache).run()["size"] == 173
+
+def test_cancelled_job(tree):
+    """Test that a cancelled job stops without a result."""
+    job = DiskUsageJob(str(tree), LRUCache(100, 1 << 20))
+    job.cancel()
+    assert job.run() is None
@@ -0,0 +1,56 @@
+import pytest
+import os
+from wodabrowser import duplicates
+from wodabrowser.duplicates import DuplicateFinderJob
+from wodabrowser.cache import LRUCache
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "one.txt").write_text("same content")
+    (tmp_path / "b" / "copy.txt").write_text("same content")
+    (tmp_path / "b" / "other.txt").write_text("diff content")
+    (tmp_path / "empty1").write_bytes(b"")
+    (tmp_path / "empty2").write_bytes(b"")
+    return tmp_path
+
+def run(tree, cache):
+    groups = []
+    job = DuplicateFinderJob(str(tree), str(tree), cache, batch_callback=groups.extend)
+    return job.run(), groups
+
+def test_find_duplicates(tree):
+    """Test that only files with equal content are grouped."""
+    summary, groups = run(tree, LRUCache(100, 1024 * 1024))
+    assert groups == [{"size": 12, "hash": groups[0]["hash"], "wasted": 12,
+                       "paths": [os.path.join("a", "one.txt"), os.path.join("b", "copy.txt")]}]
+    assert summary["count"] == 1 and summary["duplicates"] == 1 and summary["wasted"] == 12
+    assert summary["candidates"] == 0 and not summary["cancelled"]
+
+def test_hard_links_are_not_duplicates(tree):
+    """Test that a second link to the same inode is skipped."""
+    os.link(tree / "b" / "other.txt", tree / "link.txt")
+    summary, groups = run(tree, LRUCache(100, 1024 * 1024))
+    assert summary["count"] == 1
+
+def test_large_files_hashed_in_full(tree, monkeypatch):
+    """Test that files equal at both ends are told apart by their full hash."""
+    monkeypatch.setattr(duplicates, "PARTIAL_HASH_BLOCK", 4)
+    (tree / "x.bin").write_bytes(b"head" + b"A" * 100 + b"tail")
+    (tree / "y.bin").write_bytes(b"head" + b"B" * 100 + b"tail")
+    (tree / "z.bin").write_bytes(b"head" + b"A" * 100 + b"tail")
+    summary, groups = run(tree, LRUCache(100, 1024 * 1024))
+    assert ["x.bin", "z.bin"] in [group["paths"] for group in groups]
+    # Five files are over both blocks long: the three above and the 12-byte pair
+    assert summary["candidates"] == 5
+
+def test_hashes_are_cached(tree):
+    """Test that a repeated search reads only changed files."""
+    cache = LRUCache(100, 1024 * 1024)
+    first, _ = run(tree, cache)
+    assert first["hashed"] == 3 and first["cached"] == 0
+    (tree / "b" / "copy.txt").write_text("diff content")
+    second, groups = run(tree, cache)
+    assert second["hashed"] == 1 and second["cached"] == 2
+    assert [group["paths"] for group in groups] == [[os.path.join("b", "copy.txt"), os.path.join("b", "other.txt")]]
@@ -0,0 +1,56 @@
+import pytest
+import os
+from wodabrowser.file_edits import apply_edits, EditConflict
+from wodabrowser.file_reader import content_hash
+
+def test_apply_edits_in_place(tmp_path):
+    """Test that same-length replacements are written without replacing the file."""
+    test_file = tmp_path / "notes.txt"
+    test_file.write_text("hello world")
+    inode = os.stat(test_file).st_ino
+    result = apply_edits(str(test_file), [{"offset": 6, "delete": 5, "insert": "there"}])
+    assert test_file.read_text() == "hello there"
+    assert result["in_place"] and result["size"] == 11
+    assert os.stat(test_file).st_ino == inode
+
+def test_apply_edits_streamed(tmp_path):
+    """Test inserting and deleting through a temporary file."""
+    test_file = tmp_path / "notes.txt"
+    test_file.write_text("abcdefghij")
+    os.chmod(test_file, 0o640)
+    edits = [{"offset": 8, "delete": 2, "insert": ""},
+             {"offset": 0, "delete": 0, "insert": "ü>"},
+             {"offset": 3, "delete": 1, "insert": "DDD"}]
+    result = apply_edits(str(test_file), edits)
+    assert test_file.read_text(encoding="utf-8") == "ü>abcDDDefgh"
+    assert not result["in_place"] and result["size"] == os.path.getsize(test_file)
+    assert os.stat(test_file).st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ["notes.txt"]
+
+def test_apply_edits_expectations(tmp_path):
+    """Test that a changed file is left alone."""
+    test_file = tmp_path / "notes.txt"
+    test_file.write_bytes(b"one two")
+    stat = os.stat(test_file)
+    edit = [{"offset": 0, "delete": 3, "insert": "1"}]
+    with pytest.raises(EditConflict):
+        apply_edits(str(test_file), edit, expected_mtime_ns=stat.st_mtime_ns - 1)
+    with pytest.raises(EditConflict):
+        apply_edits(str(test_file), edit, expected_size=3)
+    with pytest.raises(EditConflict):
+        apply_edits(str(test_file), edit, expected_hash=content_hash(b"other"))
+    assert test_file.read_bytes() == b"one two"
+    apply_edits(str(test_file), edit, expected_mtime_ns=stat.st_mtime_ns,
+                expected_hash=content_hash(b"one two"))
+    assert test_file.read_bytes() == b"1 two"
+
+def test_apply_edits_rejects_bad_ranges(tmp_path):
+    """Test that overlapping or out-of-range edits change nothing."""
+    test_file = tmp_path / "notes.txt"
+    test_file.write_bytes(b"0123456789")
+    with pytest.raises(ValueError):
+        apply_edits(str(test_file), [{"offset": 2, "delete": 4, "insert": ""},
+                                     {"offset": 5, "delete": 1, "insert": "x"}])
+    with pytest.raises(ValueError):
+        apply_edits(str(test_file), [{"offset": 8, "delete": 3, "insert": ""}])
+    assert test_file.read_bytes() == b"0123456789"
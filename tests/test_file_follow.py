@@ -0,0 +1,76 @@
+import pytest
+import os
+from wodabrowser.file_follow import FileFollower, FileFollowService
+
+def test_follower_reads_appended_data(tmp_path):
+    """Test that only data appended after the start offset is returned."""
+    log = tmp_path / "app.log"
+    log.write_text("old\n")
+    follower = FileFollower(str(log))
+    assert follower.read_new() is None
+    with open(log, "a") as f:
+        f.write("new line\n")
+    batch = follower.read_new()
+    assert batch["data"] == "new line\n" and batch["offset"] == 13
+    assert not batch["truncated"] and not batch["rotated"]
+    follower.close()
+
+def test_follower_from_offset_and_batch_limit(tmp_path):
+    """Test starting from an offset and splitting a backlog into batches."""
+    log = tmp_path / "app.log"
+    log.write_text("abcdef")
+    follower = FileFollower(str(log), 2)
+    first = follower.read_new(max_bytes=3)
+    assert first["data"] == "cde" and first["more"]
+    assert follower.read_new(max_bytes=3)["data"] == "f"
+    follower.close()
+
+def test_follower_keeps_split_characters_for_next_batch(tmp_path):
+    """Test that a multi-byte character cut by the batch limit is not lost."""
+    log = tmp_path / "app.log"
+    log.write_bytes("aé".encode("utf-8"))
+    follower = FileFollower(str(log), 0)
+    first = follower.read_new(max_bytes=2)
+    assert first["data"] == "a" and first["offset"] == 1
+    assert follower.read_new(max_bytes=2)["data"] == "é"
+    follower.close()
+
+def test_follower_handles_truncation(tmp_path):
+    """Test that a truncated file is read again from the start."""
+    log = tmp_path / "app.log"
+    log.write_text("a long first line\n")
+    follower = FileFollower(str(log))
+    log.write_text("short\n")
+    batch = follower.read_new()
+    assert batch["truncated"] and batch["data"] == "short\n"
+    follower.close()
+
+def test_follower_handles_rotation(tmp_path):
+    """Test that the old file is drained before following its replacement."""
+    log = tmp_path / "app.log"
+    log.write_text("")
+    follower = FileFollower(str(log))
+    with open(log, "a") as f:
+        f.write("last old line\n")
+    os.rename(log, tmp_path / "app.log.1")
+    log.write_text("first new line\n")
+    assert follower.read_new()["data"] == "last old line\n"
+    batch = follower.read_new()
+    assert batch["rotated"] and batch["data"] == "first new line\n"
+    follower.close()
+
+def test_service_batches_appended_data(qapp, tmp_path):
+    """Test that the service sends appended data through its callback."""
+    log = tmp_path / "app.log"
+    log.write_text("")
+    batches = []
+    service = FileFollowService(batches.append)
+    follow_id = service.follow(str(log), 0)
+    with open(log, "a") as f:
+        f.write("one\n")
+        f.write("two\n")
+    service._flush()
+    assert batches == [{"data": "one\ntwo\n", "offset": 8, "more": False, "truncated": False,
+                        "rotated": False, "followId": follow_id}]
+    assert service.unfollow(follow_id)
+    assert not service.unfollow(follow_id)
@@ -0,0 +1,79 @@
+import pytest
+import os
+from wodabrowser.file_index import FileIndex
+
+@pytest.fixture
+def tree(tmp_path):
+    """Create a small home tree to index."""
+    home = tmp_path / "home"
+    (home / "docs" / "reports").mkdir(parents=True)
+    (home / "docs" / "Report_2024.pdf").write_text("pdf")
+    (home / "docs" / "reports" / "q1_report.txt").write_text("q1")
+    (home / "music").mkdir()
+    (home / "music" / "song.mp3").write_text("mp3")
+    return home
+
+@pytest.fixture
+def index(tree, tmp_path):
+    """Create an index of the tree."""
+    file_index = FileIndex(str(tmp_path / "index.sqlite"), str(tree))
+    yield file_index
+    file_index.close()
+
+def test_search_substring(index):
+    """Test case-insensitive substring search over names."""
+    index.crawl()
+    paths = sorted(r["path"] for r in index.search("REPORT", 10))
+    assert paths == [os.path.join("docs", "Report_2024.pdf"), os.path.join("docs", "reports"),
+                     os.path.join("docs", "reports", "q1_report.txt")]
+    assert [r["name"] for r in index.search("report txt", 10)] == ["q1_report.txt"]
+    assert [r["name"] for r in index.search("q1", 10)] == ["q1_report.txt"]
+    assert index.search("%", 10) == []
+    assert len(index.search("o", 2)) == 2
+
+def test_incremental_crawl(index, tree):
+    """Test that later crawls pick up changes and skip unchanged directories."""
+    first = index.crawl()
+    assert first["files"] == 6 and first["rescanned"] == 4
+    (tree / "music" / "song.mp3").unlink()
+    (tree / "music" / "tune.ogg").write_text("ogg")
+    second = index.crawl()
+    assert second["rescanned"] == 1
+    assert index.search("song", 10) == []
+    assert [r["name"] for r in index.search("tune", 10)] == ["tune.ogg"]
+
+def test_removed_directory_drops_subtree(index, tree):
+    """Test that deleting a directory removes everything indexed below it."""
+    index.crawl()
+    for name in os.listdir(tree / "docs" / "reports"):
+        os.remove(tree / "docs" / "reports" / name)
+    os.rmdir(tree / "docs" / "reports")
+    index.crawl()
+    assert index.search("q1_", 10) == []
+    assert index.count() == 4
+
+def test_index_persists(index, tree, tmp_path):
+    """Test that a reopened index answers searches without crawling again."""
+    index.crawl()
+    reopened = FileIndex(str(tmp_path / "index.sqlite"), str(tree))
+    assert [r["name"] for r in reopened.search("song", 10)] == ["song.mp3"]
+    assert reopened.crawl()["rescanned"] == 0
+    reopened.close()
+
+def test_index_follows_base_path(tree, tmp_path):
+    """Test that reopening the database for another base directory drops the old rows."""
+    db_path = str(tmp_path / "index.sqlite")
+    file_index = FileIndex(db_path, str(tree))
+    file_index.crawl()
+    file_index.close()
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "notes.txt").write_text("x")
+    file_index = FileIndex(db_path, str(other))
+    assert file_index.search("report", 10) == []
+    file_index.crawl()
+    assert [r["path"] for r in file_index.search("notes", 10)] == ["notes.txt"]
+    file_index.close()
+    file_index = FileIndex(db_path, str(other))
+    assert file_index.count() == 1
+    file_index.close()
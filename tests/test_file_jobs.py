@@ -0,0 +1,88 @@
+import pytest
+import os
+from wodabrowser.file_jobs import FileJob, JobCancelled, copy_file_data
+
+@pytest.fixture
+def tree(tmp_path):
+    """Create a source tree with nested files and a symlink."""
+    src = tmp_path / "src"
+    (src / "sub" / "deeper").mkdir(parents=True)
+    (src / "a.bin").write_bytes(os.urandom(3 * 1024 * 1024))
+    (src / "sub" / "b.txt").write_text("b")
+    (src / "sub" / "deeper" / "c.txt").write_text("c")
+    os.symlink("a.bin", src / "link")
+    return src
+
+def test_copy_tree(tree, tmp_path):
+    """Test copying a tree with its contents, symlinks and progress totals."""
+    reports = []
+    job = FileJob("copy", str(tree), str(tmp_path / "dst"), reports.append)
+    result = job.run()
+    dst = tmp_path / "dst"
+    assert (dst / "a.bin").read_bytes() == (tree / "a.bin").read_bytes()
+    assert (dst / "sub" / "deeper" / "c.txt").read_text() == "c"
+    assert os.readlink(dst / "link") == "a.bin"
+    assert result["files_done"] == result["files_total"] == 4
+    assert result["bytes_done"] == result["bytes_total"] == 3 * 1024 * 1024 + 2
+    assert reports and reports[0]["bytes_total"] == result["bytes_total"]
+
+def test_copy_refuses_existing_destination_and_self(tree, tmp_path):
+    """Test that copies never overwrite and never recurse into themselves."""
+    with pytest.raises(FileExistsError):
+        FileJob("copy", str(tree / "sub" / "b.txt"), str(tree / "a.bin")).run()
+    with pytest.raises(ValueError):
+        FileJob("copy", str(tree), str(tree / "sub" / "copy")).run()
+
+def test_move_and_delete(tree, tmp_path):
+    """Test moving a tree and deleting it recursively."""
+    FileJob("move", str(tree), str(tmp_path / "moved")).run()
+    assert not tree.exists() and (tmp_path / "moved" / "sub" / "b.txt").exists()
+    result = FileJob("delete", str(tmp_path / "moved")).run()
+    assert not (tmp_path / "moved").exists()
+    assert result["files_done"] == 4
+
+def test_cancelled_copy_leaves_no_partial_file(tree, tmp_path):
+    """Test that cancelling stops the job and removes the file being written."""
+    job = FileJob("copy", str(tree / "a.bin"), str(tmp_path / "partial.bin"))
+    job.cancel()
+    with pytest.raises(JobCancelled):
+        job.run()
+    assert not (tmp_path / "partial.bin").exists()
+
+def test_copy_file_data_falls_back(tmp_path, monkeypatch):
+    """Test that an unsupported kernel copy falls back to the next method."""
+    def unsupported(*args):
+        raise OSError(18, "Invalid cross-device link")
+    monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+    source = tmp_path / "in.bin"
+    source.write_bytes(b"data" * 1000)
+    copied = []
+    with open(source, "rb") as src, open(tmp_path / "out.bin", "wb") as dst:
+        copy_file_data(src.fileno(), dst.fileno(), 4000, copied.append, lambda: None)
+    assert (tmp_path / "out.bin").read_bytes() == source.read_bytes() and sum(copied) == 4000
+
+def test_copy_file_data_resumes_after_partial_copy(tmp_path, monkeypatch):
+    """Test that a method failing mid-copy hands over at the right offset in both files."""
+    import wodabrowser.file_jobs as file_jobs
+    monkeypatch.setattr(file_jobs, "COPY_CHUNK_SIZE", 1000)
+    real_copy_file_range = getattr(os, "copy_file_range", None)
+    calls = []
+    def fails_midway(src_fd, dst_fd, count, offset_src, offset_dst):
+        calls.append(offset_src)
+        if len(calls) > 2:
+            raise OSError(18, "Invalid cross-device link")
+        data = os.pread(src_fd, count, offset_src)
+        return os.pwrite(dst_fd, data, offset_dst)
+    monkeypatch.setattr(os, "copy_file_range", fails_midway, raising=False)
+    source = tmp_path / "in.bin"
+    source.write_bytes(bytes(range(256)) * 20)
+    with open(source, "rb") as src, open(tmp_path / "out.bin", "wb") as dst:
+        copy_file_data(src.fileno(), dst.fileno(), 5120, lambda n: None, lambda: None)
+    assert calls == [0, 1000, 2000]
+    assert (tmp_path / "out.bin").read_bytes() == source.read_bytes()
+
+def test_delete_and_move_refuse_filesystem_root():
+    """Test that a job never deletes or moves the filesystem root."""
+    for operation in ("delete", "move"):
+        with pytest.raises(ValueError):
+            FileJob(operation, "/", "/tmp/elsewhere").run()
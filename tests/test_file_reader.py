@@ -0,0 +1,82 @@
+import pytest
+import base64
+from wodabrowser.file_reader import read_range, LineIndex, ContentCache, content_hash, TRANSLATED_HASH_SUFFIX
+from wodabrowser.cache import LRUCache
+
+def test_read_range_binary(tmp_path):
+    """Test reading a raw byte range."""
+    test_file = tmp_path / "data.bin"
+    test_file.write_bytes(bytes(range(256)) * 40)
+    result = read_range(str(test_file), 5000, 10)
+    assert base64.b64decode(result["data"]) == (bytes(range(256)) * 40)[5000:5010]
+    assert result["size"] == 10240 and not result["eof"]
+
+def test_read_range_past_end(tmp_path):
+    """Test that ranges are clipped at end of file."""
+    test_file = tmp_path / "short.txt"
+    test_file.write_text("hello")
+    result = read_range(str(test_file), 3, 100, "utf-8")
+    assert result["data"] == "lo" and result["length"] == 2 and result["eof"]
+    assert read_range(str(test_file), 10, 5, "utf-8")["data"] == ""
+
+def test_read_range_does_not_split_characters(tmp_path):
+    """Test that a multi-byte character cut off by the range is left for the next read."""
+    test_file = tmp_path / "utf8.txt"
+    test_file.write_bytes("aé".encode("utf-8") + b"b")
+    first = read_range(str(test_file), 0, 2, "utf-8")
+    assert first["data"] == "a" and first["length"] == 1
+    second = read_range(str(test_file), first["length"], 10, "utf-8")
+    assert second["data"] == "éb"
+
+def test_line_index_offsets(tmp_path):
+    """Test locating lines across index blocks."""
+    lines = [f"line {i}\n" for i in range(1000)]
+    test_file = tmp_path / "lines.txt"
+    test_file.write_text("".join(lines))
+    index = LineIndex(str(test_file), block_size=128)
+    assert index.line_count == 1000
+    offsets = index.line_offsets(500, 3)
+    content = test_file.read_bytes()
+    assert content[offsets[0]:offsets[-1]].decode() == "".join(lines[500:503])
+    assert index.line_offsets(999, 5) == [len(content) - len(lines[999]), len(content)]
+
+def test_line_index_without_trailing_newline(tmp_path):
+    """Test that a final unterminated line is counted."""
+    test_file = tmp_path / "tail.txt"
+    test_file.write_text("a\nb")
+    index = LineIndex(str(test_file))
+    assert index.line_count == 2
+    assert index.line_offsets(1, 1) == [2, 3]
+
+def test_content_cache_hits_until_file_changes(tmp_path):
+    """Test that repeated reads hit the cache and a change is picked up."""
+    path = tmp_path / "config.json"
+    path.write_text("{}")
+    cache = ContentCache(LRUCache(8, 1024 * 1024), 1024)
+    text, first_hash = cache.read(str(path))
+    assert text == "{}"
+    assert cache.read(str(path)) == (text, first_hash)
+    assert cache.stats()["hits"] == 1
+
+    path.write_text('{"a": 1}')
+    text, second_hash = cache.read(str(path))
+    assert text == '{"a": 1}' and second_hash != first_hash
+
+def test_content_cache_translates_newlines(tmp_path):
+    """Test that CRLF and CR line endings read as LF, with a hash marking the text as translated."""
+    path = tmp_path / "dos.txt"
+    path.write_bytes(b"one\r\ntwo\rthree\n")
+    cache = ContentCache(LRUCache(8, 1024 * 1024), 1024)
+    text, crlf_hash = cache.read(str(path))
+    assert text == "one\ntwo\nthree\n"
+    path.write_bytes(b"one\ntwo\nthree\n")
+    assert cache.read(str(path)) == (text, content_hash(b"one\ntwo\nthree\n"))
+    assert crlf_hash == content_hash(b"one\r\ntwo\rthree\n") + TRANSLATED_HASH_SUFFIX
+
+def test_content_cache_skips_large_files(tmp_path):
+    """Test that files above the size limit are read but not cached."""
+    path = tmp_path / "big.txt"
+    path.write_text("x" * 100)
+    cache = ContentCache(LRUCache(8, 1024 * 1024), 10)
+    assert cache.read(str(path))[0] == "x" * 100
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,48 @@
+import pytest
+import os
+from PyQt6.QtCore import QUrl
+from wodabrowser.file_scheme import resolve_scheme_path, file_url, initiator_allowed, open_file_device, RESPONSE_HEADERS
+
+def test_resolve_scheme_path(tmp_path):
+    """Test that URL paths resolve under the base path."""
+    (tmp_path / "pics").mkdir()
+    assert resolve_scheme_path(str(tmp_path), "/pics/a b.png") == os.path.join(os.path.realpath(tmp_path), "pics", "a b.png")
+    assert resolve_scheme_path(str(tmp_path), "/") == os.path.realpath(tmp_path)
+
+def test_resolve_scheme_path_refuses_escapes(tmp_path):
+    """Test that .. segments and outward symlinks are refused."""
+    base = tmp_path / "home"
+    base.mkdir()
+    (tmp_path / "secret.txt").write_text("x")
+    os.symlink(tmp_path / "secret.txt", base / "link.txt")
+    assert resolve_scheme_path(str(base), "/../secret.txt") is None
+    assert resolve_scheme_path(str(base), "/link.txt") is None
+
+def test_file_url_quotes_path():
+    """Test building scheme URLs from relative paths."""
+    assert file_url("pics/a b.png") == "woda-fs:///pics/a%20b.png"
+
+def test_initiator_allowed_only_for_local_pages():
+    """Test that only the app's pages and the browser itself may load scheme URLs."""
+    assert initiator_allowed(QUrl())
+    assert initiator_allowed(QUrl("file:///opt/wodabrowser/html/index.html"))
+    assert initiator_allowed(QUrl("woda-fs:///docs/page.html"))
+    assert not initiator_allowed(QUrl("https://example.com"))
+    assert not initiator_allowed(QUrl("null"))
+
+def test_file_device_serves_ranges(tmp_path):
+    """Test that replies advertise byte ranges and their device can seek to any range."""
+    data = bytes(range(256)) * 64
+    (tmp_path / "video.bin").write_bytes(data)
+    assert RESPONSE_HEADERS[b'Accept-Ranges'] == [b'bytes']
+    device = open_file_device(str(tmp_path / "video.bin"))
+    try:
+        assert not device.isSequential()
+        assert device.size() == len(data)
+        assert device.seek(10000)
+        assert bytes(device.read(100)) == data[10000:10100]
+        assert device.seek(3)
+        assert bytes(device.read(5)) == data[3:8]
+    finally:
+        device.close()
+    assert open_file_device(str(tmp_path / "missing.bin")) is None
@@ -1,7 +1,10 @@
 import pytest
 import os
+import json
+import zipfile
 from wodabrowser.file_system_handler import FileSystemHandler
 from unittest.mock import patch, mock_open
+from PyQt6.QtCore import QCoreApplication
 
 @pytest.fixture
 def fs_handler(qapp):
@@ -51,3 +54,441 @@ def test_large_file_operations(fs_handler, tmp_path):
     assert test_file.read_text() == large_content
     fs_handler.readFile(str(test_file))
     # Since this is async, we'd need to check the signal emission
+
+def test_get_directory_contents(fs_handler, tmp_path):
+    """Test listing a directory relative to the base path."""
+    fs_handler.base_path = str(tmp_path)
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "a.txt").write_text("a")
+    entries = json.loads(fs_handler.getDirectoryContents("sub"))
+    assert entries == [{"name": "a.txt", "is_dir": False, "is_file": True, "path": os.path.join("sub", "a.txt")}]
+
+def test_paginated_listing(fs_handler, tmp_path):
+    """Test opening a listing and reading it page by page."""
+    fs_handler.base_path = str(tmp_path)
+    for i in range(3):
+        (tmp_path / f"f{i}.txt").write_text("x")
+    handle = fs_handler.openListing("", 2)
+    first = json.loads(fs_handler.nextListingPage(handle))
+    second = json.loads(fs_handler.nextListingPage(handle))
+    assert len(first["entries"]) == 2 and not first["done"]
+    assert len(second["entries"]) == 1 and second["done"]
+    assert json.loads(fs_handler.nextListingPage(handle))["error"]
+    assert fs_handler.openListing("missing", 2) == ""
+
+def test_directory_cache_invalidated_on_create(fs_handler, tmp_path):
+    """Test that creating a file drops the cached listing of its directory."""
+    fs_handler.base_path = str(tmp_path)
+    fs_handler.getDirectoryContents("")
+    assert json.loads(fs_handler.getCachedDirectoryContents("")) == []
+    fs_handler.createFile(str(tmp_path / "new.txt"), "x")
+    assert json.loads(fs_handler.getCachedDirectoryContents(""))[0]["name"] == "Loading..."
+    assert json.loads(fs_handler.getCacheStats())["directory"]["invalidations"] == 1
+
+def test_worker_pool_mode(qapp, tmp_path):
+    """Test that slots return immediately and report back through queued signals."""
+    handler = FileSystemHandler(use_worker_pool=True)
+    created = []
+    handler.fileCreated.connect(created.append)
+    test_file = tmp_path / "async.txt"
+    handler.createFile(str(test_file), "async content")
+    assert handler.wait_for_workers(5000)
+    qapp.processEvents()
+    assert test_file.read_text() == "async content"
+    assert created == [str(test_file)]
+
+def test_worker_pool_keeps_mutation_order(qapp, tmp_path):
+    """Test that dependent changes issued back to back run in call order."""
+    handler = FileSystemHandler(use_worker_pool=True)
+    errors = []
+    handler.errorOccurred.connect(errors.append)
+    for i in range(20):
+        directory = tmp_path / f"dir{i}"
+        handler.createDirectory(str(directory))
+        handler.createFile(str(directory / "a.txt"), "first")
+        handler.changeFileContent(str(directory / "a.txt"), "second")
+    handler.createFile(str(tmp_path / "gone.txt"), "x")
+    handler.deleteFile(str(tmp_path / "gone.txt"))
+    assert handler.wait_for_workers(5000)
+    qapp.processEvents()
+    assert errors == []
+    assert all((tmp_path / f"dir{i}" / "a.txt").read_text() == "second" for i in range(20))
+    assert not (tmp_path / "gone.txt").exists()
+
+def test_file_jobs_keep_mutation_order(qapp, tmp_path):
+    """Test that copy, move and delete jobs run in call order with the other changes."""
+    handler = FileSystemHandler(use_worker_pool=True)
+    errors = []
+    handler.errorOccurred.connect(errors.append)
+    for i in range(10):
+        source, copy, moved = (str(tmp_path / f"{name}{i}.txt") for name in ("source", "copy", "moved"))
+        handler.createFile(source, "first")
+        assert handler.copyPath(source, copy)
+        handler.changeFileContent(copy, "second")
+        assert handler.movePath(copy, moved)
+        handler.createFile(copy, "again")
+        assert handler.deletePath(source)
+    assert handler.wait_for_workers(5000)
+    qapp.processEvents()
+    assert errors == []
+    for i in range(10):
+        assert (tmp_path / f"moved{i}.txt").read_text() == "second"
+        assert (tmp_path / f"copy{i}.txt").read_text() == "again"
+        assert not (tmp_path / f"source{i}.txt").exists()
+
+def test_read_file_range(fs_handler, tmp_path):
+    """Test ranged reads and line queries through the handler."""
+    test_file = tmp_path / "log.txt"
+    test_file.write_text("first\nsecond\nthird\n")
+    result = json.loads(fs_handler.readFileRange(str(test_file), 6, 6, "utf-8"))
+    assert result["data"] == "second"
+    assert fs_handler.getFileSize(str(test_file)) == 19
+    assert json.loads(fs_handler.getLineIndex(str(test_file)))["line_count"] == 3
+    assert json.loads(fs_handler.getLineOffsets(str(test_file), 1, 1))["offsets"] == [6, 13]
+
+def test_line_index_built_off_the_gui_thread(qapp, tmp_path):
+    """Test that a missing line index is built on the worker pool and pushed."""
+    import threading
+    handler = FileSystemHandler(use_worker_pool=True)
+    test_file = tmp_path / "log.txt"
+    test_file.write_text("first\nsecond\nthird\n")
+    pushed = []
+    handler.data_push.dataPushed.connect(lambda topic, payload: pushed.append(payload) if topic == "lineIndex" else None)
+    release = threading.Event()
+    from wodabrowser import file_system_handler
+    build = file_system_handler.LineIndex
+    with patch.object(file_system_handler, "LineIndex", side_effect=lambda path: release.wait(5) and build(path)):
+        assert json.loads(handler.getLineIndex(str(test_file))) == {"path": str(test_file), "pending": True}
+        assert json.loads(handler.getLineOffsets(str(test_file), 1, 1))["pending"]
+        release.set()
+        assert handler.wait_for_workers(5000)
+    qapp.processEvents()
+    assert pushed == [{"path": str(test_file), "size": 19, "line_count": 3}]
+    assert json.loads(handler.getLineOffsets(str(test_file), 1, 1))["offsets"] == [6, 13]
+
+def test_chunked_upload(fs_handler, tmp_path):
+    """Test a chunked upload through the handler, including a failed chunk."""
+    fs_handler.base_path = str(tmp_path)
+    progress = []
+    fs_handler.uploadProgress.connect(lambda *args: progress.append(args))
+    status = json.loads(fs_handler.beginUpload("", "drop.txt", 5))
+    upload_id = status["upload_id"]
+    fs_handler.appendUploadChunk(upload_id, 0, "aGVs")  # "hel"
+    failed = json.loads(fs_handler.appendUploadChunk(upload_id, 0, "not base64!"))
+    assert failed["error"] and failed["received"] == 3
+    fs_handler.appendUploadChunk(upload_id, 3, "bG8=")  # "lo"
+    assert json.loads(fs_handler.commitUpload(upload_id))["path"] == "drop.txt"
+    assert (tmp_path / "drop.txt").read_text() == "hello"
+    assert progress == [(upload_id, 3, 5), (upload_id, 5, 5)]
+    assert json.loads(fs_handler.getUploadStatus(upload_id))["error"]
+
+def test_search_files(fs_handler, tmp_path):
+    """Test indexing the base path and searching it through the handler."""
+    (tmp_path / "home" / "sub").mkdir(parents=True)
+    (tmp_path / "home" / "sub" / "notes.md").write_text("x")
+    fs_handler.base_path = str(tmp_path / "home")
+    fs_handler.index_path = str(tmp_path / "index.sqlite")
+    finished = []
+    fs_handler.indexingFinished.connect(finished.append)
+    fs_handler.startIndexing()
+    assert json.loads(finished[0])["files"] == 2
+    result = json.loads(fs_handler.searchFiles("note", 10))
+    assert [r["path"] for r in result["results"]] == [os.path.join("sub", "notes.md")]
+
+def test_compute_directory_size(fs_handler, tmp_path):
+    """Test directory size jobs and their invalidation by handler writes."""
+    fs_handler.base_path = str(tmp_path)
+    (tmp_path / "dir").mkdir()
+    (tmp_path / "dir" / "a.bin").write_bytes(b"x" * 10)
+    updates = []
+    fs_handler.directorySizeUpdated.connect(lambda job_id, totals: updates.append((job_id, json.loads(totals))))
+    job_id = fs_handler.computeDirectorySize("dir")
+    assert updates[-1] == (job_id, {"size": 10, "files": 1, "dirs": 0, "errors": 0, "path": "dir", "done": True})
+    fs_handler.changeFileContent(str(tmp_path / "dir" / "a.bin"), "x" * 15)
+    fs_handler.computeDirectorySize("")
+    assert updates[-1][1]["size"] == 15
+
+def test_execute_batch(fs_handler, tmp_path):
+    """Test running several operations in one call with a single result signal."""
+    completed = []
+    fs_handler.batchCompleted.connect(lambda batch_id, result: completed.append((batch_id, json.loads(result))))
+    ops = [{"op": "createFile", "path": str(tmp_path / f"f{i}.txt"), "content": str(i)} for i in range(3)]
+    batch_id = fs_handler.executeBatch(json.dumps({"ops": ops, "transactional": True}))
+    assert completed == [(batch_id, {"results": [None, None, None], "failed": 0, "rolled_back": False,
+                                     "rollback_errors": [], "batch_id": batch_id})]
+    assert (tmp_path / "f2.txt").read_text() == "2"
+
+def test_recursive_delete_job(fs_handler, tmp_path):
+    """Test deleting a non-empty directory as a job with a final progress event."""
+    (tmp_path / "full" / "nested").mkdir(parents=True)
+    (tmp_path / "full" / "nested" / "x.txt").write_text("x")
+    events = []
+    fs_handler.fileJobProgress.connect(lambda job_id, progress: events.append((job_id, json.loads(progress))))
+    job_id = fs_handler.deletePath(str(tmp_path / "full"))
+    assert not (tmp_path / "full").exists()
+    assert events[-1][0] == job_id and events[-1][1]["done"] and events[-1][1]["files_done"] == 1
+
+def test_delete_and_move_refuse_base_path_and_ancestors(fs_handler, tmp_path):
+    """Test that deletePath and movePath refuse to create jobs that would remove the base path."""
+    base = tmp_path / "home" / "user"
+    base.mkdir(parents=True)
+    (base / "keep.txt").write_text("x")
+    fs_handler.base_path = str(base)
+    errors = []
+    fs_handler.errorOccurred.connect(errors.append)
+    events = []
+    fs_handler.fileJobProgress.connect(lambda job_id, progress: events.append(job_id))
+    for path in ["", "  ", ".", "./", str(base), str(base) + "/", str(base / "sub" / ".."), "..", str(tmp_path), "/"]:
+        assert fs_handler.deletePath(path) == "", path
+        assert fs_handler.movePath(path, str(tmp_path / "elsewhere")) == "", path
+    assert len(errors) == 20 and events == []
+    assert (base / "keep.txt").exists()
+    assert not (tmp_path / "elsewhere").exists()
+
+def test_get_directory_listing(fs_handler, tmp_path):
+    """Test column-projected listings through the handler."""
+    fs_handler.base_path = str(tmp_path)
+    (tmp_path / "b.txt").write_text("bb")
+    (tmp_path / "a.txt").write_text("a")
+    listing = json.loads(fs_handler.getDirectoryListing("", json.dumps({"columns": ["name", "size"]})))
+    assert listing["columns"] == {"name": ["a.txt", "b.txt"], "size": [1, 2]}
+    assert json.loads(fs_handler.getDirectoryListing("", json.dumps({"sort": "owner"})))["error"]
+
+def test_get_directory_delta(fs_handler, tmp_path):
+    """Test that a finished paginated listing carries a version for deltas."""
+    fs_handler.base_path = str(tmp_path)
+    (tmp_path / "a.txt").write_text("a")
+    page = json.loads(fs_handler.nextListingPage(fs_handler.openListing("", 10)))
+    assert page["done"] and page["version"]
+    (tmp_path / "b.txt").write_text("b")
+    delta = json.loads(fs_handler.getDirectoryDelta("", page["version"]))
+    assert not delta["full"]
+    assert [e["path"] for e in delta["added"]] == ["b.txt"]
+    assert json.loads(fs_handler.getDirectoryDelta("missing", ""))["error"]
+
+def test_read_file_if_changed(fs_handler, tmp_path):
+    """Test that a matching hash returns unchanged without the content."""
+    test_file = tmp_path / "template.html"
+    test_file.write_text("<p>hi</p>")
+    first = json.loads(fs_handler.readFileIfChanged(str(test_file), ""))
+    assert first["content"] == "<p>hi</p>" and not first["unchanged"]
+    second = json.loads(fs_handler.readFileIfChanged(str(test_file), first["hash"]))
+    assert second == {"path": str(test_file), "hash": first["hash"], "unchanged": True}
+    fs_handler.changeFileContent(str(test_file), "<p>bye</p>")
+    third = json.loads(fs_handler.readFileIfChanged(str(test_file), first["hash"]))
+    assert third["content"] == "<p>bye</p>"
+    assert json.loads(fs_handler.getCacheStats())["content"]["hits"] >= 1
+
+def apply_edits(fs_handler, path, request):
+    """Apply edits through the handler and return the result it signals."""
+    results = []
+    fs_handler.editsApplied.connect(lambda edit_id, result: results.append((edit_id, json.loads(result))))
+    edit_id = fs_handler.applyEdits(str(path), json.dumps(request))
+    fs_handler.wait_for_workers()
+    QCoreApplication.processEvents()
+    assert results[-1][0] == edit_id
+    return results[-1][1]
+
+def test_apply_edits(fs_handler, tmp_path):
+    """Test applying edits and detecting a conflicting change."""
+    test_file = tmp_path / "page.html"
+    test_file.write_text("<p>hi</p>")
+    known = json.loads(fs_handler.readFileIfChanged(str(test_file), ""))
+    request = {"edits": [{"offset": 3, "delete": 2, "insert": "hello"}], "expectedHash": known["hash"]}
+    result = apply_edits(fs_handler, test_file, request)
+    assert result["size"] == 12 and not result["inPlace"]
+    assert json.loads(fs_handler.readFileIfChanged(str(test_file), known["hash"]))["content"] == "<p>hello</p>"
+    stale = apply_edits(fs_handler, test_file, request)
+    assert stale["conflict"] and test_file.read_text() == "<p>hello</p>"
+
+def test_apply_edits_to_crlf_file(fs_handler, tmp_path):
+    """Test that offsets into newline-translated text cannot pass the hash guard of a CRLF file."""
+    test_file = tmp_path / "dos.txt"
+    test_file.write_bytes(b"ab\r\ncd\r\nef\r\n")
+    translated = json.loads(fs_handler.readFileIfChanged(str(test_file), ""))
+    assert translated["content"] == "ab\ncd\nef\n"
+    offset = translated["content"].index("ef")
+    request = {"edits": [{"offset": offset, "delete": 2, "insert": "XY"}], "expectedHash": translated["hash"]}
+    assert apply_edits(fs_handler, test_file, request)["conflict"]
+    assert test_file.read_bytes() == b"ab\r\ncd\r\nef\r\n"
+
+    raw = json.loads(fs_handler.readFileForEdit(str(test_file)))
+    assert raw["content"] == "ab\r\ncd\r\nef\r\n"
+    request = {"edits": [{"offset": raw["content"].index("ef"), "delete": 2, "insert": "XY"}], "expectedHash": raw["hash"]}
+    result = apply_edits(fs_handler, test_file, request)
+    assert "error" not in result and test_file.read_bytes() == b"ab\r\ncd\r\nXY\r\n"
+
+def test_apply_edits_run_in_order_with_other_changes(qapp, tmp_path):
+    """Test that edits queue behind earlier writes on the worker pool instead of overtaking them."""
+    handler = FileSystemHandler(use_worker_pool=True)
+    test_file = tmp_path / "notes.txt"
+    handler.createFile(str(test_file), "hello world")
+    result = apply_edits(handler, test_file, {"edits": [{"offset": 0, "delete": 5, "insert": "HELLO"}]})
+    assert "error" not in result and test_file.read_text() == "HELLO world"
+
+def test_follow_file(fs_handler, tmp_path):
+    """Test following a file through the handler."""
+    log = tmp_path / "app.log"
+    log.write_text("x")
+    follow_id = fs_handler.followFile(str(log), -1)
+    assert follow_id
+    fs_handler.unfollowFile(follow_id)
+    assert fs_handler.followFile(str(tmp_path / "missing.log"), 0) == ""
+
+def test_watch_directory_pushes_deltas(fs_handler, tmp_path):
+    """Test that a watched directory's changes are pushed as deltas."""
+    fs_handler.base_path = str(tmp_path)
+    page = json.loads(fs_handler.nextListingPage(fs_handler.openListing("", 10)))
+    pushed = []
+    fs_handler.data_push.dataPushed.connect(lambda topic, payload: pushed.append((topic, payload)))
+    watch_id = fs_handler.watchDirectory("", page["version"])
+    assert watch_id
+    (tmp_path / "new.txt").write_text("x")
+    fs_handler._push_directory_changes(watch_id, str(tmp_path))
+    fs_handler._push_directory_changes(watch_id, str(tmp_path))
+    assert len(pushed) == 1
+    topic, delta = pushed[0]
+    assert topic == "directoryChanged" and delta["watchId"] == watch_id
+    assert [e["name"] for e in delta["added"]] == ["new.txt"]
+    fs_handler.unwatchDirectory(watch_id)
+    assert fs_handler.watchDirectory("missing", "") == ""
+
+def test_query_directory(fs_handler, tmp_path):
+    """Test filtering a directory through the handler."""
+    fs_handler.base_path = str(tmp_path)
+    (tmp_path / "a.log").write_text("a")
+    (tmp_path / "b.txt").write_text("b")
+    result = json.loads(fs_handler.queryDirectory("", json.dumps({"glob": "*.log"})))
+    assert [e["path"] for e in result["entries"]] == ["a.log"]
+    assert json.loads(fs_handler.queryDirectory("", json.dumps({"regex": "("})))["error"]
+
+def test_list_tree(fs_handler, tmp_path):
+    """Test that a tree listing is pushed in batches and then summarized."""
+    fs_handler.base_path = str(tmp_path)
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "a.txt").write_text("a")
+    pushed = []
+    fs_handler.data_push.dataPushed.connect(lambda topic, payload: pushed.append(payload) if topic == "treeNodes" else None)
+    job_id = fs_handler.listTree("", 3, 0)
+    assert [n["path"] for batch in pushed for n in batch["nodes"]] == ["sub", os.path.join("sub", "a.txt")]
+    assert pushed[-1]["done"] and pushed[-1]["count"] == 2 and pushed[-1]["jobId"] == job_id
+
+def test_search_contents(fs_handler, tmp_path):
+    """Test that search matches are pushed in batches and then summarized."""
+    fs_handler.base_path = str(tmp_path)
+    (tmp_path / "notes.txt").write_text("alpha\nbeta alpha\n")
+    pushed = []
+    fs_handler.data_push.dataPushed.connect(lambda topic, payload: pushed.append(payload) if topic == "searchResults" else None)
+    job_id = fs_handler.searchContents("", "alpha", json.dumps({"maxResults": 10}))
+    assert [(m["line"], m["column"]) for batch in pushed for m in batch["matches"]] == [(1, 1), (2, 6)]
+    assert pushed[-1]["done"] and pushed[-1]["count"] == 2 and pushed[-1]["jobId"] == job_id
+    assert fs_handler.searchContents("", "(", json.dumps({"regex": True})) == ""
+
+def test_find_duplicates(fs_handler, tmp_path):
+    """Test that duplicate groups are pushed and hashes are cached."""
+    fs_handler.base_path = str(tmp_path)
+    (tmp_path / "a.txt").write_text("twin")
+    (tmp_path / "b.txt").write_text("twin")
+    pushed = []
+    fs_handler.data_push.dataPushed.connect(lambda topic, payload: pushed.append(payload) if topic == "duplicates" else None)
+    job_id = fs_handler.findDuplicates("")
+    assert [group["paths"] for event in pushed for group in event["groups"]] == [["a.txt", "b.txt"]]
+    assert pushed[-1]["done"] and pushed[-1]["count"] == 1 and pushed[-1]["jobId"] == job_id
+    fs_handler.findDuplicates("")
+    assert json.loads(fs_handler.getCacheStats())["hash"]["hits"] == 2
+
+def test_browse_archive(fs_handler, tmp_path):
+    """Test listing and reading inside a zip as if it were a directory."""
+    fs_handler.base_path = str(tmp_path)
+    with zipfile.ZipFile(tmp_path / "photos.zip", "w") as archive:
+        archive.writestr("2024/notes.txt", "trip notes")
+    handle = fs_handler.openListing("photos.zip", 10)
+    page = json.loads(fs_handler.nextListingPage(handle))
+    assert [e["path"] for e in page["entries"]] == [os.path.join("photos.zip", "2024")]
+    assert page["done"] and "version" not in page
+    member = os.path.join("photos.zip", "2024", "notes.txt")
+    contents = json.loads(fs_handler.getDirectoryContents(os.path.join("photos.zip", "2024")))
+    assert [e["path"] for e in contents] == [member]
+    assert json.loads(fs_handler.readFileRange(member, 5, 100, "utf-8"))["data"] == "notes"
+    assert fs_handler.getFileSize(member) == 10
+    fs_handler.archive_extract_path = str(tmp_path / "extracted")
+    extracted = fs_handler._extract_archive_member(str(tmp_path / "photos.zip"), "2024/notes.txt")
+    assert open(extracted).read() == "trip notes"
+
+def test_archive_index_built_off_the_gui_thread(qapp, tmp_path):
+    """Test that a compressed tar is indexed on the worker pool while listings report it pending."""
+    import tarfile
+    import threading
+    handler = FileSystemHandler(use_worker_pool=True)
+    handler.base_path = str(tmp_path)
+    (tmp_path / "notes.txt").write_text("trip notes")
+    with tarfile.open(tmp_path / "photos.tar.gz", "w:gz") as archive:
+        archive.add(tmp_path / "notes.txt", arcname="notes.txt")
+    pushed = []
+    handler.data_push.dataPushed.connect(lambda topic, payload: pushed.append(payload) if topic == "archiveIndexed" else None)
+    release = threading.Event()
+    build = handler._archive_indexes.get
+    with patch.object(handler._archive_indexes, "get", side_effect=lambda path: release.wait(5) and build(path)):
+        contents = json.loads(handler.getDirectoryContents("photos.tar.gz"))
+        assert [e["name"] for e in contents] == ["Loading..."]
+        assert handler.openListing("photos.tar.gz", 10) == ""
+        member = os.path.join("photos.tar.gz", "notes.txt")
+        assert json.loads(handler.readFileRange(member, 0, 5, "utf-8"))["pending"]
+        assert handler.getFileSize(member) == -1
+        release.set()
+        assert handler.wait_for_workers(5000)
+    qapp.processEvents()
+    assert pushed == [{"path": "photos.tar.gz"}]
+    contents = json.loads(handler.getDirectoryContents("photos.tar.gz"))
+    assert [e["name"] for e in contents] == ["notes.txt"]
+    assert handler.getFileSize(member) == 10
+    assert "not supported" in json.loads(handler.readFileRange(member, 0, 5, "utf-8"))["error"]
+
+def test_listing_slots_inside_archive(fs_handler, tmp_path):
+    """Test that every listing slot lists a directory inside an archive."""
+    fs_handler.base_path = str(tmp_path)
+    with zipfile.ZipFile(tmp_path / "photos.zip", "w") as archive:
+        archive.writestr("2024/notes.txt", "trip notes")
+        archive.writestr("2024/beach.jpg", "jpeg")
+    folder = os.path.join("photos.zip", "2024")
+    listing = json.loads(fs_handler.getDirectoryListing(folder, json.dumps({"columns": ["name", "size"], "sort": "size"})))
+    assert listing["columns"] == {"name": ["beach.jpg", "notes.txt"], "size": [4, 10]}
+    result = json.loads(fs_handler.queryDirectory(folder, json.dumps({"glob": "*.txt"})))
+    assert [(e["name"], e["archive"]) for e in result["entries"]] == [("notes.txt", True)]
+    delta = json.loads(fs_handler.getDirectoryDelta(folder, ""))
+    assert delta["full"] and sorted(e["name"] for e in delta["entries"]) == ["beach.jpg", "notes.txt"]
+    delta = json.loads(fs_handler.getDirectoryDelta(folder, delta["version"]))
+    assert not delta["full"] and delta["added"] == delta["removed"] == delta["changed"] == []
+    assert sorted(e["name"] for e in json.loads(fs_handler.getCachedDirectoryContents(folder))) == ["beach.jpg", "notes.txt"]
+    pushed = []
+    fs_handler.data_push.dataPushed.connect(lambda topic, payload: pushed.append(payload) if topic == "treeNodes" else None)
+    fs_handler.listTree("photos.zip", 3, 0)
+    nodes = [n for batch in pushed for n in batch["nodes"]]
+    assert sorted(n["path"] for n in nodes) == [folder, os.path.join(folder, "beach.jpg"), os.path.join(folder, "notes.txt")]
+    assert all(n["archive"] for n in nodes) and pushed[-1]["count"] == 3
+
+def test_plain_listings_skip_archive_lookup(fs_handler, tmp_path):
+    """Test that archives are only looked for once a path fails to list as a directory."""
+    fs_handler.base_path = str(tmp_path)
+    (tmp_path / "plain").mkdir()
+    with zipfile.ZipFile(tmp_path / "photos.zip", "w") as archive:
+        archive.writestr("notes.txt", "trip notes")
+    from wodabrowser import file_system_handler
+    with patch.object(file_system_handler, "split_archive_path", wraps=file_system_handler.split_archive_path) as lookup:
+        fs_handler.getDirectoryContents("plain")
+        fs_handler.requestDirectoryContents("plain")
+        fs_handler.openListing("plain", 10)
+        fs_handler.getDirectoryListing("plain", "")
+        fs_handler.queryDirectory("plain", "")
+        fs_handler.getDirectoryDelta("plain", "")
+        fs_handler.listTree("plain", 2, 0)
+        assert lookup.call_count == 0
+        contents = json.loads(fs_handler.getDirectoryContents("photos.zip"))
+        assert [e["name"] for e in contents] == ["notes.txt"]
+        assert lookup.call_count == 1
+
+def test_list_volumes(fs_handler):
+    """Test that volumes are listed without waiting for capacities."""
+    result = json.loads(fs_handler.listVolumes())
+    assert "error" not in result
+    assert all(v["kind"] in ("local", "removable", "network") for v in result["volumes"])
@@ -0,0 +1,44 @@
+import pytest
+import os
+from PyQt6.QtGui import QImage, QColor, QImageReader
+from wodabrowser.thumbnails import ensure_thumbnail, thumbnail_path, ThumbnailService, _png_text
+
+@pytest.fixture
+def image_file(tmp_path):
+    """Create a 400x200 PNG image."""
+    image = QImage(400, 200, QImage.Format.Format_RGB32)
+    image.fill(QColor("red"))
+    path = tmp_path / "photo.png"
+    image.save(str(path))
+    return path
+
+def test_thumbnail_is_scaled_and_tagged(qapp, image_file, tmp_path):
+    """Test that thumbnails keep the aspect ratio and record the source mtime and size."""
+    thumb = ensure_thumbnail(str(tmp_path / "thumbs"), str(image_file))
+    assert thumb == thumbnail_path(str(tmp_path / "thumbs"), str(image_file), "normal")
+    reader = QImageReader(thumb)
+    assert reader.size().width() == 128 and reader.size().height() == 64
+    assert _png_text(thumb)["Thumb::Size"] == str(image_file.stat().st_size)
+
+def test_thumbnail_regenerated_when_source_changes(qapp, image_file, tmp_path):
+    """Test that a cached thumbnail is reused until its source file changes."""
+    thumbs = str(tmp_path / "thumbs")
+    thumb = ensure_thumbnail(thumbs, str(image_file))
+    first_mtime = os.stat(thumb).st_mtime_ns
+    assert os.stat(ensure_thumbnail(thumbs, str(image_file))).st_mtime_ns == first_mtime
+    image = QImage(100, 300, QImage.Format.Format_RGB32)
+    image.fill(QColor("blue"))
+    image.save(str(image_file))
+    assert QImageReader(ensure_thumbnail(thumbs, str(image_file))).size().height() == 128
+
+def test_thumbnail_service_reports_failures(qapp, tmp_path):
+    """Test that files that are not images are reported with an empty path."""
+    not_image = tmp_path / "notes.png"
+    not_image.write_text("not an image")
+    service = ThumbnailService(str(tmp_path / "thumbs"))
+    ready = []
+    service.thumbnailReady.connect(lambda request_id, path: ready.append((request_id, path)))
+    request_id = service.request(str(not_image))
+    assert service.wait_for_done(5000)
+    qapp.processEvents()
+    assert ready == [(request_id, "")]
@@ -0,0 +1,37 @@
+import pytest
+import os
+from wodabrowser.tree_listing import TreeListingJob
+
+@pytest.fixture
+def tree(tmp_path):
+    """Create a three-level tree with a symlinked directory."""
+    (tmp_path / "a" / "b" / "c").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "c" / "deep.txt").write_text("x")
+    (tmp_path / "a" / "one.txt").write_text("x")
+    (tmp_path / "top.txt").write_text("x")
+    os.symlink(tmp_path / "a", tmp_path / "link")
+    return tmp_path
+
+def run_tree(tree, max_depth, max_entries=1000):
+    batches = []
+    job = TreeListingJob(str(tree), str(tree), max_depth, max_entries, batches.append)
+    summary = job.run()
+    return [node for batch in batches for node in batch], summary
+
+def test_tree_breadth_first_with_depth_limit(tree):
+    """Test that nodes come level by level and stop at the depth limit."""
+    nodes, summary = run_tree(tree, 2)
+    assert [n["depth"] for n in nodes] == sorted(n["depth"] for n in nodes)
+    assert sorted(n["path"] for n in nodes) == ["a", os.path.join("a", "b"), os.path.join("a", "one.txt"), "link", "top.txt"]
+    assert summary == {"count": 5, "truncated": False, "cancelled": False, "errors": 0}
+    assert next(n for n in nodes if n["name"] == "b")["parent"] == "a"
+
+def test_tree_entry_limit(tree):
+    """Test that the walk stops at the entry limit and reports truncation."""
+    nodes, summary = run_tree(tree, 10, max_entries=3)
+    assert len(nodes) == 3 and summary["truncated"]
+
+def test_tree_missing_root(tmp_path):
+    """Test that a missing root fails the job."""
+    with pytest.raises(NotADirectoryError):
+        TreeListingJob(str(tmp_path / "missing"), str(tmp_path), 2, 10).run()
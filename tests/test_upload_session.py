@@ -0,0 +1,38 @@
+import pytest
+import os
+from wodabrowser.upload_session import UploadSession
+
+def test_upload_in_chunks(tmp_path):
+    """Test writing chunks and committing them under the target name."""
+    session = UploadSession(str(tmp_path), "data.bin", 6)
+    assert session.append(0, b"abc") == 3
+    assert not (tmp_path / "data.bin").exists()
+    session.append(3, b"def")
+    assert session.commit() == str(tmp_path / "data.bin")
+    assert (tmp_path / "data.bin").read_bytes() == b"abcdef"
+    assert os.listdir(tmp_path) == ["data.bin"]
+
+def test_upload_resume_after_failed_chunk(tmp_path):
+    """Test that a chunk may be resent from an earlier offset but not skip ahead."""
+    session = UploadSession(str(tmp_path), "resume.txt", 4)
+    session.append(0, b"ab")
+    with pytest.raises(ValueError):
+        session.append(3, b"d")
+    session.append(1, b"bcd")
+    session.commit()
+    assert (tmp_path / "resume.txt").read_bytes() == b"abcd"
+
+def test_upload_incomplete_and_abort(tmp_path):
+    """Test that an incomplete upload cannot commit and abort removes its temp file."""
+    session = UploadSession(str(tmp_path), "part.txt", 10)
+    session.append(0, b"x")
+    with pytest.raises(ValueError):
+        session.commit()
+    session.abort()
+    assert os.listdir(tmp_path) == []
+
+def test_upload_rejects_bad_names(tmp_path):
+    """Test that file names cannot escape the target directory."""
+    assert UploadSession(str(tmp_path), "../evil.txt", 0).target_path == str(tmp_path / "evil.txt")
+    with pytest.raises(ValueError):
+        UploadSession(str(tmp_path), "..", 0)
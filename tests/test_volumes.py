@@ -0,0 +1,65 @@
+import pytest
+import os
+import threading
+import time
+from wodabrowser import volumes as volumes_module
+from wodabrowser.volumes import parse_mountinfo, classify_mount, VolumeMonitor
+
+MOUNTINFO = """\
+22 1 8:2 / / rw,relatime shared:1 - ext4 /dev/sda2 rw
+23 22 0:21 / /proc rw,nosuid shared:12 - proc proc rw
+24 22 0:45 / /mnt/my\\040share rw,relatime shared:30 - cifs //server/share rw,vers=3.0
+25 22 8:17 / /media/usb ro,relatime shared:31 - vfat /dev/sdb1 ro
+26 22 0:50 / /tmp rw - tmpfs tmpfs rw
+"""
+
+def test_parse_mountinfo():
+    """Test that fields are split and escapes are undone."""
+    mounts = parse_mountinfo(MOUNTINFO)
+    assert [m["mount_point"] for m in mounts] == ["/", "/proc", "/mnt/my share", "/media/usb", "/tmp"]
+    assert mounts[2]["fs_type"] == "cifs" and mounts[2]["source"] == "//server/share"
+    assert mounts[3]["read_only"] and not mounts[0]["read_only"]
+
+def test_classify_mount():
+    """Test local, removable, network and pseudo classification."""
+    kinds = [classify_mount(m) for m in parse_mountinfo(MOUNTINFO)]
+    assert kinds == ["local", None, "network", "removable", None]
+
+def test_volume_monitor_caches_capacity(tmp_path):
+    """Test that capacity is unknown until refreshed and then cached."""
+    mountinfo = tmp_path / "mountinfo"
+    mountinfo.write_text(f"22 1 8:2 / {tmp_path} rw - ext4 /dev/sda2 rw\n")
+    monitor = VolumeMonitor(str(mountinfo), ttl=60)
+    volumes = monitor.volumes()
+    assert volumes[0]["capacity"] is None and monitor.needs_refresh()
+    volumes = monitor.refresh()
+    assert volumes[0]["capacity"]["total"] > 0
+    assert not monitor.needs_refresh()
+
+def test_only_timed_out_mounts_are_unresponsive(tmp_path, monkeypatch):
+    """Test that a refresh in progress marks only the mount whose own call timed out."""
+    (tmp_path / "fast").mkdir()
+    (tmp_path / "slow").mkdir()
+    mountinfo = tmp_path / "mountinfo"
+    mountinfo.write_text(f"22 1 8:2 / {tmp_path / 'fast'} rw - ext4 /dev/sda2 rw\n"
+                         f"23 1 0:45 / {tmp_path / 'slow'} rw - nfs server:/export rw\n")
+    release = threading.Event()
+    real_statvfs = os.statvfs
+    def statvfs(path):
+        if path.endswith("slow"):
+            release.wait(5)
+        return real_statvfs(path)
+    monkeypatch.setattr(volumes_module.os, "statvfs", statvfs)
+    monitor = VolumeMonitor(str(mountinfo), ttl=60, statvfs_timeout=0.3)
+    refresh = threading.Thread(target=monitor.refresh)
+    refresh.start()
+    try:
+        time.sleep(0.1)
+        assert not any(volume["unresponsive"] for volume in monitor.volumes())
+        refresh.join(5)
+        by_point = {volume["mount_point"]: volume for volume in monitor.volumes()}
+        assert not by_point[str(tmp_path / "fast")]["unresponsive"]
+        assert by_point[str(tmp_path / "slow")]["unresponsive"]
+    finally:
+        release.set()
+        refresh.join(5)
@@ -1,4 +1,12 @@
 """WodaBrowser package."""
-from .browser import main
-
 __version__ = "0.1.0"
+
+
+def main() -> None:
+    """Run the browser.
+
+    Qt is imported only here, so processes that import a submodule (such
+    as content search workers) do not load it.
+    """
+    from .browser import main as browser_main
+    browser_main()
@@ -0,0 +1,325 @@
+import bz2
+import contextlib
+import datetime
+import gzip
+import io
+import lzma
+import os
+import shutil
+import stat
+import tarfile
+import typing
+import zipfile
+try:
+    from .file_reader import range_result
+except ImportError:
+    from file_reader import range_result
+
+ZIP_SUFFIXES = ('.zip', '.jar')
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+ARCHIVE_SUFFIXES = ZIP_SUFFIXES + TAR_SUFFIXES
+
+# Approximate footprint of one indexed member, used for cache accounting
+ARCHIVE_INDEX_ENTRY_SIZE = 200
+
+# Bytes copied at a time when extracting a member
+ARCHIVE_COPY_CHUNK_SIZE = 1024 * 1024
+
+# Magic bytes of the compressions a tar may be wrapped in, and how to open each
+_TAR_COMPRESSIONS = ((b'\x1f\x8b', gzip.open), (b'BZh', bz2.open), (b'\xfd7zXZ\x00', lzma.open))
+
+
+class ArchiveIndexPending(Exception):
+    """The archive's index is still being built; the caller should retry once it is ready."""
+
+
+def is_archive(name: str) -> bool:
+    return name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def split_archive_path(full_path: str) -> typing.Optional[typing.Tuple[str, str]]:
+    """Split a path inside an archive into (archive path, member path).
+
+    The member path uses '/' and is '' for the archive's root. Returns None
+    for paths that exist on disk (other than archives themselves) or do
+    not lead into an archive; archives inside archives are not opened.
+    """
+    path = os.path.normpath(full_path)
+    inner = []
+    while True:
+        if os.path.isfile(path):
+            return (path, '/'.join(reversed(inner))) if is_archive(path) else None
+        if os.path.exists(path):
+            return None
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        inner.append(os.path.basename(path))
+        path = parent
+
+
+def _member_name(name: str) -> typing.Optional[str]:
+    """Normalize a stored member name, or None for names that climb out of the archive."""
+    parts = [part for part in name.replace('\\', '/').split('/') if part and part != '.']
+    if not parts or '..' in parts:
+        return None
+    return '/'.join(parts)
+
+
+def _zip_mtime(date_time: tuple) -> float:
+    """Zip timestamps are local time without a zone, like the file managers that wrote them."""
+    try:
+        return datetime.datetime(*date_time).timestamp()
+    except (ValueError, OverflowError):
+        return 0.0
+
+
+class ArchiveStat(typing.NamedTuple):
+    """The part of os.stat_result the listing code reads, for an archive member."""
+    st_mode: int
+    st_ino: int
+    st_size: int
+    st_mtime: float
+    st_mtime_ns: int
+
+
+class ArchiveDirEntry:
+    """A member of an archive directory, shaped like os.DirEntry for the listing code."""
+
+    __slots__ = ('name', 'path', '_record')
+
+    def __init__(self, record: dict, path: str) -> None:
+        self.name = record['name']
+        self.path = path
+        self._record = record
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        return self._record['is_dir']
+
+    def is_file(self, follow_symlinks: bool = True) -> bool:
+        return not self._record['is_dir']
+
+    def is_symlink(self) -> bool:
+        return False
+
+    def stat(self, follow_symlinks: bool = True) -> ArchiveStat:
+        # Implicit directories have no timestamp of their own
+        mtime = self._record['mtime'] or 0.0
+        mode = (stat.S_IFDIR | 0o755) if self._record['is_dir'] else (stat.S_IFREG | 0o644)
+        return ArchiveStat(mode, 0, self._record['size'], mtime, int(mtime * 1_000_000_000))
+
+
+class _TarMemberFile(io.RawIOBase):
+    """A tar member's data, read straight from its offset in the (decompressed) archive."""
+
+    def __init__(self, raw, start: int, size: int) -> None:
+        self._raw = raw
+        self._start = start
+        self._size = size
+        self._position = 0
+        raw.seek(start)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._raw.read(min(len(buffer), self._size - self._position))
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self._size}[whence]
+        self._position = max(0, min(base + offset, self._size))
+        # Compressed streams seek forward by decompressing, backwards by starting over
+        self._raw.seek(self._start + self._position)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self) -> None:
+        if not self.closed:
+            self._raw.close()
+        super().close()
+
+
+class ArchiveIndex:
+    """Index of the members of a zip or tar archive, by directory.
+
+    A zip's index comes from its central directory, so building it reads
+    only the end of the file. A tar has no central index: an uncompressed
+    one is indexed by hopping from header to header, a compressed one has
+    to be decompressed once. Directories that only appear in member names
+    are added. Member data is never read until a member is opened.
+    Members of compressed tars cannot be read by range: every read would
+    decompress the archive again from its start.
+    """
+
+    def __init__(self, archive_path: str) -> None:
+        self.archive_path = archive_path
+        self.is_zip = archive_path.lower().endswith(ZIP_SUFFIXES)
+        self._open_raw = open
+        self._dirs = {'': {}}  # member directory -> {name: record}
+        self.count = 0
+        if self.is_zip:
+            self._index_zip()
+        else:
+            self._index_tar()
+
+    def _add(self, name: typing.Optional[str], is_dir: bool, size: int, mtime: float, location) -> None:
+        if name is None:
+            return
+        parent, _, base = name.rpartition('/')
+        self._add_dir(parent)
+        if is_dir:
+            self._add_dir(name)
+            self._dirs[parent][base].update(mtime=mtime)
+            return
+        self._dirs[parent][base] = {'name': base, 'is_dir': False, 'size': size, 'mtime': mtime, 'location': location}
+        self.count += 1
+
+    def _add_dir(self, name: str) -> None:
+        if name in self._dirs:
+            return
+        parent, _, base = name.rpartition('/')
+        self._add_dir(parent)
+        self._dirs[name] = {}
+        self._dirs[parent][base] = {'name': base, 'is_dir': True, 'size': 0, 'mtime': None, 'location': None}
+        self.count += 1
+
+    def _index_zip(self) -> None:
+        with zipfile.ZipFile(self.archive_path) as archive:
+            for info in archive.infolist():
+                mtime = _zip_mtime(info.date_time)
+                self._add(_member_name(info.filename), info.is_dir(), info.file_size, mtime, info.filename)
+
+    def _index_tar(self) -> None:
+        with open(self.archive_path, 'rb') as f:
+            magic = f.read(6)
+        for prefix, opener in _TAR_COMPRESSIONS:
+            if magic.startswith(prefix):
+                self._open_raw = opener
+        with tarfile.open(self.archive_path, 'r:*') as archive:
+            for info in archive:
+                if info.isdir():
+                    self._add(_member_name(info.name), True, 0, info.mtime, None)
+                elif info.isreg() and not info.issparse():
+                    self._add(_member_name(info.name), False, info.size, info.mtime, info.offset_data)
+
+    @property
+    def seekable(self) -> bool:
+        """Whether a member's data can be reached without decompressing everything before it."""
+        return self.is_zip or self._open_raw is open
+
+    def list(self, inner: str, rel_path: str) -> typing.List[dict]:
+        """Listing entries of a directory in the archive, with paths under rel_path."""
+        if inner not in self._dirs:
+            record = self.member(inner)
+            raise NotADirectoryError(f"Not a directory in archive: {record['name']}")
+        return [{
+            'name': record['name'],
+            'is_dir': record['is_dir'],
+            'is_file': not record['is_dir'],
+            'path': record['name'] if rel_path == '.' else os.path.join(rel_path, record['name']),
+            'archive': True
+        } for record in self._dirs[inner].values()]
+
+    def scandir(self, path: str) -> typing.ContextManager[typing.List[ArchiveDirEntry]]:
+        """List the archive directory at a full path under the archive, like os.scandir."""
+        rel_path = os.path.relpath(path, self.archive_path)
+        inner = '' if rel_path == '.' else rel_path.replace(os.sep, '/')
+        if inner not in self._dirs:
+            record = self.member(inner)
+            raise NotADirectoryError(f"Not a directory in archive: {record['name']}")
+        return contextlib.nullcontext([ArchiveDirEntry(record, os.path.join(path, record['name']))
+                                       for record in self._dirs[inner].values()])
+
+    def member(self, inner: str) -> dict:
+        parent, _, base = inner.rpartition('/')
+        record = self._dirs.get(parent, {}).get(base)
+        if record is None:
+            raise FileNotFoundError(f"No such member in {self.archive_path}: {inner}")
+        return record
+
+    def open(self, inner: str) -> typing.BinaryIO:
+        """Open a member for reading; its data is decompressed as it is read."""
+        record = self.member(inner)
+        if record['is_dir']:
+            raise IsADirectoryError(f"Member is a directory: {inner}")
+        if self.is_zip:
+            with zipfile.ZipFile(self.archive_path) as archive:
+                # The member keeps the archive file open until it is closed itself
+                return archive.open(record['location'])
+        return io.BufferedReader(_TarMemberFile(self._open_raw(self.archive_path, 'rb'), record['location'], record['size']))
+
+    def read_range(self, inner: str, offset: int, length: int, encoding: str = '') -> dict:
+        """Read part of a member; the result is shaped like file_reader.read_range's."""
+        if offset < 0 or length < 0:
+            raise ValueError("Offset and length must not be negative")
+        if not self.seekable:
+            raise ValueError("Ranged reads are not supported inside compressed tar archives; open the member instead")
+        size = self.member(inner)['size']
+        with self.open(inner) as f:
+            f.seek(offset)
+            data = f.read(max(0, min(length, size - offset)))
+        return range_result(data, offset, size, encoding)
+
+    def extract(self, inner: str, destination: str) -> None:
+        """Stream one member to a file, keeping its modification time."""
+        record = self.member(inner)
+        with self.open(inner) as src, open(destination, 'wb') as dst:
+            shutil.copyfileobj(src, dst, ARCHIVE_COPY_CHUNK_SIZE)
+        os.utime(destination, (record['mtime'], record['mtime']))
+
+
+class ArchiveIndexes:
+    """Archive indexes kept in an LRUCache, rebuilt when an archive's mtime or size changes."""
+
+    def __init__(self, cache) -> None:
+        self.cache = cache
+
+    def get(self, archive_path: str) -> ArchiveIndex:
+        stat = os.stat(archive_path)
+        tag = (stat.st_mtime_ns, stat.st_size)
+        index = self.cache.get(archive_path, tag)
+        if index is None:
+            index = ArchiveIndex(archive_path)
+            self.cache.put(archive_path, index, index.count * ARCHIVE_INDEX_ENTRY_SIZE, tag)
+        return index
+
+    def peek(self, archive_path: str) -> typing.Optional[ArchiveIndex]:
+        """Return the archive's index if it is cached and current, without building it."""
+        stat = os.stat(archive_path)
+        return self.cache.get(archive_path, (stat.st_mtime_ns, stat.st_size))
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+class ArchiveListingCursor:
+    """Pages through the entries of a directory inside an archive like a ListingCursor.
+
+    The archive index is already in memory, so there is no snapshot to
+    version and nothing to release on close.
+    """
+
+    def __init__(self, entries: typing.List[dict], full_path: str, page_size: int) -> None:
+        self.full_path = full_path
+        self.page_size = max(1, page_size)
+        self.position = 0
+        self.done = False
+        self.snapshot = None
+        self._entries = entries
+
+    def next_page(self) -> typing.List[dict]:
+        page = [] if self.done else self._entries[self.position:self.position + self.page_size]
+        self.position += len(page)
+        self.done = self.position >= len(self._entries)
+        return page
+
+    def close(self) -> None:
+        self.done = True
@@ -0,0 +1,180 @@
+import os
+import shutil
+import typing
+import uuid
+
+
+class BatchJournal:
+    """Undo log for a transactional batch.
+
+    Files about to be deleted are renamed to a hidden backup next to them,
+    which costs one rename whatever their size. Files about to be
+    overwritten are copied to the backup instead and then written in
+    place, so they keep their inode and with it their mode, owner, extended
+    attributes and hard links; rollback copies the content back the same
+    way. ``commit`` deletes the backups and ``rollback`` undoes every
+    recorded step in reverse order.
+    """
+
+    def __init__(self) -> None:
+        self.batch_id = uuid.uuid4().hex[:12]
+        self._steps = []  # (kind, path, backup)
+
+    def _backup_path(self, full_path: str) -> str:
+        # The step number keeps backups apart when one batch touches a file twice
+        backup_name = f".{os.path.basename(full_path)}.{self.batch_id}.{len(self._steps)}.bak"
+        return os.path.join(os.path.dirname(full_path), backup_name)
+
+    def backup(self, full_path: str) -> None:
+        """Move an existing file aside so it can be restored on rollback."""
+        backup_path = self._backup_path(full_path)
+        os.rename(full_path, backup_path)
+        self._steps.append(('restore', full_path, backup_path))
+
+    def backup_content(self, full_path: str) -> None:
+        """Copy a file's content aside before it is overwritten in place."""
+        backup_path = self._backup_path(full_path)
+        shutil.copyfile(full_path, backup_path)
+        self._steps.append(('restore_content', full_path, backup_path))
+
+    def created_file(self, full_path: str) -> None:
+        self._steps.append(('remove_file', full_path, None))
+
+    def created_directory(self, full_path: str) -> None:
+        self._steps.append(('remove_directory', full_path, None))
+
+    def deleted_directory(self, full_path: str) -> None:
+        self._steps.append(('make_directory', full_path, None))
+
+    def commit(self) -> None:
+        for kind, _, backup_path in self._steps:
+            if kind in ('restore', 'restore_content'):
+                try:
+                    os.remove(backup_path)
+                except OSError as e:
+                    print(f"Error removing batch backup {backup_path}: {e}")
+        self._steps = []
+
+    def rollback(self) -> typing.List[str]:
+        """Undo all steps; returns the paths that could not be restored."""
+        failed = []
+        for kind, full_path, backup_path in reversed(self._steps):
+            try:
+                if kind == 'restore':
+                    os.replace(backup_path, full_path)
+                elif kind == 'restore_content':
+                    with open(backup_path, 'rb') as src, open(full_path, 'r+b') as dst:
+                        shutil.copyfileobj(src, dst)
+                        dst.truncate()
+                    os.remove(backup_path)
+                elif kind == 'remove_file':
+                    # Recorded before the write, which may have failed to create it
+                    if os.path.lexists(full_path):
+                        os.remove(full_path)
+                elif kind == 'remove_directory':
+                    os.rmdir(full_path)
+                elif kind == 'make_directory':
+                    os.mkdir(full_path)
+            except OSError as e:
+                print(f"Error rolling back {full_path}: {e}")
+                failed.append(full_path)
+        self._steps = []
+        return failed
+
+
+def _write_file(full_path: str, content: str, journal: typing.Optional[BatchJournal]) -> None:
+    if journal is not None:
+        if os.path.isfile(full_path):
+            journal.backup_content(full_path)
+        else:
+            journal.created_file(full_path)
+    with open(full_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def _make_directories(full_path: str, journal: typing.Optional[BatchJournal]) -> None:
+    # Record each level that did not exist so rollback removes only those
+    missing = []
+    path = full_path
+    while path and not os.path.isdir(path):
+        missing.append(path)
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    for path in reversed(missing):
+        os.mkdir(path)
+        if journal is not None:
+            journal.created_directory(path)
+
+
+def apply_operation(op: dict, full_path: str, journal: typing.Optional[BatchJournal] = None) -> None:
+    """Apply one batch operation to an already resolved path."""
+    kind = op.get('op')
+    if kind == 'createFile':
+        _make_directories(os.path.dirname(full_path), journal)
+        _write_file(full_path, op.get('content', ''), journal)
+    elif kind == 'changeFileContent':
+        if not os.path.isfile(full_path):
+            raise FileNotFoundError(f"No such file: {op.get('path')}")
+        _write_file(full_path, op.get('content', ''), journal)
+    elif kind == 'deleteFile':
+        if journal is not None:
+            if not os.path.isfile(full_path):
+                raise FileNotFoundError(f"No such file: {op.get('path')}")
+            journal.backup(full_path)
+        else:
+            os.remove(full_path)
+    elif kind == 'createDirectory':
+        _make_directories(full_path, journal)
+    elif kind == 'deleteDirectory':
+        os.rmdir(full_path)  # Only works for empty directories
+        if journal is not None:
+            journal.deleted_directory(full_path)
+    else:
+        raise ValueError(f"Unknown batch operation: {kind}")
+
+
+def run_batch(ops: typing.List[dict], resolve: typing.Callable[[str], str], transactional: bool = False) -> dict:
+    """Apply operations in order and return per-operation results.
+
+    ``results[i]`` is None when operation i succeeded and its error message
+    otherwise. Without ``transactional`` every operation is attempted. With
+    it, the first failure rolls back everything applied so far, and later
+    operations are reported as skipped. ``changed`` lists the resolved
+    paths that were touched, for cache invalidation.
+    """
+    journal = BatchJournal() if transactional else None
+    results = []
+    changed = []
+    failed = False
+    for op in ops:
+        if failed and transactional:
+            results.append('Skipped after an earlier failure')
+            continue
+        try:
+            if not isinstance(op, dict) or not op.get('path'):
+                raise ValueError("Operation needs an op and a path")
+            full_path = resolve(op['path'])
+            apply_operation(op, full_path, journal)
+            changed.append(full_path)
+            results.append(None)
+        except Exception as e:
+            failed = True
+            results.append(str(e))
+
+    rolled_back = False
+    rollback_errors = []
+    if journal is not None:
+        if failed:
+            rollback_errors = journal.rollback()
+            rolled_back = True
+        else:
+            journal.commit()
+    return {
+        'results': results,
+        'failed': sum(1 for r in results if r is not None),
+        'rolled_back': rolled_back,
+        'rollback_errors': rollback_errors,
+        'changed': changed
+    }
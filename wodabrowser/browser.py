@@ -81,9 +81,15 @@ import re
 try:
     from .file_system_handler import FileSystemHandler
     from .web_channel_extension import EnhancedWebChannel
+    from .file_scheme import FILE_SCHEME, FileSchemeHandler, register_file_scheme
+    from .thumbnails import ThumbnailService
+    from .data_push import DataPushChannel
 except ImportError:
     from file_system_handler import FileSystemHandler
     from web_channel_extension import EnhancedWebChannel
+    from file_scheme import FILE_SCHEME, FileSchemeHandler, register_file_scheme
+    from thumbnails import ThumbnailService
+    from data_push import DataPushChannel
 from functools import partial
 from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEngineDownloadRequest
 
@@ -375,12 +381,20 @@ class Browser(QMainWindow):
             # Create web channel
             self.channel = EnhancedWebChannel(self)
             # Create handlers as instance variables at once
-            self.file_system_handler = FileSystemHandler(self)
+            self.data_push = DataPushChannel(self)
+            self.file_system_handler = FileSystemHandler(self, use_worker_pool=True, data_push=self.data_push)
             self.code_executor = CodeExecutor(self)
+            # Serve files under the handler's base path to pages as woda-fs:// URLs
+            self.thumbnail_service = ThumbnailService(parent=self)
+            self.file_scheme_handler = FileSchemeHandler(self.file_system_handler, self.thumbnail_service, self)
+            profile = QWebEngineProfile.defaultProfile()
+            profile.removeUrlScheme(FILE_SCHEME)
+            profile.installUrlSchemeHandler(FILE_SCHEME, self.file_scheme_handler)
             # Store strong references
             self._handlers = {
                 'fileSystemHandler': self.file_system_handler,
-                'codeExecutor': self.code_executor
+                'codeExecutor': self.code_executor,
+                'dataPush': self.data_push
             }
             # Register with web channel
             for name, handler in self._handlers.items():
@@ -650,10 +664,6 @@ class Browser(QMainWindow):
             # Set web channel before connecting signals
             page.setWebChannel(self.channel)
             
-            # Set the browser page reference in file_system_handler
-            if hasattr(self, 'file_system_handler') and self.file_system_handler:
-                self.file_system_handler.browser_page = page
-            
             # Connect tab signals
             new_tab.browser.titleChanged.connect(
                 lambda title, tab=new_tab: self.update_tab_title(tab, title)
@@ -929,16 +939,9 @@ class Browser(QMainWindow):
 
     @pyqtSlot(str, str)
     def handle_file_read(self, filePath: str, content: str) -> None:
-        print(f"File {filePath} read successfully. Content: {content}")
-        # Pass the content back to the web page using runJavaScript
-        script = f"""
-            (function(filePath, content) {{
-                if (window.readFileCallback) {{
-                    window.readFileCallback(content);
-                }}
-            }})('{filePath}', `{content}`);
-        """
-        self.current_browser().page().runJavaScript(script)
+        # The handler pushes the content to the page that asked for it, or to
+        # window.readFileCallback for pages that read without a request id
+        print(f"File {filePath} read successfully ({len(content)} characters)")
 
     def load_saved_tabs(self) -> None:
         saved_urls = self.settings.value("openTabs", [])
@@ -950,6 +953,8 @@ class Browser(QMainWindow):
 
 def main() -> None:
     """Main function to run the Web4x Browser."""
+    # Custom schemes must be registered before the application is created
+    register_file_scheme()
     app = QApplication(sys.argv)
     QApplication.setApplicationName(BROWSER_TITLE)
     window = Browser()
@@ -0,0 +1,130 @@
+import os
+import threading
+import typing
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and total size in bytes.
+
+    Each entry may carry a validator tag (for example a directory mtime). A
+    lookup with a different tag drops the entry and counts as a miss.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # key -> (value, size, tag)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: typing.Hashable, tag: typing.Any = None) -> typing.Any:
+        """Return the cached value for key, or None if absent or stale."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            if item[2] != tag:
+                self._remove(key)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: typing.Hashable, value: typing.Any, size: int, tag: typing.Any = None) -> None:
+        """Store a value, evicting least recently used entries to stay in bounds."""
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._items[key] = (value, size, tag)
+            self.current_bytes += size
+            while len(self._items) > self.max_entries or self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._items))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key: typing.Hashable) -> bool:
+        """Drop a single entry; returns whether it was present."""
+        with self._lock:
+            if key not in self._items:
+                return False
+            self._remove(key)
+            self.invalidations += 1
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """Return counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._items),
+                'bytes': self.current_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _remove(self, key: typing.Hashable) -> None:
+        _, size, _ = self._items.pop(key)
+        self.current_bytes -= size
+
+
+def directory_mtime(full_path: str) -> typing.Optional[int]:
+    """Return a directory's mtime in nanoseconds, or None if it cannot be read."""
+    try:
+        return os.stat(full_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class DirectoryCache:
+    """Serialized directory listings keyed by path and validated by directory mtime."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024) -> None:
+        self._cache = LRUCache(max_entries, max_bytes)
+
+    @staticmethod
+    def _key(full_path: str) -> str:
+        return os.path.normpath(full_path)
+
+    def get(self, full_path: str) -> typing.Optional[str]:
+        """Return the cached listing if the directory has not changed since."""
+        return self._cache.get(self._key(full_path), directory_mtime(full_path))
+
+    def put(self, full_path: str, listing: str, mtime: typing.Optional[int]) -> None:
+        """Cache a listing taken when the directory had the given mtime."""
+        self._cache.put(self._key(full_path), listing, len(listing), mtime)
+
+    def invalidate(self, full_path: str) -> bool:
+        return self._cache.invalidate(self._key(full_path))
+
+    def invalidate_parent(self, full_path: str) -> bool:
+        """Invalidate the listing of the directory containing full_path."""
+        return self.invalidate(os.path.dirname(os.path.normpath(full_path)))
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+    def __len__(self) -> int:
+        return len(self._cache)
@@ -0,0 +1,292 @@
+import fnmatch
+import mmap
+import multiprocessing
+import os
+import re
+import threading
+import typing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Worker processes searching files at the same time
+SEARCH_PROCESSES = min(8, os.cpu_count() or 1)
+
+# Files handed to a worker per task; small files are grouped so the cost of
+# a round trip to the worker is shared, large ones are searched alone
+SEARCH_TASK_FILES = 64
+SEARCH_TASK_BYTES = 16 * 1024 * 1024
+
+# Files up to this size are read whole, larger ones are mapped
+SEARCH_MMAP_THRESHOLD = 4 * 1024 * 1024
+
+# Bytes of a mapped file searched at a time, extended to the next line end
+SEARCH_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Bytes inspected for a NUL to tell binary files from text, like grep
+BINARY_SNIFF_BYTES = 8192
+
+# Characters of a matching line sent with each match
+SEARCH_MAX_LINE_LENGTH = 500
+
+# Matches per streamed batch
+SEARCH_BATCH_SIZE = 200
+
+_mp_context = None
+_mp_context_lock = threading.Lock()
+
+_cancel_event = None
+
+
+def _process_context():
+    """The multiprocessing context for worker processes, set up by the first search that needs one.
+
+    Workers are started from a fork server rather than forked from the
+    multithreaded GUI process. The server preloads only this module, which
+    needs nothing beyond the standard library, so importing it has no
+    effect on multiprocessing until a search actually starts workers.
+    """
+    global _mp_context
+    with _mp_context_lock:
+        if _mp_context is None:
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                _mp_context = multiprocessing.get_context('forkserver')
+                _mp_context.set_forkserver_preload([__name__])
+            else:
+                _mp_context = multiprocessing.get_context('spawn')
+        return _mp_context
+
+
+def _init_worker(cancel_event) -> None:
+    global _cancel_event
+    _cancel_event = cancel_event
+
+
+def _cancelled() -> bool:
+    return _cancel_event is not None and _cancel_event.is_set()
+
+
+def compile_pattern(pattern: str, regex: bool = False, case_sensitive: bool = False,
+                    whole_word: bool = False) -> typing.Pattern[bytes]:
+    """Compile a search pattern for matching the raw UTF-8 bytes of files.
+
+    Without ``regex`` the pattern is a literal string. Case folding and
+    word boundaries only apply to ASCII letters, as files are searched
+    without decoding them.
+    """
+    if not pattern:
+        raise ValueError("Empty search pattern")
+    source = pattern if regex else re.escape(pattern)
+    if whole_word:
+        source = rf'\b(?:{source})\b'
+    flags = re.MULTILINE | (0 if case_sensitive else re.IGNORECASE)
+    return re.compile(source.encode('utf-8'), flags)
+
+
+def _is_binary(data: bytes) -> bool:
+    return b'\0' in data[:BINARY_SNIFF_BYTES]
+
+
+def _search_buffer(data: bytes, regex: typing.Pattern[bytes], path: str, first_line: int,
+                   matches: typing.List[dict], max_matches: int) -> int:
+    """Add matches found in a buffer of whole lines; return the number of lines in it."""
+    line = first_line
+    line_start = 0
+    position = 0
+    for match in regex.finditer(data):
+        if len(matches) >= max_matches:
+            break
+        start = match.start()
+        line += data.count(b'\n', position, start)
+        position = start
+        line_start = data.rfind(b'\n', 0, start) + 1
+        line_end = data.find(b'\n', start)
+        if line_end < 0:
+            line_end = len(data)
+        text = data[line_start:line_end].decode('utf-8', errors='replace')
+        column = len(data[line_start:start].decode('utf-8', errors='replace'))
+        matches.append({
+            'path': path,
+            'line': line,
+            'column': column + 1,
+            'length': len(match.group().decode('utf-8', errors='replace')),
+            'text': text[:SEARCH_MAX_LINE_LENGTH]
+        })
+    return data.count(b'\n')
+
+
+def search_file(full_path: str, path: str, regex: typing.Pattern[bytes], max_matches: int,
+                cancelled: typing.Callable[[], bool] = _cancelled) -> typing.Optional[typing.List[dict]]:
+    """Return the matches in one file, or None if it is binary.
+
+    Line and column numbers start at 1; columns count characters. A
+    regex that can match a newline, such as one with a whitespace class,
+    may match across lines: the match is reported at the line it starts
+    on, with that line's text and the whole match's length. Large files
+    are mapped and searched a chunk of whole lines at a time, checking for
+    cancellation between chunks, so no match spans two chunks.
+    """
+    matches = []
+    with open(full_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= SEARCH_MMAP_THRESHOLD:
+            data = f.read()
+            if _is_binary(data):
+                return None
+            _search_buffer(data, regex, path, 1, matches, max_matches)
+            return matches
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if _is_binary(mm[:BINARY_SNIFF_BYTES]):
+                return None
+            line = 1
+            start = 0
+            while start < size and len(matches) < max_matches and not cancelled():
+                end = mm.find(b'\n', min(start + SEARCH_CHUNK_BYTES, size))
+                end = size if end < 0 else end + 1
+                line += _search_buffer(mm[start:end], regex, path, line, matches, max_matches)
+                start = end
+    return matches
+
+
+def search_files(files: typing.List[typing.Tuple[str, str]], regex: typing.Pattern[bytes], max_matches: int,
+                 cancelled: typing.Callable[[], bool] = _cancelled) -> dict:
+    """Search a group of (full path, relative path) files; runs in a worker process."""
+    result = {'matches': [], 'files': 0, 'binary': 0, 'errors': 0, 'bytes': 0}
+    for full_path, path in files:
+        if cancelled() or len(result['matches']) >= max_matches:
+            break
+        try:
+            found = search_file(full_path, path, regex, max_matches - len(result['matches']), cancelled)
+            result['bytes'] += os.path.getsize(full_path)
+        except (OSError, ValueError) as e:
+            print(f"Error searching {full_path}: {e}")
+            result['errors'] += 1
+            continue
+        result['files'] += 1
+        if found is None:
+            result['binary'] += 1
+        else:
+            result['matches'].extend(found)
+    return result
+
+
+class ContentSearchJob:
+    """Searches the contents of the files under a directory.
+
+    The tree is walked on the calling thread (without following symlinks
+    or entering hidden entries unless ``include_hidden``), and its files
+    are searched in groups by a pool of ``processes`` worker processes so
+    the regex work runs on several cores. Matches are handed to
+    ``batch_callback`` in batches of up to SEARCH_BATCH_SIZE as groups
+    finish, so their order is not deterministic. The search stops once
+    ``max_results`` matches were found. With ``processes`` 0 everything
+    runs on the calling thread.
+    """
+
+    def __init__(self, full_path: str, base_path: str, regex: typing.Pattern[bytes], max_results: int,
+                 glob: str = '', include_hidden: bool = False, processes: int = SEARCH_PROCESSES,
+                 batch_callback: typing.Optional[typing.Callable[[typing.List[dict]], None]] = None) -> None:
+        self.full_path = os.path.normpath(full_path)
+        self.base_path = base_path
+        self.regex = regex
+        self.max_results = max(0, max_results)
+        self.glob = glob
+        self.include_hidden = include_hidden
+        self.processes = processes
+        self.batch_callback = batch_callback
+        # Shared with the workers so a running task stops between chunks
+        self._cancel_event = _process_context().Event() if processes > 0 else threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def _walk(self) -> typing.Iterator[typing.Tuple[str, str, int]]:
+        """Yield (full path, relative path, size) of each regular file under the root."""
+        stack = [self.full_path]
+        while stack and not self.cancelled:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError as e:
+                print(f"Error listing {directory}: {e}")
+                continue
+            subdirectories = []
+            for entry in entries:
+                if entry.name.startswith('.') and not self.include_hidden:
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if self.glob and not fnmatch.fnmatch(entry.name, self.glob):
+                            continue
+                        yield entry.path, os.path.relpath(entry.path, self.base_path), entry.stat(follow_symlinks=False).st_size
+                except OSError as e:
+                    print(f"Error processing entry {entry.name}: {e}")
+            stack.extend(reversed(subdirectories))
+
+    def _tasks(self) -> typing.Iterator[typing.List[typing.Tuple[str, str]]]:
+        """Group the walked files into worker tasks."""
+        group = []
+        group_bytes = 0
+        for full_path, path, size in self._walk():
+            if group and (len(group) >= SEARCH_TASK_FILES or group_bytes + size > SEARCH_TASK_BYTES):
+                yield group
+                group = []
+                group_bytes = 0
+            group.append((full_path, path))
+            group_bytes += size
+        if group:
+            yield group
+
+    def run(self) -> dict:
+        """Search the tree and return a summary: count, files, binary, errors, bytes, truncated, cancelled."""
+        if not os.path.isdir(self.full_path):
+            raise NotADirectoryError(f"Not a directory: {self.full_path}")
+        summary = {'count': 0, 'files': 0, 'binary': 0, 'errors': 0, 'bytes': 0, 'truncated': False}
+
+        def collect(result):
+            for key in ('files', 'binary', 'errors', 'bytes'):
+                summary[key] += result[key]
+            matches = result['matches'][:self.max_results - summary['count']]
+            summary['count'] += len(matches)
+            if len(matches) < len(result['matches']) or summary['count'] >= self.max_results:
+                summary['truncated'] = True
+            for start in range(0, len(matches), SEARCH_BATCH_SIZE):
+                if self.batch_callback:
+                    self.batch_callback(matches[start:start + SEARCH_BATCH_SIZE])
+
+        if self.processes <= 0:
+            for files in self._tasks():
+                if self.cancelled or summary['truncated']:
+                    break
+                collect(search_files(files, self.regex, self.max_results - summary['count'], self._cancel_event.is_set))
+            summary['cancelled'] = self.cancelled
+        else:
+            with ProcessPoolExecutor(self.processes, mp_context=_process_context(), initializer=_init_worker,
+                                     initargs=(self._cancel_event,)) as executor:
+                pending = set()
+                tasks = self._tasks()
+                exhausted = False
+                while not self.cancelled and not summary['truncated']:
+                    # Keep every worker busy without queueing the whole tree
+                    while not exhausted and len(pending) < self.processes * 2:
+                        files = next(tasks, None)
+                        if files is None:
+                            exhausted = True
+                        else:
+                            pending.add(executor.submit(search_files, files, self.regex, self.max_results))
+                    if not pending:
+                        break
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+                summary['cancelled'] = self.cancelled
+                # Stop the tasks still running once the result cap is reached
+                self._cancel_event.set()
+                for future in pending:
+                    future.cancel()
+        return summary
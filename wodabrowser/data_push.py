@@ -0,0 +1,27 @@
+import typing
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class DataPushChannel(QObject):
+    """Pushes structured data to pages as web channel values, never as script source.
+
+    Pages subscribe by topic through ``window.onDataPush`` (browser_functions.js).
+    Payloads may be dicts, lists, strings, numbers, booleans or None; the
+    channel serializes them to JSON itself, so quotes, backticks or
+    ``</script>`` in the data need no escaping and nothing is compiled as
+    code. ``push`` may be called from any thread; the signal reaches the
+    channel on the GUI thread queued.
+
+    Every page shares the channel, so replies to a page's request carry
+    the request id (or job, watch or page id) it sent, and listeners
+    ignore payloads that are not theirs.
+    """
+
+    dataPushed = pyqtSignal(str, 'QVariant', name='dataPushed')
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.setObjectName('dataPush')
+
+    def push(self, topic: str, payload: typing.Any) -> None:
+        self.dataPushed.emit(topic, payload)
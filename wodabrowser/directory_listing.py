@@ -0,0 +1,358 @@
+import fnmatch
+import itertools
+import mimetypes
+import os
+import re
+import typing
+import uuid
+
+# Columns a rich listing can return, in their canonical order
+LISTING_COLUMNS = ('name', 'path', 'is_dir', 'is_file', 'size', 'mtime', 'mode', 'mime')
+DEFAULT_LISTING_COLUMNS = ('name', 'path', 'is_dir', 'is_file')
+SORT_KEYS = ('name', 'size', 'mtime', 'type')
+
+# Columns (and sort keys) that need a stat call per entry
+_STAT_COLUMNS = {'size', 'mtime', 'mode'}
+
+_DIGITS = re.compile(r'(\d+)')
+
+# Approximate footprint of one snapshot entry, used for cache accounting
+SNAPSHOT_ENTRY_SIZE = 200
+
+# Query filters and the entry types they accept
+QUERY_KEYS = ('glob', 'regex', 'ignore_case', 'type', 'min_size', 'max_size',
+              'min_mtime', 'max_mtime', 'include_hidden', 'offset', 'limit')
+QUERY_TYPES = ('file', 'dir', 'symlink')
+DEFAULT_QUERY_LIMIT = 1000
+
+
+def entry_record(entry: os.DirEntry, rel_dir: str) -> dict:
+    """Build a listing entry from a DirEntry using its cached type info."""
+    return {
+        'name': entry.name,
+        'is_dir': entry.is_dir(),
+        'is_file': entry.is_file(),
+        'path': entry.name if rel_dir == '.' else os.path.join(rel_dir, entry.name)
+    }
+
+
+def _iter_entries(scandir_it, rel_dir: str) -> typing.Iterator[dict]:
+    """Yield listing entries from an open scandir iterator, skipping bad ones."""
+    for entry in scandir_it:
+        try:
+            yield entry_record(entry, rel_dir)
+        except OSError as e:
+            print(f"Error processing entry {entry.name}: {e}")
+            continue
+
+
+def entry_signature(entry: os.DirEntry) -> tuple:
+    """What identifies an entry's state: a new inode, size or mtime means it changed."""
+    stat = entry.stat(follow_symlinks=False)
+    return (entry.is_dir(), stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _iter_snapshot_entries(scandir_it, rel_dir: str, snapshot: dict) -> typing.Iterator[dict]:
+    """Like _iter_entries, also recording each entry and its signature in snapshot."""
+    for entry in scandir_it:
+        try:
+            record = entry_record(entry, rel_dir)
+            snapshot[entry.name] = (record, entry_signature(entry))
+        except OSError as e:
+            print(f"Error processing entry {entry.name}: {e}")
+            continue
+        yield record
+
+
+def snapshot_directory(full_path: str, base_path: str, scandir: typing.Callable = os.scandir) -> dict:
+    """Map each entry name to its listing record and signature."""
+    snapshot = {}
+    with scandir(full_path) as it:
+        for _ in _iter_snapshot_entries(it, os.path.relpath(full_path, base_path), snapshot):
+            pass
+    return snapshot
+
+
+def iter_directory(full_path: str, base_path: str) -> typing.Iterator[dict]:
+    """Yield listing entries for a directory from a single os.scandir pass.
+
+    Entry types come from the cached ``DirEntry`` data, so on filesystems that
+    report ``d_type`` no per-entry ``stat`` is needed. Entries that fail to
+    resolve are skipped instead of failing the whole listing.
+    """
+    rel_dir = os.path.relpath(full_path, base_path)
+    with os.scandir(full_path) as it:
+        yield from _iter_entries(it, rel_dir)
+
+
+def scan_directory(full_path: str, base_path: str) -> typing.List[dict]:
+    """Return all listing entries for a directory."""
+    return list(iter_directory(full_path, base_path))
+
+
+class ListingCursor:
+    """Incremental reader over a directory listing, one page at a time."""
+
+    def __init__(self, full_path: str, base_path: str, page_size: int, track_snapshot: bool = False) -> None:
+        self.full_path = full_path
+        self.page_size = max(1, page_size)
+        self.position = 0
+        self.done = False
+        # With track_snapshot, a snapshot of exactly the entries handed out
+        # so far, so a finished listing can be versioned for deltas
+        self.snapshot = {} if track_snapshot else None
+        # Open eagerly so a missing or unreadable directory fails here
+        self._scandir = os.scandir(full_path)
+        rel_dir = os.path.relpath(full_path, base_path)
+        if track_snapshot:
+            self._entries = _iter_snapshot_entries(self._scandir, rel_dir, self.snapshot)
+        else:
+            self._entries = _iter_entries(self._scandir, rel_dir)
+
+    def next_page(self) -> typing.List[dict]:
+        """Return up to page_size further entries; done is set once exhausted."""
+        page = []
+        if self.done:
+            return page
+        for entry in self._entries:
+            page.append(entry)
+            if len(page) >= self.page_size:
+                break
+        else:
+            self.close()
+        self.position += len(page)
+        return page
+
+    def close(self) -> None:
+        """Release the underlying scandir iterator."""
+        self.done = True
+        self._scandir.close()
+
+
+def natural_key(name: str) -> tuple:
+    """Sort key ordering digit runs by value, so "file2" sorts before "file10"."""
+    parts = _DIGITS.split(name.casefold())
+    # Odd positions are digit runs; tag parts so ints and strs never compare directly
+    return tuple((0, int(part), part) if i % 2 else (1, part) for i, part in enumerate(parts))
+
+
+def guess_mime(name: str, is_dir: bool) -> str:
+    """Guess a mime type from the name alone; no file content is read."""
+    if is_dir:
+        return 'inode/directory'
+    return mimetypes.guess_type(name, strict=False)[0] or 'application/octet-stream'
+
+
+def list_columns(full_path: str, base_path: str, columns: typing.Sequence[str] = DEFAULT_LISTING_COLUMNS,
+                 sort: str = 'name', descending: bool = False, natural: bool = True,
+                 dirs_first: bool = True, scandir: typing.Callable = os.scandir) -> dict:
+    """List a directory as parallel column arrays, sorted in Python.
+
+    Everything comes from one scandir pass plus, only when a stat column
+    or sort key is requested, one stat per entry. Sort keys are computed
+    once per entry rather than per comparison. The result looks like
+    ``{"count": n, "columns": {"name": [...], "size": [...]}}``, which is
+    far smaller than one JSON object per entry because keys are not
+    repeated. ``scandir`` lists other trees than the disk, e.g. archives.
+    """
+    unknown = set(columns) - set(LISTING_COLUMNS)
+    columns = [c for c in LISTING_COLUMNS if c in columns]
+    if unknown or sort not in SORT_KEYS:
+        raise ValueError(f"Unknown listing column or sort key: {sorted(unknown) or sort}")
+    needs_stat = bool(_STAT_COLUMNS.intersection(columns)) or sort in ('size', 'mtime')
+    rel_dir = os.path.relpath(full_path, base_path)
+
+    rows = []
+    with scandir(full_path) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+                row = {
+                    'name': entry.name,
+                    'path': entry.name if rel_dir == '.' else os.path.join(rel_dir, entry.name),
+                    'is_dir': is_dir,
+                    'is_file': entry.is_file()
+                }
+                if needs_stat:
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        # Dangling symlink: describe the link itself
+                        stat = entry.stat(follow_symlinks=False)
+                    row['size'] = 0 if is_dir else stat.st_size
+                    row['mtime'] = stat.st_mtime
+                    row['mode'] = stat.st_mode
+            except OSError as e:
+                print(f"Error processing entry {entry.name}: {e}")
+                continue
+            if 'mime' in columns or sort == 'type':
+                row['mime'] = guess_mime(entry.name, is_dir)
+            rows.append(row)
+
+    name_key = natural_key if natural else str.casefold
+    if sort == 'name':
+        keys = [name_key(row['name']) for row in rows]
+    elif sort == 'type':
+        keys = [(row['mime'], name_key(row['name'])) for row in rows]
+    else:
+        keys = [(row[sort], name_key(row['name'])) for row in rows]
+    order = sorted(range(len(rows)), key=keys.__getitem__, reverse=descending)
+    if dirs_first:
+        # Stable, so the order within directories and within files is kept
+        order.sort(key=lambda i: not rows[i]['is_dir'])
+
+    return {
+        'count': len(rows),
+        'columns': {column: [rows[i][column] for i in order] for column in columns}
+    }
+
+
+def diff_snapshots(old: dict, new: dict) -> dict:
+    """Entries added, removed (as paths) and changed between two snapshots."""
+    added = []
+    changed = []
+    for name, (record, signature) in new.items():
+        previous = old.get(name)
+        if previous is None:
+            added.append(record)
+        elif previous[1] != signature:
+            changed.append(record)
+    removed = [record['path'] for name, (record, _) in old.items() if name not in new]
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+
+class ListingVersions:
+    """Recent directory snapshots by version tag, so clients can ask for deltas.
+
+    A version tag names one snapshot of one directory. ``delta`` rescans the
+    directory and compares it with the snapshot the client already has,
+    returning only what was added, removed or changed and the tag of the
+    new state. Tags are unique to this instance, so a tag from before a
+    restart, or one whose snapshot has been evicted, simply yields the full
+    listing again.
+    """
+
+    def __init__(self, cache) -> None:
+        self._cache = cache  # LRUCache of (path, version) -> snapshot
+        self._prefix = uuid.uuid4().hex[:8]
+        self._counter = itertools.count(1)
+
+    @staticmethod
+    def _key(full_path: str, version: str) -> tuple:
+        return (os.path.normpath(full_path), version)
+
+    def register(self, full_path: str, snapshot: dict) -> str:
+        """Store a snapshot and return its new version tag."""
+        version = f"{self._prefix}.{next(self._counter)}"
+        self._cache.put(self._key(full_path, version), snapshot, len(snapshot) * SNAPSHOT_ENTRY_SIZE + SNAPSHOT_ENTRY_SIZE)
+        return version
+
+    def delta(self, full_path: str, base_path: str, since: str = '', scandir: typing.Callable = os.scandir) -> dict:
+        """Return the changes since a version, or the full listing if it is unknown.
+
+        The result has ``version`` and ``full``; a full result carries
+        ``entries`` and a delta carries ``added``, ``removed`` and ``changed``.
+        An unchanged directory keeps its version tag.
+        """
+        current = snapshot_directory(full_path, base_path, scandir)
+        previous = self._cache.get(self._key(full_path, since)) if since else None
+        if previous is None:
+            return {
+                'version': self.register(full_path, current),
+                'full': True,
+                'entries': [record for record, _ in current.values()]
+            }
+        delta = diff_snapshots(previous, current)
+        if delta['added'] or delta['removed'] or delta['changed']:
+            version = self.register(full_path, current)
+        else:
+            version = since
+        return dict(delta, version=version, full=False)
+
+
+def _compile_query(query: dict) -> typing.Tuple[typing.Callable[[os.DirEntry], typing.Any], bool]:
+    """Build a matcher for a query, and whether it needs a stat per entry.
+
+    The matcher returns False for entries that do not match, and otherwise
+    the entry's stat result (or True when no stat was needed). Cheap name
+    and type tests run first so most rejected entries are never stat'ed.
+    """
+    unknown = set(query) - set(QUERY_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown query keys: {sorted(unknown)}")
+    entry_type = query.get('type')
+    if entry_type is not None and entry_type not in QUERY_TYPES:
+        raise ValueError(f"Unknown entry type: {entry_type}")
+    flags = re.IGNORECASE if query.get('ignore_case') else 0
+    # A glob matches the whole name, a regex anywhere in it
+    name_tests = []
+    if query.get('glob'):
+        name_tests.append(re.compile(fnmatch.translate(query['glob']), flags).match)
+    if query.get('regex'):
+        name_tests.append(re.compile(query['regex'], flags).search)
+    include_hidden = query.get('include_hidden', True)
+    bounds = [(key, query[key]) for key in ('min_size', 'max_size', 'min_mtime', 'max_mtime') if query.get(key) is not None]
+    needs_stat = bool(bounds)
+
+    def match(entry: os.DirEntry):
+        name = entry.name
+        if not include_hidden and name.startswith('.'):
+            return False
+        for name_test in name_tests:
+            if not name_test(name):
+                return False
+        if entry_type == 'dir' and not entry.is_dir():
+            return False
+        if entry_type == 'file' and not entry.is_file():
+            return False
+        if entry_type == 'symlink' and not entry.is_symlink():
+            return False
+        if not needs_stat:
+            return True
+        stat = entry.stat()
+        for key, bound in bounds:
+            value = stat.st_size if key.endswith('size') else stat.st_mtime
+            if (value < bound) if key.startswith('min') else (value > bound):
+                return False
+        return stat
+
+    return match, needs_stat
+
+
+def query_directory(full_path: str, base_path: str, query: dict, scandir: typing.Callable = os.scandir) -> dict:
+    """Return the entries of a directory that match a query, one page at a time.
+
+    Matching happens during the scandir pass and the scan stops once the
+    requested page (``offset``/``limit``) is full, so only matching rows are
+    ever built or serialized. When a size or mtime filter needs a stat,
+    the entries also carry ``size`` and ``mtime``. ``more`` tells whether
+    further matches exist past the page.
+    """
+    match, needs_stat = _compile_query(query)
+    offset = max(0, int(query.get('offset', 0)))
+    limit = max(0, int(query.get('limit', DEFAULT_QUERY_LIMIT)))
+    rel_dir = os.path.relpath(full_path, base_path)
+    entries = []
+    matched = 0
+    more = False
+    with scandir(full_path) as it:
+        for entry in it:
+            try:
+                stat = match(entry)
+                if stat is False:
+                    continue
+                matched += 1
+                if matched <= offset:
+                    continue
+                if len(entries) >= limit:
+                    more = True
+                    break
+                record = entry_record(entry, rel_dir)
+                if needs_stat:
+                    record['size'] = stat.st_size
+                    record['mtime'] = stat.st_mtime
+                entries.append(record)
+            except OSError as e:
+                print(f"Error processing entry {entry.name}: {e}")
+                continue
+    return {'entries': entries, 'offset': offset, 'more': more}
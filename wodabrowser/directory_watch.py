@@ -0,0 +1,77 @@
+import os
+import typing
+import uuid
+from PyQt6.QtCore import QFileSystemWatcher, QObject, QTimer
+
+# Changes are collected for this long and reported once, so a burst such
+# as extracting an archive produces a few notifications, not thousands
+DIRECTORY_WATCH_COALESCE_MS = 300
+
+
+class DirectoryWatchService(QObject):
+    """Watches directories for pages and reports each burst of changes once.
+
+    Several watches may share a directory; QFileSystemWatcher watches it
+    once. ``on_change(watch_id, full_path)`` is called on the GUI thread at
+    most once per DIRECTORY_WATCH_COALESCE_MS for each watch whose
+    directory changed.
+    """
+
+    def __init__(self, on_change: typing.Callable[[str, str], None], parent=None) -> None:
+        super().__init__(parent)
+        self.on_change = on_change
+        self._watches = {}  # watch id -> full path, oldest first
+        self._dirty = set()
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._directory_changed)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(DIRECTORY_WATCH_COALESCE_MS)
+        self._timer.timeout.connect(self._flush)
+
+    def watch(self, full_path: str) -> str:
+        """Start watching a directory and return the watch id."""
+        full_path = os.path.normpath(full_path)
+        if not os.path.isdir(full_path):
+            raise NotADirectoryError(f"Not a directory: {full_path}")
+        if full_path not in self._watcher.directories() and not self._watcher.addPath(full_path):
+            raise OSError(f"Cannot watch directory: {full_path}")
+        watch_id = uuid.uuid4().hex[:12]
+        self._watches[watch_id] = full_path
+        return watch_id
+
+    def unwatch(self, watch_id: str) -> bool:
+        full_path = self._watches.pop(watch_id, None)
+        if full_path is None:
+            return False
+        self._dirty.discard(watch_id)
+        if full_path not in self._watches.values():
+            self._watcher.removePath(full_path)
+        return True
+
+    def watch_ids(self) -> typing.List[str]:
+        """Watch ids, oldest first."""
+        return list(self._watches)
+
+    def close(self) -> None:
+        for watch_id in list(self._watches):
+            self.unwatch(watch_id)
+
+    def _directory_changed(self, path: str) -> None:
+        path = os.path.normpath(path)
+        for watch_id, full_path in self._watches.items():
+            if full_path == path:
+                self._dirty.add(watch_id)
+        if self._dirty and not self._timer.isActive():
+            self._timer.start()
+
+    def _flush(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        for watch_id in dirty:
+            full_path = self._watches.get(watch_id)
+            if full_path is None:
+                continue
+            # A directory that was removed and recreated drops out of the watcher
+            if full_path not in self._watcher.directories() and os.path.isdir(full_path):
+                self._watcher.addPath(full_path)
+            self.on_change(watch_id, full_path)
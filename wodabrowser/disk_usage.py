@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+import typing
+
+# Seconds between partial results reported while a walk is running
+DISK_USAGE_PROGRESS_INTERVAL = 0.25
+
+# Approximate footprint of one cached total, used for cache accounting
+DISK_USAGE_ENTRY_SIZE = 256
+
+# Seconds a cached total is trusted; files that grow in place do not change
+# any directory's mtime, so totals are recomputed after this long regardless
+DISK_USAGE_CACHE_TTL = 300
+
+
+def empty_totals() -> dict:
+    return {'size': 0, 'files': 0, 'dirs': 0, 'errors': 0}
+
+
+def _add_totals(target: dict, other: dict) -> None:
+    for key in target:
+        target[key] += other[key]
+
+
+class _Frame:
+    """One directory being walked: its open scandir iterator and running totals."""
+
+    def __init__(self, full_path: str, mtime: int) -> None:
+        self.full_path = full_path
+        self.mtime = mtime
+        self.totals = empty_totals()
+        # Subdirectories counted in the totals, walked or taken from the cache
+        self.children = []
+        self._scandir = os.scandir(full_path)
+
+    def next_entry(self) -> typing.Optional[os.DirEntry]:
+        return next(self._scandir, None)
+
+    def close(self) -> None:
+        self._scandir.close()
+
+
+class DiskUsageJob:
+    """Computes the total size of a directory tree, reporting partial totals.
+
+    The walk is iterative, so deep trees cannot exhaust the stack, and stays
+    on the starting filesystem like ``du -x``. Every finished directory's
+    total is stored in ``cache`` (an LRUCache) tagged with the directory's
+    mtime, along with the subdirectories it includes. A later walk reuses a
+    cached total only if the mtimes of every directory in its subtree are
+    unchanged (checked with one stat per directory, without listing them)
+    and it is younger than DISK_USAGE_CACHE_TTL; otherwise it descends.
+    Symlinks are counted by their own size and never followed.
+    """
+
+    def __init__(self, full_path: str, cache, progress_callback: typing.Optional[typing.Callable[[dict], None]] = None) -> None:
+        self.full_path = os.path.normpath(full_path)
+        self.cache = cache
+        self.progress_callback = progress_callback
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _cached(self, full_path: str, mtime_ns: int) -> typing.Optional[dict]:
+        """Return a directory's cached totals if no directory in its subtree changed."""
+        record = None
+        pending = [(full_path, mtime_ns)]
+        now = time.monotonic()
+        while pending:
+            path, mtime = pending.pop()
+            entry = self.cache.get(path, mtime)
+            if entry is None or now - entry['time'] > DISK_USAGE_CACHE_TTL:
+                return None
+            record = record or entry
+            for child in entry['children']:
+                try:
+                    pending.append((child, os.stat(child, follow_symlinks=False).st_mtime_ns))
+                except OSError:
+                    return None
+        return record['totals']
+
+    def run(self) -> typing.Optional[dict]:
+        """Walk the tree and return its totals, or None if cancelled first."""
+        if self.cancelled:
+            return None
+        stat = os.stat(self.full_path)
+        cached = self._cached(self.full_path, stat.st_mtime_ns)
+        if cached is not None:
+            return dict(cached)
+
+        device = stat.st_dev
+        stack = [_Frame(self.full_path, stat.st_mtime_ns)]
+        last_progress = time.monotonic()
+        try:
+            while stack:
+                if self.cancelled:
+                    return None
+                frame = stack[-1]
+                entry = frame.next_entry()
+                if entry is None:
+                    frame.close()
+                    stack.pop()
+                    record = {'totals': dict(frame.totals), 'children': frame.children, 'time': time.monotonic()}
+                    self.cache.put(frame.full_path, record, DISK_USAGE_ENTRY_SIZE, frame.mtime)
+                    if stack:
+                        _add_totals(stack[-1].totals, frame.totals)
+                    else:
+                        return frame.totals
+                    continue
+
+                try:
+                    entry_stat = entry.stat(follow_symlinks=False)
+                    if entry.is_dir(follow_symlinks=False):
+                        frame.totals['dirs'] += 1
+                        if entry_stat.st_dev != device:
+                            continue
+                        child = os.path.normpath(entry.path)
+                        frame.children.append(child)
+                        subtotals = self._cached(child, entry_stat.st_mtime_ns)
+                        if subtotals is not None:
+                            _add_totals(frame.totals, subtotals)
+                        else:
+                            stack.append(_Frame(child, entry_stat.st_mtime_ns))
+                    else:
+                        frame.totals['files'] += 1
+                        frame.totals['size'] += entry_stat.st_size
+                except OSError:
+                    frame.totals['errors'] += 1
+
+                if self.progress_callback and time.monotonic() - last_progress >= DISK_USAGE_PROGRESS_INTERVAL:
+                    last_progress = time.monotonic()
+                    partial = empty_totals()
+                    for open_frame in stack:
+                        _add_totals(partial, open_frame.totals)
+                    self.progress_callback(partial)
+        finally:
+            for frame in stack:
+                frame.close()
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+# Files hashed at the same time; hashlib releases the GIL while hashing
+DUPLICATE_HASH_THREADS = 4
+
+# Bytes hashed from the start and from the end of a file to split candidates
+PARTIAL_HASH_BLOCK = 64 * 1024
+
+# Bytes read at a time for full-content hashes
+FULL_HASH_CHUNK = 1024 * 1024
+
+# Seconds between progress reports while a search is running
+DUPLICATE_PROGRESS_INTERVAL = 0.25
+
+# Duplicate groups per streamed batch
+DUPLICATE_BATCH_SIZE = 100
+
+# Approximate footprint of one cached hash, used for cache accounting
+HASH_CACHE_ENTRY_SIZE = 128
+
+
+class _Candidate:
+    __slots__ = ('full_path', 'path', 'size', 'key', 'tag')
+
+    def __init__(self, full_path: str, path: str, stat: os.stat_result) -> None:
+        self.full_path = full_path
+        self.path = path
+        self.size = stat.st_size
+        self.key = (stat.st_dev, stat.st_ino)
+        self.tag = (stat.st_mtime_ns, stat.st_size)
+
+
+def _group(candidates, key) -> typing.List[list]:
+    """Group candidates by key, keeping only groups of two or more."""
+    groups = {}
+    for candidate in candidates:
+        groups.setdefault(key(candidate), []).append(candidate)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+class DuplicateFinderJob:
+    """Finds files with identical content under a directory.
+
+    Files are grouped by size first; files of a size shared with another
+    file are hashed over their first and last PARTIAL_HASH_BLOCK bytes,
+    and only those whose partial hashes also collide are hashed in full.
+    Hashing runs on DUPLICATE_HASH_THREADS threads. Hashes are stored in
+    ``cache`` (an LRUCache) by inode and tagged with mtime and size, so a
+    repeated search only reads files that changed. Empty files, symlinks
+    and further hard links to an already seen inode are skipped.
+    ``progress_callback`` receives the phase and counters at most every
+    DUPLICATE_PROGRESS_INTERVAL and ``batch_callback`` the groups found,
+    largest reclaimable space first.
+    """
+
+    def __init__(self, full_path: str, base_path: str, cache,
+                 progress_callback: typing.Optional[typing.Callable[[dict], None]] = None,
+                 batch_callback: typing.Optional[typing.Callable[[typing.List[dict]], None]] = None) -> None:
+        self.full_path = os.path.normpath(full_path)
+        self.base_path = base_path
+        self.cache = cache
+        self.progress_callback = progress_callback
+        self.batch_callback = batch_callback
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._last_progress = 0.0
+        self.progress = {'phase': 'scanning', 'files': 0, 'candidates': 0, 'hashed': 0,
+                         'bytesHashed': 0, 'cached': 0, 'errors': 0}
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _report(self, force: bool = False, **changes) -> None:
+        with self._lock:
+            for key, value in changes.items():
+                self.progress[key] = value
+            now = time.monotonic()
+            if not force and now - self._last_progress < DUPLICATE_PROGRESS_INTERVAL:
+                return
+            self._last_progress = now
+            progress = dict(self.progress)
+        if self.progress_callback:
+            self.progress_callback(progress)
+
+    def _count(self, **increments) -> None:
+        with self._lock:
+            for key, value in increments.items():
+                self.progress[key] += value
+        self._report()
+
+    def _walk(self) -> typing.List[_Candidate]:
+        files = []
+        seen = set()
+        stack = [self.full_path]
+        while stack and not self.cancelled:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                candidate = _Candidate(entry.path, os.path.relpath(entry.path, self.base_path),
+                                                       entry.stat(follow_symlinks=False))
+                                if candidate.size > 0 and candidate.key not in seen:
+                                    seen.add(candidate.key)
+                                    files.append(candidate)
+                        except OSError as e:
+                            print(f"Error processing entry {entry.name}: {e}")
+            except OSError as e:
+                if directory == self.full_path:
+                    raise
+                print(f"Error listing {directory}: {e}")
+                self._count(errors=1)
+            self._report(files=len(files))
+        return files
+
+    def _hash(self, candidate: _Candidate, kind: str) -> typing.Optional[str]:
+        """Return the partial or full hash of a file, from the cache if it is unchanged."""
+        if self.cancelled:
+            return None
+        key = (kind,) + candidate.key
+        cached = self.cache.get(key, candidate.tag)
+        if cached is not None:
+            self._count(cached=1)
+            return cached
+        digest = hashlib.blake2b(digest_size=16)
+        read = 0
+        try:
+            with open(candidate.full_path, 'rb') as f:
+                if kind == 'partial' and candidate.size > 2 * PARTIAL_HASH_BLOCK:
+                    for offset in (0, candidate.size - PARTIAL_HASH_BLOCK):
+                        chunk = os.pread(f.fileno(), PARTIAL_HASH_BLOCK, offset)
+                        digest.update(chunk)
+                        read += len(chunk)
+                else:
+                    for chunk in iter(lambda: f.read(FULL_HASH_CHUNK), b''):
+                        if self.cancelled:
+                            return None
+                        digest.update(chunk)
+                        read += len(chunk)
+                stat = os.fstat(f.fileno())
+        except OSError as e:
+            print(f"Error hashing {candidate.full_path}: {e}")
+            self._count(errors=1)
+            return None
+        if (stat.st_mtime_ns, stat.st_size) != candidate.tag:
+            # Changed while it was read; leave it out rather than report a stale match
+            self._count(errors=1, bytesHashed=read)
+            return None
+        value = digest.hexdigest()
+        self.cache.put(key, value, HASH_CACHE_ENTRY_SIZE, candidate.tag)
+        self._count(hashed=1, bytesHashed=read)
+        return value
+
+    def _hash_all(self, executor: ThreadPoolExecutor, candidates: typing.List[_Candidate], kind: str) -> typing.List[tuple]:
+        """Return (candidate, hash) for every candidate that could be hashed."""
+        hashes = executor.map(lambda candidate: self._hash(candidate, kind), candidates)
+        return [(candidate, value) for candidate, value in zip(candidates, hashes) if value is not None]
+
+    def run(self) -> dict:
+        """Find the duplicates and return a summary: count (of groups), duplicates, wasted bytes and counters."""
+        if not os.path.isdir(self.full_path):
+            raise NotADirectoryError(f"Not a directory: {self.full_path}")
+        files = self._walk()
+        groups = []
+        with ThreadPoolExecutor(max_workers=DUPLICATE_HASH_THREADS) as executor:
+            same_size = [c for group in _group(files, lambda c: c.size) for c in group]
+            self._report(True, phase='partial', files=len(files), candidates=len(same_size))
+            # A file no longer than both blocks is hashed whole by its partial hash
+            remaining = []
+            for group in _group(self._hash_all(executor, same_size, 'partial'), lambda item: (item[0].size, item[1])):
+                if group[0][0].size <= 2 * PARTIAL_HASH_BLOCK:
+                    groups.append(group)
+                else:
+                    remaining.extend(candidate for candidate, _ in group)
+            self._report(True, phase='full', candidates=len(remaining))
+            groups.extend(_group(self._hash_all(executor, remaining, 'full'), lambda item: (item[0].size, item[1])))
+
+        results = [{
+            'size': group[0][0].size,
+            'hash': group[0][1],
+            'paths': sorted(candidate.path for candidate, _ in group),
+            'wasted': group[0][0].size * (len(group) - 1)
+        } for group in groups]
+        results.sort(key=lambda result: (-result['wasted'], result['paths'][0]))
+        if not self.cancelled and self.batch_callback:
+            for start in range(0, len(results), DUPLICATE_BATCH_SIZE):
+                self.batch_callback(results[start:start + DUPLICATE_BATCH_SIZE])
+        self._report(True, phase='done')
+        summary = dict(self.progress)
+        summary.update({
+            'count': len(results),
+            'duplicates': sum(len(result['paths']) - 1 for result in results),
+            'wasted': sum(result['wasted'] for result in results),
+            'cancelled': self.cancelled
+        })
+        return summary
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import shutil
+import typing
+import uuid
+
+# Bytes copied per read when streaming unchanged parts into the new file
+EDIT_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class EditConflict(Exception):
+    """The file no longer matches what the edits were made against."""
+
+
+def _normalize_edits(edits: typing.List[dict], size: int) -> typing.List[typing.Tuple[int, int, bytes]]:
+    """Validate edits and return (offset, delete length, insert bytes) sorted by offset."""
+    normalized = []
+    for edit in edits:
+        offset = int(edit.get('offset', -1))
+        delete = int(edit.get('delete', 0))
+        insert = edit.get('insert', '').encode('utf-8')
+        if offset < 0 or delete < 0 or offset + delete > size:
+            raise ValueError(f"Edit out of range: offset {offset}, delete {delete}, file size {size}")
+        normalized.append((offset, delete, insert))
+    normalized.sort(key=lambda edit: edit[0])
+    for previous, current in zip(normalized, normalized[1:]):
+        if previous[0] + previous[1] > current[0]:
+            raise ValueError(f"Overlapping edits at offsets {previous[0]} and {current[0]}")
+    return normalized
+
+
+def file_hash(f) -> str:
+    """Hash an open file's content in chunks; equals file_reader.content_hash of its bytes."""
+    digest = hashlib.blake2b(digest_size=16)
+    f.seek(0)
+    for chunk in iter(lambda: f.read(EDIT_COPY_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _copy_range(src, dst, length: int) -> None:
+    while length > 0:
+        chunk = src.read(min(EDIT_COPY_CHUNK_SIZE, length))
+        if not chunk:
+            raise EditConflict("File shrank while it was being edited")
+        dst.write(chunk)
+        length -= len(chunk)
+
+
+def apply_edits(full_path: str, edits: typing.List[dict], expected_mtime_ns: typing.Optional[int] = None,
+                expected_size: typing.Optional[int] = None, expected_hash: typing.Optional[str] = None) -> dict:
+    """Apply (offset, delete, insert) edits to a file without loading it.
+
+    Offsets and delete lengths are in bytes of the current file; inserted
+    text is written as UTF-8. Any expectation given (mtime in nanoseconds,
+    size or content hash) must match or EditConflict is raised and the
+    file is left alone. When every edit replaces bytes with the same number
+    of bytes they are written in place; otherwise the file is streamed into
+    a temporary file next to it with the edits spliced in, which then
+    atomically replaces it. Returns the new size and mtime.
+    """
+    with open(full_path, 'r+b') as f:
+        stat = os.fstat(f.fileno())
+        if expected_mtime_ns is not None and stat.st_mtime_ns != expected_mtime_ns:
+            raise EditConflict(f"File was modified (mtime {stat.st_mtime_ns}, expected {expected_mtime_ns})")
+        if expected_size is not None and stat.st_size != expected_size:
+            raise EditConflict(f"File size is {stat.st_size}, expected {expected_size}")
+        if expected_hash is not None and file_hash(f) != expected_hash:
+            raise EditConflict("File content does not match the expected hash")
+        normalized = _normalize_edits(edits, stat.st_size)
+
+        if all(delete == len(insert) for _, delete, insert in normalized):
+            for offset, _, insert in normalized:
+                os.pwrite(f.fileno(), insert, offset)
+            in_place = True
+        else:
+            directory, name = os.path.split(full_path)
+            temp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:12]}.edit")
+            try:
+                with open(temp_path, 'xb') as out:
+                    f.seek(0)
+                    position = 0
+                    for offset, delete, insert in normalized:
+                        _copy_range(f, out, offset - position)
+                        out.write(insert)
+                        f.seek(delete, os.SEEK_CUR)
+                        position = offset + delete
+                    shutil.copyfileobj(f, out, EDIT_COPY_CHUNK_SIZE)
+                shutil.copymode(full_path, temp_path)
+                os.replace(temp_path, full_path)
+            except BaseException:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+            in_place = False
+
+    stat = os.stat(full_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'in_place': in_place}
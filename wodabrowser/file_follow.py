@@ -0,0 +1,189 @@
+import codecs
+import os
+import typing
+import uuid
+from PyQt6.QtCore import QFileSystemWatcher, QObject, QTimer
+
+# Appended data is collected for this long before it is sent, so a log
+# written line by line produces a few events per second, not one per line
+FOLLOW_BATCH_INTERVAL_MS = 200
+
+# Most bytes sent in one event; a backlog is sent over several intervals
+FOLLOW_MAX_BATCH_BYTES = 1024 * 1024
+
+# Check followed files this often even without watcher events, which some
+# filesystems (e.g. network mounts) never deliver
+FOLLOW_POLL_INTERVAL_MS = 2000
+
+
+class FileFollower:
+    """Reads what is appended to a file, surviving truncation and rotation.
+
+    The file is kept open, so when it is rotated (renamed away and replaced)
+    whatever was still appended to the old file is read before switching to
+    the new one. A file that shrinks below the read position was truncated
+    and is read again from the start.
+    """
+
+    def __init__(self, full_path: str, from_offset: int = -1, encoding: str = 'utf-8') -> None:
+        self.full_path = full_path
+        self.encoding = encoding
+        self._file = open(full_path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        # A negative offset starts at the current end, like tail -f
+        self.offset = size if from_offset < 0 else min(from_offset, size)
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+    def _replaced(self) -> bool:
+        """Whether the path now names a different file than the open one."""
+        try:
+            current = os.stat(self.full_path)
+        except FileNotFoundError:
+            return False  # Rotated away and not recreated yet; keep reading the old file
+        opened = os.fstat(self._file.fileno())
+        return (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino)
+
+    def read_new(self, max_bytes: int = FOLLOW_MAX_BATCH_BYTES) -> typing.Optional[dict]:
+        """Return newly appended text, or None if there is nothing new.
+
+        The result has ``data``, the ``offset`` to resume from, ``more`` when
+        max_bytes cut the batch short, and ``truncated``/``rotated`` flags.
+        """
+        truncated = rotated = False
+        if os.fstat(self._file.fileno()).st_size < self.offset:
+            truncated = True
+            self.offset = 0
+            self._decoder.reset()
+
+        self._file.seek(self.offset)
+        data = self._file.read(max_bytes)
+        if not data and self._replaced():
+            # The old file is drained; continue with its replacement from the start
+            self._file.close()
+            self._file = open(self.full_path, 'rb')
+            self.offset = 0
+            self._decoder.reset()
+            rotated = True
+            data = self._file.read(max_bytes)
+        if not data and not truncated and not rotated:
+            return None
+
+        self.offset += len(data)
+        text = self._decoder.decode(data)
+        pending = self._decoder.getstate()[0]
+        return {
+            'data': text,
+            # Resume before a character cut off at the end of the batch
+            'offset': self.offset - len(pending),
+            'more': len(data) == max_bytes,
+            'truncated': truncated,
+            'rotated': rotated
+        }
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class FileFollowService(QObject):
+    """Follows files for pages, sending appended data in rate-limited batches.
+
+    A QFileSystemWatcher reports changes to each followed file and to its
+    directory (which is where rotation shows up); a change only marks the
+    follower dirty, and dirty followers are read once per
+    FOLLOW_BATCH_INTERVAL_MS. ``on_data`` receives one dict per batch with
+    its ``followId`` added; a follower that fails is dropped after a batch
+    carrying ``error``.
+    """
+
+    def __init__(self, on_data: typing.Callable[[dict], None], parent=None) -> None:
+        super().__init__(parent)
+        self.on_data = on_data
+        self._followers = {}  # follow id -> FileFollower
+        self._dirty = set()
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._path_changed)
+        self._watcher.directoryChanged.connect(self._directory_changed)
+        self._batch_timer = QTimer(self)
+        self._batch_timer.setSingleShot(True)
+        self._batch_timer.setInterval(FOLLOW_BATCH_INTERVAL_MS)
+        self._batch_timer.timeout.connect(self._flush)
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(FOLLOW_POLL_INTERVAL_MS)
+        self._poll_timer.timeout.connect(self._poll)
+
+    def follow(self, full_path: str, from_offset: int = -1) -> str:
+        """Start following a file and return the follow id."""
+        follower = FileFollower(full_path, from_offset)
+        follow_id = uuid.uuid4().hex[:12]
+        self._followers[follow_id] = follower
+        self._watch(full_path)
+        self._poll_timer.start()
+        # Anything already past from_offset goes out in the first batch
+        self._mark_dirty(follow_id)
+        return follow_id
+
+    def unfollow(self, follow_id: str) -> bool:
+        follower = self._followers.pop(follow_id, None)
+        if follower is None:
+            return False
+        follower.close()
+        self._dirty.discard(follow_id)
+        if not any(f.full_path == follower.full_path for f in self._followers.values()):
+            self._watcher.removePath(follower.full_path)
+            directory = os.path.dirname(follower.full_path)
+            if not any(os.path.dirname(f.full_path) == directory for f in self._followers.values()):
+                self._watcher.removePath(directory)
+        if not self._followers:
+            self._poll_timer.stop()
+        return True
+
+    def close(self) -> None:
+        for follow_id in list(self._followers):
+            self.unfollow(follow_id)
+
+    def _watch(self, full_path: str) -> None:
+        paths = set(self._watcher.files()) | set(self._watcher.directories())
+        for path in (full_path, os.path.dirname(full_path)):
+            if path not in paths and os.path.exists(path):
+                self._watcher.addPath(path)
+
+    def _mark_dirty(self, follow_id: str) -> None:
+        self._dirty.add(follow_id)
+        if not self._batch_timer.isActive():
+            self._batch_timer.start()
+
+    def _path_changed(self, path: str) -> None:
+        for follow_id, follower in self._followers.items():
+            if follower.full_path == path:
+                self._mark_dirty(follow_id)
+
+    def _directory_changed(self, path: str) -> None:
+        for follow_id, follower in self._followers.items():
+            if os.path.dirname(follower.full_path) == path:
+                # A rotated file drops out of the watcher; watch its replacement
+                self._watch(follower.full_path)
+                self._mark_dirty(follow_id)
+
+    def _poll(self) -> None:
+        for follow_id in list(self._followers):
+            self._mark_dirty(follow_id)
+
+    def _flush(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        for follow_id in dirty:
+            follower = self._followers.get(follow_id)
+            if follower is None:
+                continue
+            try:
+                batch = follower.read_new()
+            except OSError as e:
+                print(f"Error following {follower.full_path}: {str(e)}")
+                batch = {'error': str(e)}
+                self.unfollow(follow_id)
+            if batch is None:
+                continue
+            batch['followId'] = follow_id
+            if batch.get('more'):
+                # Send the rest of a backlog in the next interval
+                self._mark_dirty(follow_id)
+            self.on_data(batch)
@@ -0,0 +1,232 @@
+import os
+import sqlite3
+import threading
+import time
+import typing
+
+# Directories whose entries are written before the crawl commits and yields the lock
+INDEX_COMMIT_INTERVAL = 200
+
+# The trigram tokenizer only matches terms of at least this many characters
+TRIGRAM_LENGTH = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_parent ON files(parent);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(name, content='files', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+    INSERT INTO files_fts(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+    INSERT INTO files_fts(files_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+"""
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def _subtree_bounds(rel_path: str) -> typing.Tuple[str, str]:
+    """Key range holding every path below rel_path ('0' sorts right after '/')."""
+    return rel_path + '/', rel_path + '0'
+
+
+class FileIndex:
+    """On-disk index of names, sizes and mtimes under a base directory.
+
+    Names are searched through an FTS5 trigram index, so substring queries
+    are answered from the index instead of scanning every row. Crawls are
+    incremental: a directory whose mtime is unchanged since the last crawl
+    has the same entries, so it is only descended into, not re-listed or
+    re-stat'ed. Sizes and mtimes of files in such directories are refreshed
+    when the directory itself next changes.
+
+    Paths are stored relative to the base directory, so a database last
+    used for another base directory is emptied when it is opened.
+    """
+
+    def __init__(self, db_path: str, base_path: str) -> None:
+        self.db_path = db_path
+        self.base_path = base_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # Searches and the crawl share one connection, serialized by the lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        try:
+            self._db.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            # SQLite without FTS5 or the trigram tokenizer (< 3.34) falls back to LIKE scans
+            print(f"File index without trigram search: {e}")
+            self.has_fts = False
+        self._claim_database()
+        self._db.commit()
+        self.crawling = False
+
+    def _claim_database(self) -> None:
+        """Drop rows indexed under another base directory and record this one."""
+        base_path = os.path.abspath(self.base_path)
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'base_path'").fetchone()
+        if row is not None and row[0] == base_path:
+            return
+        if row is not None:
+            print(f"File index was built for {row[0]}; re-indexing {base_path}")
+        # Deleting through the table keeps the FTS index in step via its trigger
+        self._db.execute("DELETE FROM files")
+        self._db.execute("DELETE FROM dirs")
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('base_path', ?)", (base_path,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def crawl(self) -> typing.Optional[dict]:
+        """Bring the index up to date with the tree and return crawl statistics.
+
+        Returns None without crawling if another crawl is already running.
+        """
+        with self._lock:
+            if self.crawling:
+                return None
+            self.crawling = True
+        started = time.monotonic()
+        stats = {'directories': 0, 'rescanned': 0, 'errors': 0}
+        try:
+            stack = ['']
+            pending = 0
+            while stack:
+                rel_dir = stack.pop()
+                stats['directories'] += 1
+                try:
+                    subdirs, rescanned = self._update_directory(rel_dir)
+                except OSError as e:
+                    print(f"Error indexing directory {rel_dir or '.'}: {e}")
+                    stats['errors'] += 1
+                    continue
+                stack.extend(subdirs)
+                if rescanned:
+                    stats['rescanned'] += 1
+                    pending += 1
+                if pending >= INDEX_COMMIT_INTERVAL:
+                    with self._lock:
+                        self._db.commit()
+                    pending = 0
+            with self._lock:
+                self._db.commit()
+        finally:
+            self.crawling = False
+        stats['files'] = self.count()
+        stats['elapsed'] = time.monotonic() - started
+        return stats
+
+    def _update_directory(self, rel_dir: str) -> typing.Tuple[typing.List[str], bool]:
+        """Re-list one directory if it changed; return its subdirectories and whether it was re-listed."""
+        full_dir = os.path.join(self.base_path, rel_dir) if rel_dir else self.base_path
+        mtime = os.stat(full_dir).st_mtime_ns
+        with self._lock:
+            row = self._db.execute("SELECT mtime FROM dirs WHERE path = ?", (rel_dir,)).fetchone()
+            if row is not None and row[0] == mtime:
+                subdirs = [r[0] for r in self._db.execute(
+                    "SELECT path FROM files WHERE parent = ? AND is_dir = 1", (rel_dir,))]
+                return subdirs, False
+
+        records = []
+        with os.scandir(full_dir) as it:
+            for entry in it:
+                try:
+                    # Symlinked directories are indexed as entries but not followed
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                records.append((rel_path, rel_dir, entry.name, int(is_dir), 0 if is_dir else stat.st_size, stat.st_mtime_ns))
+
+        with self._lock:
+            existing = {r[0]: r[1] for r in self._db.execute(
+                "SELECT path, is_dir FROM files WHERE parent = ?", (rel_dir,))}
+            current = {r[0]: r[3] for r in records}
+            for rel_path, was_dir in existing.items():
+                if rel_path not in current or (was_dir and not current[rel_path]):
+                    self._remove(rel_path, was_dir)
+                else:
+                    # Delete-then-insert keeps the FTS index in step through the triggers
+                    self._db.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+            self._db.executemany(
+                "INSERT INTO files(path, parent, name, is_dir, size, mtime) VALUES (?, ?, ?, ?, ?, ?)", records)
+            self._db.execute("INSERT OR REPLACE INTO dirs(path, mtime) VALUES (?, ?)", (rel_dir, mtime))
+        return [r[0] for r in records if r[3]], True
+
+    def _remove(self, rel_path: str, is_dir: bool) -> None:
+        """Drop an entry, and everything below it if it was a directory (lock held)."""
+        self._db.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+        if is_dir:
+            low, high = _subtree_bounds(rel_path)
+            self._db.execute("DELETE FROM files WHERE path >= ? AND path < ?", (low, high))
+            self._db.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (rel_path, low, high))
+
+    def search(self, query: str, limit: int) -> typing.List[dict]:
+        """Return up to limit entries whose names contain every word of query.
+
+        Matching is case-insensitive. Results come in index order, unranked,
+        so the first ``limit`` matches are returned without visiting the rest.
+        Queries made only of one- and two-character words cannot use the
+        trigram index and scan the table until ``limit`` matches are found.
+        """
+        terms = query.split()
+        if not terms or limit <= 0:
+            return []
+        long_terms = [t for t in terms if len(t) >= TRIGRAM_LENGTH] if self.has_fts else []
+        like_terms = [t for t in terms if t not in long_terms]
+
+        conditions = []
+        params = []
+        source = "files"
+        if long_terms:
+            # Each term is a quoted phrase; adjacent phrases are ANDed. Driving
+            # the query from the FTS table lets LIMIT stop it early.
+            source = "files_fts JOIN files ON files.id = files_fts.rowid"
+            conditions.append("files_fts MATCH ?")
+            params.append(' '.join('"' + t.replace('"', '""') + '"' for t in long_terms))
+        for term in like_terms:
+            # Terms too short for trigrams have to be checked row by row
+            conditions.append("files.name LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(term))
+        sql = (f"SELECT files.path, files.name, files.is_dir, files.size, files.mtime FROM {source} "
+               f"WHERE {' AND '.join(conditions)} LIMIT ?")
+        params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [
+            {'name': name, 'is_dir': bool(is_dir), 'is_file': not is_dir, 'path': path, 'size': size, 'mtime': mtime / 1e9}
+            for path, name, is_dir, size, mtime in rows
+        ]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
@@ -0,0 +1,293 @@
+import errno
+import os
+import shutil
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+# Bytes moved per kernel copy call; also the granularity of cancellation
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Files copied at the same time within one job
+COPY_PARALLEL_FILES = 4
+
+# Seconds between progress reports
+FILE_JOB_PROGRESS_INTERVAL = 0.25
+
+# Errors that mean a kernel copy call is unsupported for this pair of files
+_UNSUPPORTED_COPY_ERRORS = (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once cancel() has been called."""
+
+
+def _copy_range_loop(copy_call, src_fd: int, dst_fd: int, offset: int, size: int, on_bytes, check_cancelled) -> None:
+    """Drive a kernel copy call over [offset, size)."""
+    while offset < size:
+        check_cancelled()
+        copied = copy_call(src_fd, dst_fd, offset, min(COPY_CHUNK_SIZE, size - offset))
+        if copied == 0:
+            break
+        offset += copied
+        on_bytes(copied)
+
+
+def _copy_file_range(src_fd, dst_fd, offset, count):
+    return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+
+
+def _sendfile(src_fd, dst_fd, offset, count):
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+def _read_write(src_fd, dst_fd, offset, count):
+    data = os.pread(src_fd, count, offset)
+    written = 0
+    while written < len(data):
+        written += os.pwrite(dst_fd, data[written:], offset + written)
+    return len(data)
+
+
+def copy_file_data(src_fd: int, dst_fd: int, size: int, on_bytes: typing.Callable[[int], None],
+                   check_cancelled: typing.Callable[[], None]) -> None:
+    """Copy a file's contents, preferring in-kernel copies.
+
+    copy_file_range lets the kernel (or a reflink-capable filesystem) copy
+    without the data entering user space; sendfile is the next best thing
+    across filesystems on older kernels; plain pread/pwrite is the last
+    resort. A method that fails as unsupported hands over to the next one,
+    which resumes where it stopped.
+    """
+    methods = []
+    if hasattr(os, 'copy_file_range'):
+        methods.append(_copy_file_range)
+    if hasattr(os, 'sendfile'):
+        methods.append(_sendfile)
+    methods.append(_read_write)
+
+    copied = 0
+
+    def count(n):
+        nonlocal copied
+        copied += n
+        on_bytes(n)
+
+    for method in methods:
+        # copy_file_range and pwrite leave the destination's file position
+        # alone but sendfile writes at it, so point it past what was copied
+        os.lseek(dst_fd, copied, os.SEEK_SET)
+        try:
+            _copy_range_loop(method, src_fd, dst_fd, copied, size, count, check_cancelled)
+            return
+        except OSError as e:
+            if method is _read_write or e.errno not in _UNSUPPORTED_COPY_ERRORS:
+                raise
+            # Resume with the next method after whatever this one copied
+
+
+class FileJob:
+    """A background copy, move or recursive delete with progress and cancellation.
+
+    ``run`` first walks the source to learn the total bytes and files, then
+    does the work, calling ``progress_callback`` with a progress dict at
+    most every FILE_JOB_PROGRESS_INTERVAL seconds and once at the end.
+    Copies preserve permissions and timestamps and recreate symlinks
+    rather than following them. A cancelled or failed copy removes the
+    file it was writing; files already completed are kept.
+    """
+
+    def __init__(self, operation: str, source: str, destination: str = '',
+                 progress_callback: typing.Optional[typing.Callable[[dict], None]] = None) -> None:
+        if operation not in ('copy', 'move', 'delete'):
+            raise ValueError(f"Unknown file operation: {operation}")
+        self.operation = operation
+        self.source = os.path.normpath(source)
+        self.destination = os.path.normpath(destination) if destination else ''
+        self.progress_callback = progress_callback
+        self.bytes_total = 0
+        self.bytes_done = 0
+        self.files_total = 0
+        self.files_done = 0
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._started = time.monotonic()
+        self._last_progress = 0.0
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _check_cancelled(self) -> None:
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def progress(self, done: bool = False) -> dict:
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            rate = self.bytes_done / elapsed if elapsed > 0 else 0
+            remaining = self.bytes_total - self.bytes_done
+            return {
+                'operation': self.operation,
+                'bytes_done': self.bytes_done,
+                'bytes_total': self.bytes_total,
+                'files_done': self.files_done,
+                'files_total': self.files_total,
+                'elapsed': elapsed,
+                'eta': remaining / rate if rate and remaining > 0 and not done else (0 if done else None),
+                'done': done
+            }
+
+    def _report(self, force: bool = False) -> None:
+        if not self.progress_callback:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_progress < FILE_JOB_PROGRESS_INTERVAL:
+                return
+            self._last_progress = now
+        self.progress_callback(self.progress())
+
+    def _add_bytes(self, count: int) -> None:
+        with self._lock:
+            self.bytes_done += count
+        self._report()
+
+    def _file_finished(self) -> None:
+        with self._lock:
+            self.files_done += 1
+        self._report()
+
+    def run(self) -> dict:
+        """Do the work and return the final progress dict.
+
+        Raises JobCancelled if cancelled and OSError/ValueError on failure.
+        """
+        if not os.path.lexists(self.source):
+            raise FileNotFoundError(f"No such file or directory: {self.source}")
+        if self.operation in ('delete', 'move') and os.path.dirname(self.source) == self.source:
+            raise ValueError(f"Refusing to {self.operation} the filesystem root")
+        if self.operation == 'delete':
+            self._delete_tree(self.source)
+        else:
+            if not self.destination:
+                raise ValueError("A destination is required")
+            if os.path.lexists(self.destination):
+                raise FileExistsError(f"Destination already exists: {self.destination}")
+            if os.path.isdir(self.source) and not os.path.islink(self.source):
+                if (self.destination + os.sep).startswith(self.source + os.sep):
+                    raise ValueError("Cannot copy or move a directory into itself")
+            if self.operation == 'move':
+                self._move()
+            else:
+                self._copy_tree(self.source, self.destination)
+        return self.progress(done=True)
+
+    def _plan(self, root: str) -> typing.Tuple[typing.List[str], typing.List[typing.Tuple[str, int]]]:
+        """Walk root and return its directories (top-down) and its non-directory entries with sizes."""
+        if os.path.islink(root) or not os.path.isdir(root):
+            size = os.lstat(root).st_size if not os.path.islink(root) else 0
+            files = [(root, size)]
+            dirs = []
+        else:
+            dirs = [root]
+            files = []
+            index = 0
+            while index < len(dirs):
+                self._check_cancelled()
+                with os.scandir(dirs[index]) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.path)
+                        else:
+                            size = 0 if entry.is_symlink() else entry.stat(follow_symlinks=False).st_size
+                            files.append((entry.path, size))
+                index += 1
+        with self._lock:
+            self.files_total = len(files)
+            self.bytes_total = sum(size for _, size in files)
+        return dirs, files
+
+    def _copy_tree(self, source: str, destination: str) -> None:
+        dirs, files = self._plan(source)
+        self._report(force=True)
+
+        def target(path):
+            return destination if path == source else os.path.join(destination, os.path.relpath(path, source))
+
+        for directory in dirs:
+            os.mkdir(target(directory))
+        with ThreadPoolExecutor(max_workers=COPY_PARALLEL_FILES) as executor:
+            futures = [executor.submit(self._copy_one, path, target(path)) for path, _ in files]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                # Stop queued copies; running ones see the flag at their next chunk
+                self._cancelled.set()
+                for future in futures:
+                    future.cancel()
+                raise
+        # Directory times last, after their contents stopped changing them
+        for directory in reversed(dirs):
+            shutil.copystat(directory, target(directory), follow_symlinks=False)
+
+    def _copy_one(self, source: str, destination: str) -> None:
+        self._check_cancelled()
+        if os.path.islink(source):
+            os.symlink(os.readlink(source), destination)
+            self._file_finished()
+            return
+        with open(source, 'rb') as src:
+            size = os.fstat(src.fileno()).st_size
+            try:
+                with open(destination, 'xb') as dst:
+                    copy_file_data(src.fileno(), dst.fileno(), size, self._add_bytes, self._check_cancelled)
+            except BaseException:
+                try:
+                    os.remove(destination)
+                except OSError:
+                    pass
+                raise
+        shutil.copystat(source, destination)
+        self._file_finished()
+
+    def _move(self) -> None:
+        try:
+            # Same filesystem: a rename moves any amount of data instantly
+            os.rename(self.source, self.destination)
+            with self._lock:
+                self.files_total = self.files_done = 1
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+        self._copy_tree(self.source, self.destination)
+        self._delete_tree(self.source, count_progress=False)
+
+    def _delete_tree(self, root: str, count_progress: bool = True) -> None:
+        dirs, files = self._plan(root) if count_progress else self._plan_quietly(root)
+        if count_progress:
+            # Deleting frees space rather than moving bytes; report files only
+            with self._lock:
+                self.bytes_total = 0
+            self._report(force=True)
+        for path, _ in files:
+            self._check_cancelled()
+            os.remove(path)
+            if count_progress:
+                self._file_finished()
+        for directory in reversed(dirs):
+            os.rmdir(directory)
+
+    def _plan_quietly(self, root: str):
+        """Plan without replacing the totals of a copy that is being finished."""
+        totals = (self.files_total, self.bytes_total)
+        plan = self._plan(root)
+        with self._lock:
+            self.files_total, self.bytes_total = totals
+        return plan
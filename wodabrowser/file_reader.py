@@ -0,0 +1,197 @@
+import base64
+import bisect
+import codecs
+import hashlib
+import io
+import mmap
+import os
+import typing
+
+# Bytes per block of the sparse line index
+LINE_INDEX_BLOCK_SIZE = 64 * 1024
+
+
+def _map_range(f, offset: int, length: int) -> typing.Tuple[mmap.mmap, int]:
+    """Map just the pages covering [offset, offset + length) of an open file.
+
+    Returns the mapping and the position of ``offset`` inside it.
+    """
+    aligned = offset - offset % mmap.ALLOCATIONGRANULARITY
+    return mmap.mmap(f.fileno(), length + offset - aligned, access=mmap.ACCESS_READ, offset=aligned), offset - aligned
+
+
+def read_range(full_path: str, offset: int, length: int, encoding: str = '') -> dict:
+    """Read up to length bytes at offset without loading the rest of the file.
+
+    With an encoding the data is decoded to text; a multi-byte character cut
+    off at the end of the range is left out, and ``length`` in the result is
+    the number of bytes actually consumed so the next read can resume exactly
+    there. Without an encoding the raw bytes are returned base64-encoded.
+    """
+    if offset < 0 or length < 0:
+        raise ValueError("Offset and length must not be negative")
+    with open(full_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        length = max(0, min(length, size - offset))
+        if length:
+            mapped, start = _map_range(f, offset, length)
+            with mapped:
+                data = mapped[start:start + length]
+        else:
+            data = b''
+    return range_result(data, offset, size, encoding)
+
+
+def range_result(data: bytes, offset: int, size: int, encoding: str = '') -> dict:
+    """Package bytes read at offset of a size-byte file the way read_range returns them."""
+    if encoding:
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        # At end of file there is nothing left to complete a partial character
+        final = offset + len(data) >= size
+        text = decoder.decode(data, final=final)
+        pending = decoder.getstate()[0]
+        consumed = len(data) - len(pending)
+        payload = text
+    else:
+        consumed = len(data)
+        payload = base64.b64encode(data).decode('ascii')
+
+    return {
+        'offset': offset,
+        'length': consumed,
+        'size': size,
+        'eof': offset + consumed >= size,
+        'encoding': encoding or 'base64',
+        'data': payload
+    }
+
+
+class LineIndex:
+    """Sparse newline index: the line count at the start of every fixed-size block.
+
+    Building it only counts newlines per block, so it runs at close to memory
+    bandwidth; locating a line scans at most one block from the nearest
+    checkpoint.
+    """
+
+    def __init__(self, full_path: str, block_size: int = LINE_INDEX_BLOCK_SIZE) -> None:
+        self.full_path = full_path
+        self.block_size = block_size
+        # block_lines[i] is the number of newlines before offset i * block_size
+        self.block_lines = [0]
+        with open(full_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.size = stat.st_size
+            self.mtime = stat.st_mtime_ns
+            newlines = 0
+            ends_with_newline = False
+            if self.size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for start in range(0, self.size, block_size):
+                        newlines += mm[start:start + block_size].count(b'\n')
+                        self.block_lines.append(newlines)
+                    ends_with_newline = mm[self.size - 1:self.size] == b'\n'
+        self.newline_count = newlines
+        # A trailing newline terminates the last line instead of starting a new one
+        self.line_count = newlines + (1 if self.size and not ends_with_newline else 0)
+
+    def memory_size(self) -> int:
+        """Approximate footprint, used for cache accounting."""
+        return 8 * len(self.block_lines) + 64
+
+    def line_offsets(self, start_line: int, count: int) -> typing.List[int]:
+        """Return start offsets of lines [start_line, start_line + count), plus the end offset.
+
+        The extra trailing offset is where the last requested line ends, so
+        callers can read ``offsets[0]:offsets[-1]`` as one range.
+        """
+        start_line = max(0, min(start_line, self.line_count))
+        end_line = max(start_line, min(start_line + count, self.line_count))
+        if not self.size:
+            return [0]
+        offsets = []
+        with open(self.full_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                position = self._offset_of_line(mm, start_line)
+                offsets.append(position)
+                for _ in range(start_line, end_line):
+                    newline = mm.find(b'\n', position)
+                    position = self.size if newline == -1 else newline + 1
+                    offsets.append(position)
+        return offsets
+
+    def _offset_of_line(self, mm: mmap.mmap, line: int) -> int:
+        """Offset where a 0-based line starts, i.e. just after the line-th newline."""
+        if line == 0:
+            return 0
+        if line > self.newline_count:
+            return self.size
+        # Last block that starts with fewer than `line` newlines before it
+        block = bisect.bisect_left(self.block_lines, line) - 1
+        position = block * self.block_size
+        for _ in range(line - self.block_lines[block]):
+            position = mm.find(b'\n', position) + 1
+        return position
+
+
+# Appended to the hash of text whose line endings were translated: that text
+# is not the file's bytes, so its hash must not pass for theirs (e.g. as the
+# expectedHash of byte-offset edits)
+TRANSLATED_HASH_SUFFIX = '-lf'
+
+
+def content_hash(data: bytes) -> str:
+    """Hash identifying a file's content, used as its ETag."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def read_raw_text(full_path: str) -> dict:
+    """Read a UTF-8 file without translating line endings, for editors working in byte offsets.
+
+    Returns the content with the hash, size and mtime of exactly those
+    bytes, which guard a later apply_edits.
+    """
+    with open(full_path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        data = f.read()
+    return {'content': data.decode('utf-8'), 'hash': content_hash(data), 'size': len(data), 'mtime_ns': stat.st_mtime_ns}
+
+
+class ContentCache:
+    """Read-through cache of UTF-8 text files, validated by (mtime, size).
+
+    Text is decoded with universal newlines like a file opened in text
+    mode, so CRLF and CR line endings read as LF. Each entry keeps the
+    decoded text and the hash of the file's raw bytes (with
+    TRANSLATED_HASH_SUFFIX when line endings were translated), so a
+    client that already holds the content can be told it is unchanged
+    without it being sent again. Files larger than ``max_file_size`` are
+    read but never cached.
+    """
+
+    def __init__(self, cache, max_file_size: int) -> None:
+        self._cache = cache  # LRUCache of path -> (text, hash)
+        self.max_file_size = max_file_size
+
+    def read(self, full_path: str) -> typing.Tuple[str, str]:
+        """Return (text, hash) of a file, from the cache when it is unchanged."""
+        full_path = os.path.normpath(full_path)
+        stat = os.stat(full_path)
+        cached = self._cache.get(full_path, (stat.st_mtime_ns, stat.st_size))
+        if cached is not None:
+            return cached
+        with open(full_path, 'rb') as f:
+            # Tag with the state the bytes were read in; a write meanwhile changes it
+            stat = os.fstat(f.fileno())
+            data = f.read()
+        text = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8').read()
+        result = (text, content_hash(data) + (TRANSLATED_HASH_SUFFIX if b'\r' in data else ''))
+        if len(data) <= self.max_file_size:
+            self._cache.put(full_path, result, len(data) + len(text), (stat.st_mtime_ns, stat.st_size))
+        return result
+
+    def invalidate(self, full_path: str) -> bool:
+        return self._cache.invalidate(os.path.normpath(full_path))
+
+    def stats(self) -> dict:
+        return self._cache.stats()
@@ -0,0 +1,159 @@
+import mimetypes
+import os
+import typing
+from urllib.parse import quote
+from PyQt6.QtCore import QFile, QIODevice, QUrl, QUrlQuery
+from PyQt6.QtWebEngineCore import QWebEngineUrlRequestJob, QWebEngineUrlScheme, QWebEngineUrlSchemeHandler
+try:
+    from .thumbnails import THUMBNAIL_SIZES
+except ImportError:
+    from thumbnails import THUMBNAIL_SIZES
+
+FILE_SCHEME = b'woda-fs'
+
+# Origins allowed to load scheme URLs: the app's own file:// pages and
+# scheme pages themselves; remote pages must never read the user's files
+ALLOWED_INITIATOR_SCHEMES = ('file', FILE_SCHEME.decode())
+
+
+def register_file_scheme() -> None:
+    """Declare the file scheme to Qt WebEngine; must run before QApplication is created."""
+    if QWebEngineUrlScheme.schemeByName(FILE_SCHEME).name():
+        return
+    scheme = QWebEngineUrlScheme(FILE_SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Path)
+    # Local like file://, so web content cannot embed it; no CorsEnabled, so
+    # no page from another origin can fetch it either
+    scheme.setFlags(
+        QWebEngineUrlScheme.Flag.SecureScheme
+        | QWebEngineUrlScheme.Flag.LocalScheme
+        | QWebEngineUrlScheme.Flag.LocalAccessAllowed
+        | QWebEngineUrlScheme.Flag.FetchApiAllowed
+    )
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+def file_url(rel_path: str) -> str:
+    """Return the scheme URL that serves a path relative to the handler's base path."""
+    return f"{FILE_SCHEME.decode()}:///{quote(rel_path.lstrip('/'))}"
+
+
+def initiator_allowed(initiator: QUrl) -> bool:
+    """Whether a request started by this origin may be served.
+
+    Requests without an initiator come from the browser itself (e.g. a URL
+    typed into the address bar); anything else must come from a local page.
+    """
+    if initiator.isEmpty():
+        return True
+    return initiator.scheme() in ALLOWED_INITIATOR_SCHEMES
+
+
+def open_file_device(full_path: str) -> typing.Optional[QFile]:
+    """Open a file as a random-access device for a reply, or None if it cannot be read.
+
+    Replies backed by a seekable device let WebEngine answer Range
+    requests by seeking instead of reading from the start.
+    """
+    device = QFile(full_path)
+    if not device.open(QIODevice.OpenModeFlag.ReadOnly):
+        print(f"Error opening {full_path} for {FILE_SCHEME.decode()}: {device.errorString()}")
+        return None
+    return device
+
+
+# Sent with every file reply; advertises byte-range support to the page
+RESPONSE_HEADERS = {b'Accept-Ranges': [b'bytes'], b'Cache-Control': [b'no-cache']}
+
+
+def resolve_scheme_path(base_path: str, url_path: str) -> typing.Optional[str]:
+    """Map a decoded URL path to a file under base_path, or None if it escapes it.
+
+    Symlinks are resolved first, so a link pointing outside base_path is
+    refused like a ``..`` path would be.
+    """
+    root = os.path.realpath(base_path)
+    full_path = os.path.realpath(os.path.join(root, url_path.lstrip('/')))
+    if os.path.commonpath([root, full_path]) != root:
+        return None
+    return full_path
+
+
+class FileSchemeHandler(QWebEngineUrlSchemeHandler):
+    """Serves files under a FileSystemHandler's base path to pages as woda-fs:// URLs.
+
+    Each reply streams from an open QFile, so bytes go from disk to the page
+    without passing through Python strings. The file is random access, which
+    lets WebEngine answer HTTP Range requests (media seeking, resumed
+    downloads) by seeking it instead of reading from the start.
+
+    ``?thumbnail=normal`` or ``?thumbnail=large`` serves the file's cached
+    thumbnail instead, generated by the ThumbnailService if needed; the
+    job is answered once the thumbnail is ready.
+    """
+
+    def __init__(self, file_system_handler, thumbnail_service=None, parent=None):
+        super().__init__(parent)
+        self.file_system_handler = file_system_handler
+        self.thumbnail_service = thumbnail_service
+        # Jobs waiting for a thumbnail, by thumbnail request id
+        self._thumbnail_jobs = {}
+        if thumbnail_service is not None:
+            thumbnail_service.thumbnailReady.connect(self._on_thumbnail_ready)
+
+    def requestStarted(self, job: QWebEngineUrlRequestJob) -> None:
+        method = bytes(job.requestMethod())
+        if method not in (b'GET', b'HEAD'):
+            job.fail(QWebEngineUrlRequestJob.Error.RequestDenied)
+            return
+
+        if not initiator_allowed(job.initiator()):
+            print(f"[DEBUG] Refusing {FILE_SCHEME.decode()} request from {job.initiator().toString()}")
+            job.fail(QWebEngineUrlRequestJob.Error.RequestDenied)
+            return
+
+        url = job.requestUrl()
+        url_path = url.path(QUrl.ComponentFormattingOption.FullyDecoded)
+        full_path = resolve_scheme_path(self.file_system_handler.base_path, url_path)
+        if full_path is None:
+            print(f"[DEBUG] Refusing {FILE_SCHEME.decode()} request outside base path: {url_path}")
+            job.fail(QWebEngineUrlRequestJob.Error.RequestDenied)
+            return
+        if not os.path.isfile(full_path):
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+
+        thumbnail_size = QUrlQuery(url).queryItemValue('thumbnail')
+        if thumbnail_size:
+            if self.thumbnail_service is None or thumbnail_size not in THUMBNAIL_SIZES:
+                job.fail(QWebEngineUrlRequestJob.Error.UrlInvalid)
+                return
+            request_id = self.thumbnail_service.request(full_path, thumbnail_size)
+            self._thumbnail_jobs[request_id] = job
+            # The page may drop the request (e.g. the tile scrolled away) before it is ready
+            job.destroyed.connect(lambda _=None, request_id=request_id: self._thumbnail_jobs.pop(request_id, None))
+            return
+
+        self._reply_with_file(job, full_path)
+
+    def _on_thumbnail_ready(self, request_id: int, thumb_path: str) -> None:
+        job = self._thumbnail_jobs.pop(request_id, None)
+        if job is None:
+            return
+        if not thumb_path:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        self._reply_with_file(job, thumb_path)
+
+    def _reply_with_file(self, job: QWebEngineUrlRequestJob, full_path: str) -> None:
+        device = open_file_device(full_path)
+        if device is None:
+            job.fail(QWebEngineUrlRequestJob.Error.RequestDenied)
+            return
+        # The job does not own the device; release it once the job is done with it
+        job.destroyed.connect(device.deleteLater)
+
+        if hasattr(job, 'setAdditionalResponseHeaders'):
+            job.setAdditionalResponseHeaders(RESPONSE_HEADERS)
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        job.reply(content_type.encode('ascii'), device)
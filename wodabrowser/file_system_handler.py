@@ -3,7 +3,116 @@ import json
 import subprocess
 import shlex
 import base64
-from PyQt6.QtCore import QObject, pyqtSlot, pyqtSignal, QMetaObject, Q_ARG, Qt, QVariant, QTimer
+import hashlib
+import threading
+import time
+import uuid
+from PyQt6.QtCore import QObject, pyqtSlot, pyqtSignal, QVariant, QTimer, QRunnable, QThreadPool, QStandardPaths
+try:
+    from .directory_listing import scan_directory, snapshot_directory, list_columns, query_directory, ListingCursor, ListingVersions, DEFAULT_LISTING_COLUMNS
+    from .cache import DirectoryCache, LRUCache, directory_mtime
+    from .file_reader import read_range, read_raw_text, LineIndex, ContentCache
+    from .upload_session import UploadSession
+    from .file_index import FileIndex
+    from .disk_usage import DiskUsageJob
+    from .batch_operations import run_batch
+    from .file_jobs import FileJob, JobCancelled
+    from .data_push import DataPushChannel
+    from .file_follow import FileFollowService
+    from .directory_watch import DirectoryWatchService
+    from .tree_listing import TreeListingJob
+    from .volumes import VolumeMonitor
+    from .file_edits import apply_edits, EditConflict
+    from .content_search import ContentSearchJob, compile_pattern
+    from .duplicates import DuplicateFinderJob
+    from .archives import split_archive_path, ArchiveIndexes, ArchiveIndexPending, ArchiveListingCursor
+except ImportError:
+    from directory_listing import scan_directory, snapshot_directory, list_columns, query_directory, ListingCursor, ListingVersions, DEFAULT_LISTING_COLUMNS
+    from cache import DirectoryCache, LRUCache, directory_mtime
+    from file_reader import read_range, read_raw_text, LineIndex, ContentCache
+    from upload_session import UploadSession
+    from file_index import FileIndex
+    from disk_usage import DiskUsageJob
+    from batch_operations import run_batch
+    from file_jobs import FileJob, JobCancelled
+    from data_push import DataPushChannel
+    from file_follow import FileFollowService
+    from directory_watch import DirectoryWatchService
+    from tree_listing import TreeListingJob
+    from volumes import VolumeMonitor
+    from file_edits import apply_edits, EditConflict
+    from content_search import ContentSearchJob, compile_pattern
+    from duplicates import DuplicateFinderJob
+    from archives import split_archive_path, ArchiveIndexes, ArchiveIndexPending, ArchiveListingCursor
+
+# Paginated listings
+DEFAULT_LISTING_PAGE_SIZE = 500
+MAX_OPEN_LISTINGS = 16
+MAX_DIRECTORY_WATCHES = 64
+
+# Tree listings
+DEFAULT_TREE_MAX_ENTRIES = 10000
+MAX_TREE_ENTRIES = 200000
+
+# Content searches
+DEFAULT_SEARCH_MAX_RESULTS = 1000
+MAX_SEARCH_RESULTS = 50000
+
+# Directory cache bounds
+DIRECTORY_CACHE_MAX_ENTRIES = 256
+DIRECTORY_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Versioned listing snapshots kept for delta requests
+LISTING_VERSION_CACHE_ENTRIES = 256
+LISTING_VERSION_CACHE_BYTES = 64 * 1024 * 1024
+
+# Ranged reads
+MAX_RANGE_LENGTH = 8 * 1024 * 1024
+LINE_INDEX_CACHE_ENTRIES = 32
+LINE_INDEX_CACHE_BYTES = 8 * 1024 * 1024
+
+# Whole-file reads
+CONTENT_CACHE_ENTRIES = 512
+CONTENT_CACHE_BYTES = 64 * 1024 * 1024
+CONTENT_CACHE_MAX_FILE_SIZE = 4 * 1024 * 1024
+
+# Chunked uploads
+MAX_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_IDLE_TIMEOUT = 15 * 60
+
+# Filename index
+INDEX_FILE_NAME = 'file_index.sqlite'
+DEFAULT_SEARCH_LIMIT = 200
+
+# Directory sizes
+DISK_USAGE_CACHE_ENTRIES = 100000
+DISK_USAGE_CACHE_BYTES = 32 * 1024 * 1024
+# Size walks run on their own small pool so a folder full of subfolders
+# cannot occupy every worker and stall listings and reads
+DISK_USAGE_POOL_SIZE = 2
+
+# File hashes for duplicate searches, validated against (mtime, size)
+HASH_CACHE_ENTRIES = 200000
+HASH_CACHE_BYTES = 32 * 1024 * 1024
+
+# Archives browsed as directories
+ARCHIVE_INDEX_CACHE_ENTRIES = 32
+ARCHIVE_INDEX_CACHE_BYTES = 64 * 1024 * 1024
+ARCHIVE_EXTRACT_DIR_NAME = 'archive-members'
+
+# Worker threads for blocking filesystem calls
+WORKER_POOL_SIZE = 8
+
+class FileSystemTask(QRunnable):
+    """Runs one blocking filesystem call on the handler's thread pool."""
+
+    def __init__(self, function, *args):
+        super().__init__()
+        self.function = function
+        self.args = args
+
+    def run(self):
+        self.function(*self.args)
 
 class FileSystemHandler(QObject):
     # Define signals with explicit names and signature
@@ -15,19 +124,102 @@ class FileSystemHandler(QObject):
     directoryDeleted = pyqtSignal(str, name='directoryDeleted')
     directoryListed = pyqtSignal(str, str, name='directoryListed')
     errorOccurred = pyqtSignal(str, name='errorOccurred')
+    uploadProgress = pyqtSignal(str, 'qint64', 'qint64', name='uploadProgress')
+    indexingFinished = pyqtSignal(str, name='indexingFinished')
+    directorySizeUpdated = pyqtSignal(str, str, name='directorySizeUpdated')
+    batchCompleted = pyqtSignal(str, str, name='batchCompleted')
+    fileJobProgress = pyqtSignal(str, str, name='fileJobProgress')
+    editsApplied = pyqtSignal(str, str, name='editsApplied')
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, use_worker_pool=False, data_push=None):
         super().__init__(parent)
         self.base_path = os.path.expanduser("~")
         self.setObjectName('fileSystemHandler')
         self._signal_map = {}
         self._register_signals()
         
-        # Cache for directory contents
-        self._directory_cache = {}
+        # Cache for directory contents, validated against directory mtimes
+        self._directory_cache = DirectoryCache(DIRECTORY_CACHE_MAX_ENTRIES, DIRECTORY_CACHE_MAX_BYTES)
+        
+        # Snapshots of listings sent to pages, by version tag, for deltas
+        self._listing_versions = ListingVersions(LRUCache(LISTING_VERSION_CACHE_ENTRIES, LISTING_VERSION_CACHE_BYTES))
+        
+        # Open paginated listings by handle, oldest first
+        self._listing_cursors = {}
+        
+        # Line indexes of large files, validated against (mtime, size)
+        self._line_indexes = LRUCache(LINE_INDEX_CACHE_ENTRIES, LINE_INDEX_CACHE_BYTES)
+        # Files whose line index is being built on the worker pool
+        self._lines_indexing = set()
+        self._lines_indexing_lock = threading.Lock()
+        
+        # Contents of files read whole, validated against (mtime, size)
+        self._content_cache = ContentCache(LRUCache(CONTENT_CACHE_ENTRIES, CONTENT_CACHE_BYTES), CONTENT_CACHE_MAX_FILE_SIZE)
+        
+        # Subtree totals of directories, validated against the mtimes of their subtrees
+        self._disk_usage_cache = LRUCache(DISK_USAGE_CACHE_ENTRIES, DISK_USAGE_CACHE_BYTES)
+        
+        # Running directory size jobs by job id
+        self._disk_usage_jobs = {}
         
-        # Store browser page reference
-        self.browser_page = None
+        # Running tree listings by job id
+        self._tree_jobs = {}
+        
+        # Running content searches by job id
+        self._search_jobs = {}
+        
+        # Partial and full file hashes by inode, validated against (mtime, size)
+        self._hash_cache = LRUCache(HASH_CACHE_ENTRIES, HASH_CACHE_BYTES)
+        
+        # Running duplicate searches by job id
+        self._duplicate_jobs = {}
+        
+        # Mounted volumes, with capacities refreshed in the background
+        self._volume_monitor = VolumeMonitor()
+        
+        # Running copy/move/delete jobs by job id
+        self._file_jobs = {}
+        
+        # Chunked uploads in progress by upload id
+        self._uploads = {}
+        
+        cache_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation) or os.path.join(self.base_path, '.cache')
+        
+        # Filename index of base_path, opened on first use
+        self.index_path = os.path.join(cache_dir, INDEX_FILE_NAME)
+        self._file_index = None
+        self._file_index_lock = threading.Lock()
+        
+        # Member indexes of archives browsed as directories, validated against (mtime, size)
+        self._archive_indexes = ArchiveIndexes(LRUCache(ARCHIVE_INDEX_CACHE_ENTRIES, ARCHIVE_INDEX_CACHE_BYTES))
+        # Archives whose index is being built on the worker pool
+        self._archives_indexing = set()
+        self._archives_indexing_lock = threading.Lock()
+        # Archive members opened with an application are extracted here
+        self.archive_extract_path = os.path.join(cache_dir, ARCHIVE_EXTRACT_DIR_NAME)
+        
+        # Structured data for pages (listings, notifications) goes out here
+        self.data_push = data_push if data_push is not None else DataPushChannel(self)
+        
+        # Directories watched for pages; changes are pushed on 'directoryChanged'
+        self._directory_watches = DirectoryWatchService(self._directory_watch_changed, self)
+        # Per watch: the page's path, the version of the last state pushed, and a lock
+        self._watched_directories = {}
+        
+        # Files followed like tail -f; appended data is pushed on 'fileAppended'
+        self._file_follows = FileFollowService(lambda batch: self.data_push.push('fileAppended', batch), self)
+        
+        # When enabled, signal-based slots return at once and do their I/O on
+        # the pool; results reach the page through queued signal emission
+        self.use_worker_pool = use_worker_pool
+        self._thread_pool = QThreadPool(self)
+        self._thread_pool.setMaxThreadCount(WORKER_POOL_SIZE)
+        # Changes to the filesystem run one at a time in the order they were
+        # requested, so e.g. createDirectory followed by createFile inside it works
+        self._mutation_pool = QThreadPool(self)
+        self._mutation_pool.setMaxThreadCount(1)
+        self._disk_usage_pool = QThreadPool(self)
+        self._disk_usage_pool.setMaxThreadCount(DISK_USAGE_POOL_SIZE)
         
         print("FileSystemHandler initialized with name:", self.objectName())
         self._debug_signals()
@@ -42,7 +234,13 @@ class FileSystemHandler(QObject):
             'directoryCreated': self.directoryCreated,
             'directoryDeleted': self.directoryDeleted,
             'directoryListed': self.directoryListed,
-            'errorOccurred': self.errorOccurred
+            'errorOccurred': self.errorOccurred,
+            'uploadProgress': self.uploadProgress,
+            'indexingFinished': self.indexingFinished,
+            'directorySizeUpdated': self.directorySizeUpdated,
+            'batchCompleted': self.batchCompleted,
+            'fileJobProgress': self.fileJobProgress,
+            'editsApplied': self.editsApplied
         }
         print("Registered signals:", list(self._signal_map.keys()))
 
@@ -56,34 +254,327 @@ class FileSystemHandler(QObject):
             }
         print(f"Available signals: {signals}")
 
+    def _dispatch(self, function, *args):
+        """Run a slot body on the worker pool, or inline when the pool is disabled."""
+        if self.use_worker_pool:
+            self._thread_pool.start(FileSystemTask(function, *args))
+        else:
+            function(*args)
+
+    def _dispatch_mutation(self, function, *args):
+        """Like _dispatch, but for slots that change the filesystem: they run in call order."""
+        if self.use_worker_pool:
+            self._mutation_pool.start(FileSystemTask(function, *args))
+        else:
+            function(*args)
+
+    def wait_for_workers(self, msecs=-1):
+        """Block until all queued filesystem work has finished."""
+        return (self._mutation_pool.waitForDone(msecs) and self._thread_pool.waitForDone(msecs)
+                and self._disk_usage_pool.waitForDone(msecs))
+
+    def _path_changed(self, full_path):
+        """Drop cached data that a change to full_path makes stale."""
+        self._directory_cache.invalidate_parent(full_path)
+        self._content_cache.invalidate(full_path)
+        # Every ancestor's subtree total includes this path
+        path = os.path.dirname(os.path.normpath(full_path))
+        while True:
+            self._disk_usage_cache.invalidate(path)
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+
     def _resolve_path(self, path):
         """Resolve path to either absolute or relative to base_path."""
         if path.startswith("/"):
             return path
         return os.path.join(self.base_path, path)
 
+    def _resolve_listing_path(self, dirPath):
+        """Resolve a listing path, always relative to base_path."""
+        if not dirPath or dirPath == '.' or dirPath == './':
+            return self.base_path
+        # Remove leading slashes to prevent absolute path traversal
+        safe_path = dirPath.lstrip('/')
+        return os.path.join(self.base_path, safe_path)
+
+    def _archive_index(self, archive_path, wait):
+        """Return an archive's index.
+
+        Building an index reads the archive's directory, or decompresses a
+        compressed tar whole, so slots answering on the GUI thread pass
+        wait=False: an index that is not cached yet is then built on the
+        worker pool, which pushes 'archiveIndexed' when it is ready, and
+        ArchiveIndexPending is raised meanwhile.
+        """
+        if wait:
+            return self._archive_indexes.get(archive_path)
+        index = self._archive_indexes.peek(archive_path)
+        if index is None:
+            with self._archives_indexing_lock:
+                start = archive_path not in self._archives_indexing
+                self._archives_indexing.add(archive_path)
+            if start:
+                self._dispatch(self._index_archive, archive_path)
+            # Without the worker pool the index was just built inline
+            index = self._archive_indexes.peek(archive_path)
+        if index is None:
+            raise ArchiveIndexPending(f"Archive is being indexed: {archive_path}")
+        return index
+
+    def _index_archive(self, archive_path):
+        result = {'path': os.path.relpath(archive_path, self.base_path)}
+        try:
+            self._archive_indexes.get(archive_path)
+        except Exception as e:
+            error_msg = f"Error indexing archive {archive_path}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            result['error'] = str(e)
+        finally:
+            with self._archives_indexing_lock:
+                self._archives_indexing.discard(archive_path)
+        self.data_push.push('archiveIndexed', result)
+
+    def _archive_entries(self, full_path, wait=True):
+        """Listing entries of a directory inside an archive, or None if full_path is not in one."""
+        location = split_archive_path(full_path)
+        if location is None:
+            return None
+        archive_path, inner = location
+        return self._archive_index(archive_path, wait).list(inner, os.path.relpath(full_path, self.base_path))
+
+    def _list_or_archive(self, full_path, list_directory, wait=True):
+        """Return (list_directory(full_path), None), or (None, archive entries) for a path inside an archive.
+
+        The archive lookup walks up the path with a stat per level, so it
+        only runs once listing the path as a directory failed because it is
+        missing or not a directory. See _archive_index for ``wait``.
+        """
+        try:
+            return list_directory(full_path), None
+        except (FileNotFoundError, NotADirectoryError):
+            entries = self._archive_entries(full_path, wait)
+            if entries is None:
+                raise
+            return None, entries
+
+    def _scan_or_archive(self, full_path, scan, wait=True):
+        """Return (scan(os.scandir), False), or (scan(<archive scandir>), True) for a path inside an archive.
+
+        Like _list_or_archive, for listings built by the directory_listing
+        functions, which take the scandir to list with.
+        """
+        try:
+            return scan(os.scandir), False
+        except (FileNotFoundError, NotADirectoryError):
+            location = split_archive_path(full_path)
+            if location is None:
+                raise
+            return scan(self._archive_index(location[0], wait).scandir), True
+
+    @staticmethod
+    def _mark_archive_entries(*entry_lists):
+        # Listings read from an archive carry the same flag as ArchiveIndex.list entries
+        for entries in entry_lists:
+            for entry in entries:
+                entry['archive'] = True
+
+    # The one-argument overloads keep pages written before request ids working
     @pyqtSlot(str)
-    def readFile(self, filePath):
-        """Read a file and emit its content."""
+    @pyqtSlot(str, str)
+    def readFile(self, filePath, requestId=''):
+        """Read a file, emit its content and push it (or the error) on the 'fileRead' topic.
+
+        The pushed payload carries requestId, so a page only takes the
+        replies to its own requests; every page shares the data push channel.
+        Replies without a request id are handed to ``window.readFileCallback``
+        on the pages that still define one.
+        """
+        self._dispatch(self._read_file, filePath, requestId)
+
+    def _read_file(self, filePath, requestId=''):
         full_path = self._resolve_path(filePath)
         try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content, _ = self._content_cache.read(full_path)
             self.fileRead.emit(filePath, content)
+            self.data_push.push('fileRead', {'requestId': requestId, 'path': filePath, 'content': content})
+        except Exception as e:
+            error_msg = f"Error reading file {filePath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            self.data_push.push('fileRead', {'requestId': requestId, 'path': filePath, 'error': str(e)})
+
+    @pyqtSlot(str, str, result=str)
+    def readFileIfChanged(self, filePath, knownHash):
+        """Read a text file unless the caller already has this content.
+
+        Like an HTTP If-None-Match request: when knownHash matches the
+        file's current content hash the JSON has ``unchanged`` set and no
+        ``content``. Either way ``hash`` is the hash to send next time.
+        """
+        full_path = self._resolve_path(filePath)
+        try:
+            content, content_hash = self._content_cache.read(full_path)
+            if knownHash and knownHash == content_hash:
+                return json.dumps({'path': filePath, 'hash': content_hash, 'unchanged': True})
+            return json.dumps({'path': filePath, 'hash': content_hash, 'unchanged': False, 'content': content})
         except Exception as e:
             error_msg = f"Error reading file {filePath}: {str(e)}"
             print(error_msg)
             self.errorOccurred.emit(error_msg)
+            return json.dumps({'path': filePath, 'error': str(e)})
+
+    @pyqtSlot(str, 'qint64', 'qint64', str, result=str)
+    def readFileRange(self, filePath, offset, length, encoding):
+        """Read a byte range of a file as JSON; binary data is base64 when no encoding is given.
+
+        For a member of an archive that is still being indexed the JSON has
+        ``pending`` set; read again once 'archiveIndexed' is pushed.
+        """
+        full_path = self._resolve_path(filePath)
+        try:
+            location = None if os.path.exists(full_path) else split_archive_path(full_path)
+            if location is not None:
+                # Members of archives are decompressed up to the range, never extracted
+                archive_path, inner = location
+                index = self._archive_index(archive_path, wait=False)
+                result = index.read_range(inner, offset, min(length, MAX_RANGE_LENGTH), encoding)
+            else:
+                result = read_range(full_path, offset, min(length, MAX_RANGE_LENGTH), encoding)
+            result['path'] = filePath
+            return json.dumps(result)
+        except ArchiveIndexPending as e:
+            return json.dumps({'path': filePath, 'error': str(e), 'pending': True})
+        except Exception as e:
+            error_msg = f"Error reading range of file {filePath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return json.dumps({'path': filePath, 'error': str(e)})
+
+    @pyqtSlot(str, result='qint64')
+    def getFileSize(self, filePath):
+        """Return the size of a file (or archive member) in bytes, or -1 if it cannot be read (yet)."""
+        full_path = self._resolve_path(filePath)
+        try:
+            location = None if os.path.exists(full_path) else split_archive_path(full_path)
+            if location is not None:
+                archive_path, inner = location
+                return self._archive_index(archive_path, wait=False).member(inner)['size']
+            return os.path.getsize(full_path)
+        except Exception as e:
+            print(f"Error getting size of file {filePath}: {str(e)}")
+            return -1
+
+    @pyqtSlot(str, 'qint64', result=str)
+    def followFile(self, filePath, fromOffset):
+        """Follow a growing file and return the follow id ('' on error).
+
+        Text appended from fromOffset on (-1 for the current end) is pushed
+        on the 'fileAppended' topic in batches. Truncated files are read
+        again from the start and rotated files are followed to their
+        replacement; the batch flags say when either happened.
+        """
+        try:
+            return self._file_follows.follow(self._resolve_path(filePath), fromOffset)
+        except Exception as e:
+            error_msg = f"Error following file {filePath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return ""
+
+    @pyqtSlot(str)
+    def unfollowFile(self, followId):
+        """Stop following a file."""
+        self._file_follows.unfollow(followId)
+
+    def _line_index(self, full_path, filePath):
+        """Return the file's line index if it is cached and current, else None.
+
+        Building an index reads the whole file, so a missing one is built on
+        the worker pool, which pushes it on the 'lineIndex' topic (see
+        getLineIndex). Without the worker pool it is built at once.
+        """
+        stat = os.stat(full_path)
+        tag = (stat.st_mtime_ns, stat.st_size)
+        index = self._line_indexes.get(full_path, tag)
+        if index is None:
+            with self._lines_indexing_lock:
+                start = full_path not in self._lines_indexing
+                self._lines_indexing.add(full_path)
+            if start:
+                self._dispatch(self._index_lines, full_path, filePath)
+            index = self._line_indexes.get(full_path, tag)
+        return index
+
+    def _index_lines(self, full_path, filePath):
+        try:
+            index = LineIndex(full_path)
+            self._line_indexes.put(full_path, index, index.memory_size(), (index.mtime, index.size))
+            result = {'path': filePath, 'size': index.size, 'line_count': index.line_count}
+        except Exception as e:
+            error_msg = f"Error indexing lines of file {filePath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            result = {'path': filePath, 'error': str(e)}
+        finally:
+            with self._lines_indexing_lock:
+                self._lines_indexing.discard(full_path)
+        self.data_push.push('lineIndex', result)
+
+    @pyqtSlot(str, result=str)
+    def getLineIndex(self, filePath):
+        """Return the size and line count of a file as JSON.
+
+        When the file has not been indexed since it last changed, the JSON
+        only has ``path`` and ``pending``: the index is built on the worker
+        pool and the same size and line count are pushed on the 'lineIndex'
+        topic once it is ready.
+        """
+        try:
+            index = self._line_index(self._resolve_path(filePath), filePath)
+            if index is None:
+                return json.dumps({'path': filePath, 'pending': True})
+            return json.dumps({'path': filePath, 'size': index.size, 'line_count': index.line_count})
+        except Exception as e:
+            error_msg = f"Error indexing lines of file {filePath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return json.dumps({'path': filePath, 'error': str(e)})
+
+    @pyqtSlot(str, 'qint64', int, result=str)
+    def getLineOffsets(self, filePath, startLine, count):
+        """Return byte offsets of a window of lines as JSON, plus the offset where the window ends.
+
+        Like getLineIndex, this answers ``pending`` until the file is indexed.
+        """
+        try:
+            index = self._line_index(self._resolve_path(filePath), filePath)
+            if index is None:
+                return json.dumps({'path': filePath, 'pending': True})
+            offsets = index.line_offsets(startLine, count)
+            return json.dumps({'path': filePath, 'start_line': startLine, 'line_count': index.line_count, 'offsets': offsets})
+        except Exception as e:
+            error_msg = f"Error getting line offsets of file {filePath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return json.dumps({'path': filePath, 'error': str(e)})
 
     @pyqtSlot(str, str)
     def createFile(self, filePath, content):
         """Create a file with the given content."""
+        self._dispatch_mutation(self._create_file, filePath, content)
+
+    def _create_file(self, filePath, content):
         print(f"Creating file: {filePath}")
         full_path = self._resolve_path(filePath)
         try:
             os.makedirs(os.path.dirname(full_path), exist_ok=True)
             with open(full_path, 'w', encoding='utf-8') as f:
                 f.write(content)
+            self._path_changed(full_path)
             print(f"File created successfully: {filePath}")
             print(f"Emitting fileCreated signal with path: {filePath}")
             self.fileCreated.emit(filePath)
@@ -98,9 +589,13 @@ class FileSystemHandler(QObject):
     @pyqtSlot(str)
     def createDirectory(self, dirPath: str) -> None:
         """Create a directory and emit appropriate signals."""
+        self._dispatch_mutation(self._create_directory, dirPath)
+
+    def _create_directory(self, dirPath):
         print(f"Creating directory: {dirPath}")
         try:
             os.makedirs(dirPath, exist_ok=True)
+            self._path_changed(os.path.abspath(dirPath))
             print(f"Directory created successfully: {dirPath}")
             # Add more logging for signal emission
             print(f"Emitting directoryCreated signal with path: {dirPath}")
@@ -116,22 +611,90 @@ class FileSystemHandler(QObject):
     @pyqtSlot(str, str)
     def changeFileContent(self, filePath, content):
         """Change the content of a file."""
+        self._dispatch_mutation(self._change_file_content, filePath, content)
+
+    def _change_file_content(self, filePath, content):
         full_path = self._resolve_path(filePath)
         try:
             with open(full_path, 'w', encoding='utf-8') as f:
                 f.write(content)
+            self._path_changed(full_path)
             self.fileChanged.emit(filePath)
         except Exception as e:
             error_msg = f"Error changing file content {filePath}: {str(e)}"
             print(error_msg)
             self.errorOccurred.emit(error_msg)
 
+    @pyqtSlot(str, result=str)
+    def readFileForEdit(self, filePath):
+        """Read a text file as it is on disk, line endings included, for applyEdits.
+
+        The JSON has ``content`` plus the ``hash``, ``size`` and ``mtimeNs``
+        of those exact bytes. Offsets for applyEdits must be taken from this
+        content: readFile and readFileIfChanged translate CRLF to LF.
+        """
+        try:
+            result = read_raw_text(self._resolve_path(filePath))
+            return json.dumps({'path': filePath, 'content': result['content'], 'hash': result['hash'],
+                               'size': result['size'], 'mtimeNs': result['mtime_ns']})
+        except Exception as e:
+            error_msg = f"Error reading file {filePath} for editing: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return json.dumps({'path': filePath, 'error': str(e)})
+
+    @pyqtSlot(str, str, result=str)
+    def applyEdits(self, filePath, editsJson):
+        """Apply byte-offset edits to a file instead of rewriting it from a full string; returns the edit id.
+
+        editsJson is {"edits": [{"offset", "delete", "insert"}, ...]} with
+        optional ``expectedMtimeNs``, ``expectedSize`` and ``expectedHash``
+        (as returned by readFileForEdit, whose content the offsets refer to)
+        guarding against overwriting a file that changed since it was read.
+        The hash from readFileIfChanged only matches for files without CR
+        line endings, where its text is the file's bytes. A mismatch returns an error
+        with ``conflict`` set and leaves the file untouched. On success the
+        JSON has the new ``size`` and ``mtimeNs`` to guard the next edit.
+        The edits run in order with the other changes to the filesystem and
+        the JSON arrives through editsApplied(edit id, JSON).
+        """
+        edit_id = uuid.uuid4().hex
+        self._dispatch_mutation(self._apply_edits, edit_id, filePath, editsJson)
+        return edit_id
+
+    def _apply_edits(self, edit_id, filePath, editsJson):
+        self.editsApplied.emit(edit_id, json.dumps(self._edit_result(filePath, editsJson)))
+
+    def _edit_result(self, filePath, editsJson):
+        full_path = self._resolve_path(filePath)
+        try:
+            request = json.loads(editsJson)
+            result = apply_edits(full_path, request.get('edits', []),
+                                 expected_mtime_ns=request.get('expectedMtimeNs'),
+                                 expected_size=request.get('expectedSize'),
+                                 expected_hash=request.get('expectedHash'))
+            self._path_changed(full_path)
+            self.fileChanged.emit(filePath)
+            return {'path': filePath, 'size': result['size'], 'mtimeNs': result['mtime_ns'], 'inPlace': result['in_place']}
+        except EditConflict as e:
+            print(f"Not applying edits to {filePath}: {str(e)}")
+            return {'path': filePath, 'error': str(e), 'conflict': True}
+        except Exception as e:
+            error_msg = f"Error applying edits to file {filePath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return {'path': filePath, 'error': str(e)}
+
     @pyqtSlot(str)
     def deleteFile(self, filePath):
         """Delete a file."""
+        self._dispatch_mutation(self._delete_file, filePath)
+
+    def _delete_file(self, filePath):
         full_path = self._resolve_path(filePath)
         try:
             os.remove(full_path)
+            self._path_changed(full_path)
             self.fileDeleted.emit(filePath)
         except Exception as e:
             error_msg = f"Error deleting file {filePath}: {str(e)}"
@@ -141,36 +704,141 @@ class FileSystemHandler(QObject):
     @pyqtSlot(str)
     def deleteDirectory(self, dirPath):
         """Delete a directory."""
+        self._dispatch_mutation(self._delete_directory, dirPath)
+
+    def _delete_directory(self, dirPath):
         full_path = self._resolve_path(dirPath)
         try:
             os.rmdir(full_path)  # Only works for empty directories
+            self._directory_cache.invalidate(full_path)
+            self._path_changed(full_path)
             self.directoryDeleted.emit(dirPath)
         except Exception as e:
             error_msg = f"Error deleting directory {dirPath}: {str(e)}"
             print(error_msg)
             self.errorOccurred.emit(error_msg)
 
+    @pyqtSlot(str, result=str)
+    def executeBatch(self, opsJson):
+        """Run a list of file operations in one call and return the batch id.
+
+        opsJson is either a list of operations or an object
+        ``{"ops": [...], "transactional": true}``; each operation looks like
+        ``{"op": "createFile", "path": "...", "content": "..."}``. Results
+        arrive once, through batchCompleted(batch id, JSON), instead of as
+        one signal per operation.
+        """
+        batch_id = uuid.uuid4().hex
+        self._dispatch_mutation(self._execute_batch, batch_id, opsJson)
+        return batch_id
+
+    def _execute_batch(self, batch_id, opsJson):
+        try:
+            request = json.loads(opsJson)
+            if isinstance(request, list):
+                request = {'ops': request}
+            ops = request.get('ops', [])
+            print(f"[DEBUG] executeBatch {batch_id}: {len(ops)} operations, transactional: {bool(request.get('transactional'))}")
+            result = run_batch(ops, self._resolve_path, bool(request.get('transactional')))
+            for full_path in result.pop('changed'):
+                self._path_changed(full_path)
+                # A removed directory's own listing and size are stale too
+                self._directory_cache.invalidate(full_path)
+        except Exception as e:
+            error_msg = f"Error executing batch {batch_id}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            result = {'results': [], 'failed': 0, 'rolled_back': False, 'error': str(e)}
+        result['batch_id'] = batch_id
+        self.batchCompleted.emit(batch_id, json.dumps(result, separators=(',', ':')))
+
+    @pyqtSlot(str, str, result=str)
+    def copyPath(self, sourcePath, destinationPath):
+        """Copy a file or directory tree in the background and return the job id."""
+        return self._start_file_job('copy', sourcePath, destinationPath)
+
+    @pyqtSlot(str, str, result=str)
+    def movePath(self, sourcePath, destinationPath):
+        """Move a file or directory tree in the background and return the job id."""
+        return self._start_file_job('move', sourcePath, destinationPath)
+
+    @pyqtSlot(str, result=str)
+    def deletePath(self, path):
+        """Delete a file or a whole directory tree in the background and return the job id."""
+        return self._start_file_job('delete', path, '')
+
+    @pyqtSlot(str)
+    def cancelFileJob(self, jobId):
+        """Stop a copy, move or delete job at its next chunk or file."""
+        job = self._file_jobs.get(jobId)
+        if job is not None:
+            job.cancel()
+
+    def _is_protected_path(self, full_path):
+        """Whether full_path is the base path, one of its ancestors or the root, none of which may be removed."""
+        path = os.path.normpath(full_path)
+        # Resolve symlinks in the parents only, so a link to the base path can still go
+        path = os.path.join(os.path.realpath(os.path.dirname(path)), os.path.basename(path))
+        base = os.path.realpath(self.base_path)
+        return path == base or (base + os.sep).startswith(path.rstrip(os.sep) + os.sep)
+
+    def _start_file_job(self, operation, sourcePath, destinationPath):
+        """Start a FileJob and return its id ('' if refused).
+
+        Progress and the outcome arrive through fileJobProgress(job id, JSON).
+        A delete or move of the base path, any of its ancestors or the
+        filesystem root is refused before a job is created. Jobs run in call
+        order with the other changes (see _dispatch_mutation), so changes
+        issued after a job wait until it finishes or is cancelled.
+        """
+        source = self._resolve_path(sourcePath)
+        if operation in ('delete', 'move') and (not sourcePath.strip() or self._is_protected_path(source)):
+            error_msg = f"Refusing to {operation} {sourcePath or '(empty path)'}: it contains the base path"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return ""
+        job_id = uuid.uuid4().hex
+        destination = self._resolve_path(destinationPath) if destinationPath else ''
+        job = FileJob(operation, source, destination,
+                      lambda progress: self.fileJobProgress.emit(job_id, json.dumps(progress)))
+        self._file_jobs[job_id] = job
+        self._dispatch_mutation(self._run_file_job, job_id, job)
+        return job_id
+
+    def _run_file_job(self, job_id, job):
+        print(f"[DEBUG] {job.operation} job {job_id}: {job.source} -> {job.destination}")
+        try:
+            result = job.run()
+        except JobCancelled:
+            result = job.progress(done=True)
+            result['cancelled'] = True
+        except Exception as e:
+            error_msg = f"Error during {job.operation} of {job.source}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            result = job.progress(done=True)
+            result['error'] = str(e)
+        finally:
+            self._file_jobs.pop(job_id, None)
+        # Even a cancelled or failed job may have changed both trees
+        for full_path in (job.source, job.destination):
+            if full_path:
+                self._path_changed(full_path)
+                self._directory_cache.invalidate(full_path)
+        self.fileJobProgress.emit(job_id, json.dumps(result))
+
     @pyqtSlot(str)
     def listDirectory(self, dirPath):
+        """List a directory and emit directoryListed."""
+        self._dispatch(self._list_directory, dirPath)
+
+    def _list_directory(self, dirPath):
         print(f"[DEBUG] listDirectory called with dirPath: '{dirPath}'")
-        if not dirPath or dirPath == '.' or dirPath == './':
-            full_path = self.base_path
-        else:
-            # Remove leading slashes to prevent absolute path traversal
-            safe_path = dirPath.lstrip('/')
-            full_path = os.path.join(self.base_path, safe_path)
+        full_path = self._resolve_listing_path(dirPath)
         print(f"[DEBUG] Listing directory: {full_path}")
         try:
-            entries = []
-            for name in os.listdir(full_path):
-                path = os.path.join(full_path, name)
-                entry = {
-                    'name': name,
-                    'is_dir': os.path.isdir(path),
-                    'is_file': os.path.isfile(path),
-                    'path': os.path.relpath(path, self.base_path)
-                }
-                entries.append(entry)
+            entries, archive_entries = self._list_or_archive(full_path, lambda path: scan_directory(path, self.base_path))
+            entries = archive_entries if entries is None else entries
             print(f"[DEBUG] Found {len(entries)} entries in {full_path}")
             self.directoryListed.emit(dirPath or '', json.dumps(entries))
         except Exception as e:
@@ -182,146 +850,543 @@ class FileSystemHandler(QObject):
     def getDirectoryContents(self, dirPath):
         """Get directory contents directly as a JSON string (no signals)."""
         print(f"[DEBUG] getDirectoryContents called with dirPath: '{dirPath}'")
+        full_path = self._resolve_listing_path(dirPath)
         try:
-            if not dirPath or dirPath == '.' or dirPath == './':
-                full_path = self.base_path
-            else:
-                # Remove leading slashes to prevent absolute path traversal
-                safe_path = dirPath.lstrip('/')
-                full_path = os.path.join(self.base_path, safe_path)
-            
             print(f"[DEBUG] Getting directory contents: {full_path}")
-            entries = []
-            for name in os.listdir(full_path):
-                try:
-                    path = os.path.join(full_path, name)
-                    entry = {
-                        'name': name,
-                        'is_dir': os.path.isdir(path),
-                        'is_file': os.path.isfile(path),
-                        'path': os.path.relpath(path, self.base_path)
-                    }
-                    entries.append(entry)
-                except Exception as e:
-                    print(f"Error processing entry {name}: {e}")
-                    # Skip problematic entries instead of failing the whole operation
-                    continue
-            
+            # Take the mtime before scanning so changes made meanwhile invalidate the entry
+            mtime = directory_mtime(full_path)
+            entries, archive_entries = self._list_or_archive(full_path, lambda path: scan_directory(path, self.base_path),
+                                                             wait=False)
+            entries = archive_entries if entries is None else entries
             print(f"[DEBUG] Returning {len(entries)} entries for {full_path}")
             result = json.dumps(entries)
             print(f"[DEBUG] JSON result length: {len(result)}")
             
-            # Store the result in cache for access through getCachedDirectoryContents
-            cache_key = dirPath or ""
-            self._directory_cache[cache_key] = result
+            # Store the result in cache for access through getCachedDirectoryContents;
+            # archive listings have no directory mtime to validate it and are cached by the archive index
+            if archive_entries is None:
+                self._directory_cache.put(full_path, result, mtime)
             
             # Also emit the signal as a backup method
             self.directoryListed.emit(dirPath or '', result)
             
             return result
+        except ArchiveIndexPending as e:
+            # Not cached: the page asks again once 'archiveIndexed' is pushed
+            print(str(e))
+            return json.dumps([{"name": "Loading...", "is_dir": False, "is_file": True, "path": "loading.txt"}])
         except Exception as e:
             error_msg = f"Error getting directory contents for {dirPath}: {str(e)}"
             print(error_msg)
             error_json = json.dumps([{"name": "Error loading directory", "is_dir": False, "is_file": True, "path": "error.txt"}])
-            # Store error result in cache
-            cache_key = dirPath or ""
-            self._directory_cache[cache_key] = error_json
+            # Store error result in cache until the directory changes
+            self._directory_cache.put(full_path, error_json, directory_mtime(full_path))
             return error_json
     
+    @pyqtSlot(str, str, result=str)
+    def getDirectoryListing(self, dirPath, optionsJson):
+        """List a directory as sorted, column-projected JSON.
+
+        optionsJson may set ``columns`` (any of name, path, is_dir, is_file,
+        size, mtime, mode, mime), ``sort`` (name, size, mtime or type),
+        ``descending``, ``natural`` and ``dirs_first``. Inside an archive
+        that is still being indexed the JSON has ``pending`` set; list
+        again once 'archiveIndexed' is pushed.
+        """
+        full_path = self._resolve_listing_path(dirPath)
+        try:
+            options = json.loads(optionsJson) if optionsJson else {}
+            listing, _ = self._scan_or_archive(full_path, lambda scandir: list_columns(
+                full_path, self.base_path,
+                columns=options.get('columns', DEFAULT_LISTING_COLUMNS),
+                sort=options.get('sort', 'name'),
+                descending=bool(options.get('descending', False)),
+                natural=bool(options.get('natural', True)),
+                dirs_first=bool(options.get('dirs_first', True)),
+                scandir=scandir), wait=False)
+            listing['path'] = dirPath
+            return json.dumps(listing, separators=(',', ':'))
+        except ArchiveIndexPending as e:
+            return json.dumps({'path': dirPath, 'count': 0, 'columns': {}, 'error': str(e), 'pending': True})
+        except Exception as e:
+            error_msg = f"Error listing directory {dirPath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return json.dumps({'path': dirPath, 'count': 0, 'columns': {}, 'error': str(e)})
+
+    @pyqtSlot(str, str, result=str)
+    def queryDirectory(self, dirPath, queryJson):
+        """Return the directory entries matching a query as JSON.
+
+        queryJson may set ``glob`` and/or ``regex`` (with ``ignore_case``),
+        ``type`` (file, dir or symlink), ``min_size``/``max_size`` in bytes,
+        ``min_mtime``/``max_mtime`` in epoch seconds, ``include_hidden``
+        (default true) and ``offset``/``limit`` for paging. Archives are
+        queried like directories; see getDirectoryListing for ``pending``.
+        """
+        full_path = self._resolve_listing_path(dirPath)
+        try:
+            query = json.loads(queryJson) if queryJson else {}
+            result, in_archive = self._scan_or_archive(
+                full_path, lambda scandir: query_directory(full_path, self.base_path, query, scandir), wait=False)
+            if in_archive:
+                self._mark_archive_entries(result['entries'])
+            result['path'] = dirPath
+            return json.dumps(result)
+        except ArchiveIndexPending as e:
+            return json.dumps({'path': dirPath, 'entries': [], 'error': str(e), 'pending': True})
+        except Exception as e:
+            error_msg = f"Error querying directory {dirPath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return json.dumps({'path': dirPath, 'entries': [], 'error': str(e)})
+
+    @pyqtSlot(str, str, result=str)
+    def getDirectoryDelta(self, dirPath, sinceVersion):
+        """Return what changed in a directory since a listing's version tag.
+
+        The JSON always has ``version`` and ``full``. When sinceVersion is
+        empty or no longer known, ``full`` is true and ``entries`` holds the
+        whole listing; otherwise ``added``, ``changed`` (entries) and
+        ``removed`` (paths) describe the difference. Inside an archive that
+        is still being indexed the JSON has ``error`` and ``pending`` set.
+        """
+        full_path = self._resolve_listing_path(dirPath)
+        try:
+            delta, in_archive = self._scan_or_archive(
+                full_path, lambda scandir: self._listing_versions.delta(full_path, self.base_path, sinceVersion, scandir),
+                wait=False)
+            if in_archive:
+                self._mark_archive_entries(delta.get('entries', []), delta.get('added', []), delta.get('changed', []))
+            delta['path'] = dirPath
+            return json.dumps(delta)
+        except ArchiveIndexPending as e:
+            return json.dumps({'path': dirPath, 'error': str(e), 'pending': True})
+        except Exception as e:
+            error_msg = f"Error getting directory delta for {dirPath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return json.dumps({'path': dirPath, 'error': str(e)})
+
     @pyqtSlot(str, result=str)
     def getCachedDirectoryContents(self, dirPath):
         """Get cached directory contents for the given path."""
-        cache_key = dirPath or ""
-        result = self._directory_cache.get(cache_key, None)
+        full_path = self._resolve_listing_path(dirPath)
+        result = self._directory_cache.get(full_path)
         print(f"[DEBUG] getCachedDirectoryContents for {dirPath}: {'Found' if result else 'Not found'}")
         if result:
             return result
-        else:
-            # If not cached, trigger a fetch and return empty for now
-            QTimer.singleShot(0, lambda: self.getDirectoryContents(dirPath))
-            return json.dumps([{"name": "Loading...", "is_dir": False, "is_file": True, "path": "loading.txt"}])
+        if directory_mtime(full_path) is None:
+            # Not on disk, so possibly inside an archive, whose listings live in its index
+            try:
+                entries = self._archive_entries(full_path, wait=False)
+                if entries is not None:
+                    return json.dumps(entries)
+            except ArchiveIndexPending:
+                pass
+            except Exception as e:
+                print(f"Error reading archive listing for {dirPath}: {str(e)}")
+        # If not cached, trigger a fetch and return empty for now
+        QTimer.singleShot(0, lambda: self.getDirectoryContents(dirPath))
+        return json.dumps([{"name": "Loading...", "is_dir": False, "is_file": True, "path": "loading.txt"}])
 
     @pyqtSlot(str)
-    def requestDirectoryContents(self, dirPath):
-        """Request directory contents and store them in a global JS property."""
+    @pyqtSlot(str, str)
+    def requestDirectoryContents(self, dirPath, requestId=''):
+        """List a directory and push it to the page on the 'directoryContents' topic, tagged with requestId."""
+        self._dispatch(self._request_directory_contents, dirPath, requestId)
+
+    def _request_directory_contents(self, dirPath, requestId=''):
         print(f"[DEBUG] requestDirectoryContents called with dirPath: '{dirPath}'")
         try:
-            if not dirPath or dirPath == '.' or dirPath == './':
-                full_path = self.base_path
-            else:
-                # Remove leading slashes to prevent absolute path traversal
-                safe_path = dirPath.lstrip('/')
-                full_path = os.path.join(self.base_path, safe_path)
-            
+            full_path = self._resolve_listing_path(dirPath)
             print(f"[DEBUG] Getting directory contents: {full_path}")
-            entries = []
-            for name in os.listdir(full_path):
-                try:
-                    path = os.path.join(full_path, name)
-                    entry = {
-                        'name': name,
-                        'is_dir': os.path.isdir(path),
-                        'is_file': os.path.isfile(path),
-                        'path': os.path.relpath(path, self.base_path)
-                    }
-                    entries.append(entry)
-                except Exception as e:
-                    print(f"Error processing entry {name}: {e}")
-                    # Skip problematic entries instead of failing the whole operation
-                    continue
-            
+            snapshot, entries = self._list_or_archive(full_path, lambda path: snapshot_directory(path, self.base_path))
+            version = None
+            if snapshot is not None:
+                version = self._listing_versions.register(full_path, snapshot)
+                entries = [record for record, _ in snapshot.values()]
             print(f"[DEBUG] Found {len(entries)} entries for {full_path}")
-            result = json.dumps(entries)
-            print(f"[DEBUG] JSON result length: {len(result)}")
-            
-            # Set global variable directly in JavaScript
-            js_code = f"""
-                (function() {{
-                    console.log('[PY->JS] Setting directory contents');
-                    window.directoryContents = JSON.parse('{result.replace("'", "\\'")}');
-                    window.currentDirectoryPath = '{dirPath}';
-                    console.log('[PY->JS] Directory contents set:', window.directoryContents.length, 'items');
-                    
-                    // Call renderFileArea directly if it exists
-                    if (typeof updateBreadcrumb === 'function' && typeof renderFileArea === 'function') {{
-                        console.log('[PY->JS] Calling rendering functions directly');
-                        updateBreadcrumb('{dirPath}');
-                        renderFileArea(window.directoryContents);
-                    }}
-                    
-                    // Dispatch a custom event for any listeners
-                    var customEvent = new CustomEvent('directoryContentsUpdated', {{ 
-                        detail: {{ path: '{dirPath}', entries: window.directoryContents }}
-                    }});
-                    window.dispatchEvent(customEvent);
-                }})();
-            """
-            
-            # Get the current page/frame to run JavaScript
-            page = None
-            if hasattr(self, 'browser_page'):
-                page = self.browser_page
-            elif hasattr(self.parent(), 'tabs') and self.parent().tabs.count() > 0:
-                current_tab = self.parent().tabs.currentWidget()
-                if hasattr(current_tab, 'browser'):
-                    page = current_tab.browser.page()
-            
-            if page:
-                print(f"[DEBUG] Running JavaScript to update UI")
-                page.runJavaScript(js_code)
-            else:
-                print(f"[DEBUG] No page found to run JavaScript")
+            # The page's data push listener stores and renders the listing
+            self.data_push.push('directoryContents', {'requestId': requestId, 'path': dirPath, 'version': version,
+                                                      'entries': entries})
                 
             # Also emit signal as a backup method
-            self.directoryListed.emit(dirPath or '', result)
+            self.directoryListed.emit(dirPath or '', json.dumps(entries))
         except Exception as e:
             error_msg = f"Error getting directory contents for {dirPath}: {str(e)}"
             print(error_msg)
             self.errorOccurred.emit(error_msg)
 
+    @pyqtSlot(str, str, result=str)
+    def watchDirectory(self, dirPath, sinceVersion):
+        """Watch a directory and return the watch id ('' on error).
+
+        Changes are coalesced and pushed on the 'directoryChanged' topic as
+        deltas (see getDirectoryDelta) against sinceVersion, normally the
+        version of the listing the page shows, and then against each
+        previous push. Without a version the first push is the full listing.
+        """
+        try:
+            watch_id = self._directory_watches.watch(self._resolve_listing_path(dirPath))
+        except Exception as e:
+            error_msg = f"Error watching directory {dirPath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return ""
+        self._watched_directories[watch_id] = {'path': dirPath, 'version': sinceVersion, 'lock': threading.Lock()}
+        # Drop the oldest watches of pages that navigated away without unwatching
+        for stale_id in self._directory_watches.watch_ids()[:-MAX_DIRECTORY_WATCHES]:
+            self.unwatchDirectory(stale_id)
+        return watch_id
+
+    @pyqtSlot(str)
+    def unwatchDirectory(self, watchId):
+        """Stop watching a directory."""
+        self._directory_watches.unwatch(watchId)
+        self._watched_directories.pop(watchId, None)
+
+    def _directory_watch_changed(self, watch_id, full_path):
+        self._dispatch(self._push_directory_changes, watch_id, full_path)
+
+    def _push_directory_changes(self, watch_id, full_path):
+        watch = self._watched_directories.get(watch_id)
+        if watch is None:
+            return
+        # One scan per watch at a time, so each delta starts from the previous one
+        with watch['lock']:
+            try:
+                delta = self._listing_versions.delta(full_path, self.base_path, watch['version'])
+            except Exception as e:
+                error_msg = f"Error listing watched directory {watch['path']}: {str(e)}"
+                print(error_msg)
+                self.data_push.push('directoryChanged', {'watchId': watch_id, 'path': watch['path'], 'error': str(e)})
+                return
+            if not delta['full'] and not (delta['added'] or delta['removed'] or delta['changed']):
+                return
+            watch['version'] = delta['version']
+        delta['watchId'] = watch_id
+        delta['path'] = watch['path']
+        self.data_push.push('directoryChanged', delta)
+
+    @pyqtSlot(result=str)
+    def getCacheStats(self):
+        """Return cache hit/miss/eviction counters as JSON."""
+        return json.dumps({
+            'directory': self._directory_cache.stats(),
+            'content': self._content_cache.stats(),
+            'disk_usage': self._disk_usage_cache.stats(),
+            'hash': self._hash_cache.stats(),
+            'archive': self._archive_indexes.stats()
+        })
+
+    @pyqtSlot(str, result=str)
+    def computeDirectorySize(self, dirPath):
+        """Start computing the total size of a directory tree and return the job id.
+
+        Partial and final totals arrive through directorySizeUpdated as
+        (job id, JSON); the final update has ``done`` set.
+        """
+        full_path = self._resolve_listing_path(dirPath)
+        job_id = uuid.uuid4().hex
+        job = DiskUsageJob(full_path, self._disk_usage_cache,
+                           lambda totals: self._emit_directory_size(job_id, dirPath, totals, False))
+        self._disk_usage_jobs[job_id] = job
+        if self.use_worker_pool:
+            self._disk_usage_pool.start(FileSystemTask(self._compute_directory_size, job_id, dirPath, job))
+        else:
+            self._compute_directory_size(job_id, dirPath, job)
+        return job_id
+
+    def _compute_directory_size(self, job_id, dirPath, job):
+        try:
+            totals = job.run()
+            if totals is not None:
+                self._emit_directory_size(job_id, dirPath, totals, True)
+            else:
+                self.directorySizeUpdated.emit(job_id, json.dumps({'path': dirPath, 'done': True, 'cancelled': True}))
+        except Exception as e:
+            error_msg = f"Error computing size of {dirPath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            self.directorySizeUpdated.emit(job_id, json.dumps({'path': dirPath, 'done': True, 'error': str(e)}))
+        finally:
+            self._disk_usage_jobs.pop(job_id, None)
+
+    def _emit_directory_size(self, job_id, dirPath, totals, done):
+        result = dict(totals)
+        result.update({'path': dirPath, 'done': done})
+        self.directorySizeUpdated.emit(job_id, json.dumps(result))
+
+    @pyqtSlot(str)
+    def cancelDirectorySize(self, jobId):
+        """Stop a directory size job, e.g. when the page navigates away."""
+        job = self._disk_usage_jobs.get(jobId)
+        if job is not None:
+            job.cancel()
+
+    @pyqtSlot(str, int, int, result=str)
+    def listTree(self, dirPath, maxDepth, maxEntries):
+        """List a directory tree down to maxDepth levels and return the job id.
+
+        Nodes are pushed breadth first on the 'treeNodes' topic as
+        ``{jobId, nodes, done: false}`` batches, followed by one
+        ``{jobId, done: true, count, truncated, ...}`` summary. At most
+        maxEntries nodes are sent (0 for the default limit). Trees inside
+        archives are listed too.
+        """
+        full_path = self._resolve_listing_path(dirPath)
+        job_id = uuid.uuid4().hex
+        max_entries = min(maxEntries, MAX_TREE_ENTRIES) if maxEntries > 0 else DEFAULT_TREE_MAX_ENTRIES
+
+        def push_nodes(nodes):
+            if job.scandir is not os.scandir:
+                self._mark_archive_entries(nodes)
+            self.data_push.push('treeNodes', {'jobId': job_id, 'nodes': nodes, 'done': False})
+
+        job = TreeListingJob(full_path, self.base_path, maxDepth, max_entries, push_nodes)
+        self._tree_jobs[job_id] = job
+        self._dispatch(self._list_tree, job_id, dirPath, job)
+        return job_id
+
+    def _list_tree(self, job_id, dirPath, job):
+        try:
+            try:
+                summary = job.run()
+            except (FileNotFoundError, NotADirectoryError):
+                # Only look for an archive once the path failed to list as a directory
+                location = split_archive_path(job.full_path)
+                if location is None:
+                    raise
+                job.scandir = self._archive_indexes.get(location[0]).scandir
+                summary = job.run()
+        except Exception as e:
+            error_msg = f"Error listing tree of {dirPath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            summary = {'error': str(e)}
+        finally:
+            self._tree_jobs.pop(job_id, None)
+        summary.update({'jobId': job_id, 'path': dirPath, 'nodes': [], 'done': True})
+        self.data_push.push('treeNodes', summary)
+
+    @pyqtSlot(str)
+    def cancelTree(self, jobId):
+        """Stop a tree listing."""
+        job = self._tree_jobs.get(jobId)
+        if job is not None:
+            job.cancel()
+
+    @pyqtSlot(str, str, str, result=str)
+    def searchContents(self, root, pattern, optionsJson):
+        """Search the text files under root for pattern and return the job id ('' on error).
+
+        optionsJson may set ``regex``, ``caseSensitive``, ``wholeWord``,
+        ``glob`` (file name filter), ``includeHidden`` and ``maxResults``.
+        Matches (path, line, column, length and the line's text) are pushed
+        on the 'searchResults' topic as ``{jobId, matches, done: false}``
+        batches, followed by one ``{jobId, done: true, count, ...}``
+        summary. Binary files are skipped.
+        """
+        try:
+            options = json.loads(optionsJson) if optionsJson else {}
+            regex = compile_pattern(pattern, bool(options.get('regex')), bool(options.get('caseSensitive')),
+                                    bool(options.get('wholeWord')))
+            full_path = self._resolve_listing_path(root)
+        except Exception as e:
+            error_msg = f"Error starting search in {root}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return ""
+        job_id = uuid.uuid4().hex
+        max_results = int(options.get('maxResults') or 0)
+        max_results = min(max_results, MAX_SEARCH_RESULTS) if max_results > 0 else DEFAULT_SEARCH_MAX_RESULTS
+        job = ContentSearchJob(full_path, self.base_path, regex, max_results,
+                               glob=options.get('glob', ''), include_hidden=bool(options.get('includeHidden')),
+                               batch_callback=lambda matches: self.data_push.push(
+                                   'searchResults', {'jobId': job_id, 'matches': matches, 'done': False}))
+        self._search_jobs[job_id] = job
+        self._dispatch(self._search_contents, job_id, root, job)
+        return job_id
+
+    def _search_contents(self, job_id, root, job):
+        try:
+            summary = job.run()
+        except Exception as e:
+            error_msg = f"Error searching {root}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            summary = {'error': str(e)}
+        finally:
+            self._search_jobs.pop(job_id, None)
+        summary.update({'jobId': job_id, 'path': root, 'matches': [], 'done': True})
+        self.data_push.push('searchResults', summary)
+
+    @pyqtSlot(str)
+    def cancelSearch(self, jobId):
+        """Stop a content search."""
+        job = self._search_jobs.get(jobId)
+        if job is not None:
+            job.cancel()
+
+    @pyqtSlot(str, result=str)
+    def findDuplicates(self, root):
+        """Start looking for files with identical content under root and return the job id.
+
+        Everything is pushed on the 'duplicates' topic: progress as
+        ``{jobId, phase, files, candidates, hashed, ..., groups: [], done: false}``,
+        duplicate groups (``size``, ``hash``, ``paths``, ``wasted`` bytes)
+        as ``{jobId, groups, done: false}`` batches, and finally one
+        ``{jobId, done: true, count, duplicates, wasted, ...}`` summary.
+        Hashes are cached, so running it again only reads changed files.
+        """
+        full_path = self._resolve_listing_path(root)
+        job_id = uuid.uuid4().hex
+
+        def push_progress(progress):
+            progress.update({'jobId': job_id, 'groups': [], 'done': False})
+            self.data_push.push('duplicates', progress)
+
+        job = DuplicateFinderJob(full_path, self.base_path, self._hash_cache, push_progress,
+                                 lambda groups: self.data_push.push('duplicates', {'jobId': job_id, 'groups': groups, 'done': False}))
+        self._duplicate_jobs[job_id] = job
+        self._dispatch(self._find_duplicates, job_id, root, job)
+        return job_id
+
+    def _find_duplicates(self, job_id, root, job):
+        try:
+            summary = job.run()
+        except Exception as e:
+            error_msg = f"Error finding duplicates in {root}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            summary = {'error': str(e)}
+        finally:
+            self._duplicate_jobs.pop(job_id, None)
+        summary.update({'jobId': job_id, 'path': root, 'groups': [], 'done': True})
+        self.data_push.push('duplicates', summary)
+
+    @pyqtSlot(str)
+    def cancelDuplicates(self, jobId):
+        """Stop a duplicate search."""
+        job = self._duplicate_jobs.get(jobId)
+        if job is not None:
+            job.cancel()
+
+    @pyqtSlot(result=str)
+    def listVolumes(self):
+        """Return mounted volumes as JSON without waiting on any mount.
+
+        Each volume has ``mount_point``, ``kind`` (local, removable or
+        network), ``fs_type``, ``read_only``, ``capacity`` (total, free and
+        available bytes, or None until known) and ``path`` when it lies
+        under base_path. Stale capacities are refreshed in the background
+        and the result is pushed on the 'volumes' topic.
+        """
+        try:
+            volumes = self._volume_monitor.volumes()
+            refreshing = self._volume_monitor.needs_refresh() and self._volume_monitor.start_refresh()
+            if refreshing:
+                self._dispatch(self._refresh_volumes)
+            return json.dumps({'volumes': [self._volume_record(v) for v in volumes], 'refreshing': refreshing})
+        except Exception as e:
+            error_msg = f"Error listing volumes: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return json.dumps({'volumes': [], 'error': str(e)})
+
+    def _refresh_volumes(self):
+        try:
+            volumes = self._volume_monitor.refresh()
+        except Exception as e:
+            print(f"Error refreshing volumes: {str(e)}")
+            return
+        self.data_push.push('volumes', {'volumes': [self._volume_record(v) for v in volumes]})
+
+    def _volume_record(self, volume):
+        mount_point = volume['mount_point']
+        root = os.path.realpath(self.base_path)
+        inside = os.path.commonpath([root, mount_point]) == root
+        return {
+            'mount_point': mount_point,
+            'path': os.path.relpath(mount_point, root) if inside else None,
+            'kind': volume['kind'],
+            'fs_type': volume['fs_type'],
+            'source': volume['source'],
+            'read_only': volume['read_only'],
+            'capacity': volume['capacity'],
+            'unresponsive': volume['unresponsive']
+        }
+
+    @pyqtSlot(str, int, result=str)
+    def openListing(self, dirPath, pageSize):
+        """Open a paginated directory listing and return its handle ('' on error).
+
+        Inside an archive that is still being indexed this returns '' too;
+        requestDirectoryContents waits for the index on the worker pool.
+        """
+        print(f"[DEBUG] openListing called with dirPath: '{dirPath}', pageSize: {pageSize}")
+        try:
+            full_path = self._resolve_listing_path(dirPath)
+            page_size = pageSize if pageSize > 0 else DEFAULT_LISTING_PAGE_SIZE
+            cursor, archive_entries = self._list_or_archive(
+                full_path, lambda path: ListingCursor(path, self.base_path, page_size, track_snapshot=True), wait=False)
+            if cursor is None:
+                cursor = ArchiveListingCursor(archive_entries, full_path, page_size)
+        except ArchiveIndexPending as e:
+            print(str(e))
+            return ""
+        except Exception as e:
+            error_msg = f"Error opening listing for {dirPath}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return ""
+
+        handle = uuid.uuid4().hex
+        self._listing_cursors[handle] = cursor
+        # Close the oldest listings that pages navigated away from without closing
+        while len(self._listing_cursors) > MAX_OPEN_LISTINGS:
+            stale_handle = next(iter(self._listing_cursors))
+            self._listing_cursors.pop(stale_handle).close()
+        return handle
+
+    @pyqtSlot(str, result=str)
+    def nextListingPage(self, handle):
+        """Return the next page of an open listing as JSON."""
+        cursor = self._listing_cursors.get(handle)
+        if cursor is None:
+            return json.dumps({'entries': [], 'offset': 0, 'done': True, 'error': 'Unknown listing handle'})
+        try:
+            entries = cursor.next_page()
+        except Exception as e:
+            error_msg = f"Error reading listing for {cursor.full_path}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            self.closeListing(handle)
+            return json.dumps({'entries': [], 'offset': cursor.position, 'done': True, 'error': str(e)})
+
+        page = {'entries': entries, 'offset': cursor.position - len(entries), 'done': cursor.done}
+        if cursor.done:
+            self._listing_cursors.pop(handle, None)
+            # The snapshot holds exactly what the page was sent, so later deltas patch it precisely
+            if cursor.snapshot is not None:
+                page['version'] = self._listing_versions.register(cursor.full_path, cursor.snapshot)
+        return json.dumps(page)
+
+    @pyqtSlot(str)
+    def closeListing(self, handle):
+        """Close a paginated listing before it is exhausted."""
+        cursor = self._listing_cursors.pop(handle, None)
+        if cursor is not None:
+            cursor.close()
+
     @pyqtSlot(str)
-    def openFile(self, filePath):
-        """Open a file with the system's default application."""
+    @pyqtSlot(str, str)
+    def openFile(self, filePath, requestId=''):
+        """Open a file with the system's default application; the outcome is a notification tagged with requestId."""
+        self._dispatch(self._open_file, filePath, requestId)
+
+    def _open_file(self, filePath, requestId=''):
         print(f"[DEBUG] openFile called with filePath: '{filePath}'")
         try:
             if not filePath:
@@ -331,6 +1396,10 @@ class FileSystemHandler(QObject):
             safe_path = filePath.lstrip('/')
             full_path = os.path.join(self.base_path, safe_path)
             
+            location = None if os.path.exists(full_path) else split_archive_path(full_path)
+            if location is not None:
+                full_path = self._extract_archive_member(*location)
+            
             if not os.path.exists(full_path):
                 raise FileNotFoundError(f"File not found: {full_path}")
                 
@@ -352,35 +1421,40 @@ class FileSystemHandler(QObject):
                     except FileNotFoundError:
                         subprocess.Popen(['gio', 'open', full_path])  # GNOME
             
-            # Return success message to JavaScript (optional)
-            js_code = f"""
-                console.log('[PY->JS] File opened: {filePath}');
-                // Show a brief notification if desired
-                if (typeof showNotification === 'function') {{
-                    showNotification('File opened: {os.path.basename(filePath)}');
-                }}
-            """
-            
-            if hasattr(self, 'browser_page') and self.browser_page:
-                self.browser_page.runJavaScript(js_code)
+            print(f"[DEBUG] File opened: {filePath}")
+            self.data_push.push('notification', {'requestId': requestId, 'message': f"File opened: {os.path.basename(filePath)}",
+                                                 'type': 'info'})
                 
         except Exception as e:
             error_msg = f"Error opening file {filePath}: {str(e)}"
             print(error_msg)
             self.errorOccurred.emit(error_msg)
-            
-            # Show error in JavaScript
-            if hasattr(self, 'browser_page') and self.browser_page:
-                self.browser_page.runJavaScript(f"""
-                    console.error('[PY->JS] {error_msg}');
-                    if (typeof showNotification === 'function') {{
-                        showNotification('Error: {str(e)}', 'error');
-                    }}
-                """)
+            self.data_push.push('notification', {'requestId': requestId, 'message': f"Error: {str(e)}", 'type': 'error'})
+
+    def _extract_archive_member(self, archive_path, inner):
+        """Extract one archive member for an application to open and return its path.
+
+        Copies are kept in a directory per archive and archive mtime, so a
+        member opened again is reused until the archive changes.
+        """
+        index = self._archive_indexes.get(archive_path)
+        stat = os.stat(archive_path)
+        key = hashlib.blake2b(f"{archive_path}\0{stat.st_mtime_ns}".encode('utf-8'), digest_size=8).hexdigest()
+        destination = os.path.join(self.archive_extract_path, key, *inner.split('/'))
+        if not os.path.isfile(destination):
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            partial = destination + '.part'
+            index.extract(inner, partial)
+            os.replace(partial, destination)
+        return destination
 
     @pyqtSlot(str, str, str)
-    def saveDroppedFile(self, dirPath, fileName, fileContent):
-        """Save a file that was dropped into the browser."""
+    @pyqtSlot(str, str, str, str)
+    def saveDroppedFile(self, dirPath, fileName, fileContent, requestId=''):
+        """Save a file that was dropped into the browser; the outcome is pushed tagged with requestId."""
+        self._dispatch_mutation(self._save_dropped_file, dirPath, fileName, fileContent, requestId)
+
+    def _save_dropped_file(self, dirPath, fileName, fileContent, requestId=''):
         print(f"[DEBUG] saveDroppedFile called with dirPath: '{dirPath}', fileName: '{fileName}'")
         try:
             if not dirPath:
@@ -421,39 +1495,154 @@ class FileSystemHandler(QObject):
             # Write the file to disk
             with open(full_file_path, 'wb') as f:
                 f.write(content)
+            self._path_changed(full_file_path)
             
             print(f"[DEBUG] File saved successfully: {fileName}")
             
-            # Emit success message to JavaScript
-            js_code = f"""
-                console.log('[PY->JS] File saved successfully: {fileName}');
-                showNotification('File uploaded: {fileName}');
-                
-                // Refresh directory contents
-                if (window.fileSystemHandler && window.fileSystemHandler.requestDirectoryContents) {{
-                    window.fileSystemHandler.requestDirectoryContents('{dirPath}');
-                }}
-            """
-            
-            if hasattr(self, 'browser_page') and self.browser_page:
-                self.browser_page.runJavaScript(js_code)
+            # Tell the page, which shows a notification and refreshes the listing
+            self.data_push.push('fileSaved', {'requestId': requestId, 'path': dirPath, 'name': fileName})
             
             # Return success via standard signals as well
             self.fileCreated.emit(os.path.join(dirPath, fileName))
-            return True
             
         except Exception as e:
             error_msg = f"Error saving dropped file {fileName}: {str(e)}"
             print(error_msg)
             self.errorOccurred.emit(error_msg)
-            
-            # Show error in JavaScript
-            if hasattr(self, 'browser_page') and self.browser_page:
-                self.browser_page.runJavaScript(f"""
-                    console.error('[PY->JS] {error_msg}');
-                    showNotification('Error saving file: {str(e)}', 'error');
-                """)
-            return False
+            self.data_push.push('notification', {'requestId': requestId, 'message': f"Error saving file: {str(e)}",
+                                                 'type': 'error'})
+
+    def _expire_uploads(self):
+        """Abort uploads that pages abandoned without committing or aborting."""
+        now = time.monotonic()
+        for upload_id, session in list(self._uploads.items()):
+            if now - session.last_activity > UPLOAD_IDLE_TIMEOUT:
+                print(f"[DEBUG] Expiring idle upload {upload_id} for {session.file_name}")
+                self._uploads.pop(upload_id, None)
+                session.abort()
+
+    @pyqtSlot(str, str, 'qint64', result=str)
+    def beginUpload(self, dirPath, fileName, totalSize):
+        """Start a chunked upload into dirPath and return its status as JSON.
+
+        A negative totalSize means the size is not known in advance.
+        """
+        print(f"[DEBUG] beginUpload called with dirPath: '{dirPath}', fileName: '{fileName}', totalSize: {totalSize}")
+        self._expire_uploads()
+        try:
+            session = UploadSession(self._resolve_listing_path(dirPath), fileName, totalSize)
+        except Exception as e:
+            error_msg = f"Error starting upload of {fileName}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return json.dumps({'file_name': fileName, 'error': str(e)})
+        self._uploads[session.upload_id] = session
+        return json.dumps(session.status())
+
+    @pyqtSlot(str, 'qint64', str, result=str)
+    def appendUploadChunk(self, uploadId, offset, chunk):
+        """Write a base64-encoded chunk at offset and return the upload status as JSON.
+
+        A failed chunk leaves the upload open; the client resends from the
+        returned ``received`` offset.
+        """
+        session = self._uploads.get(uploadId)
+        if session is None:
+            return json.dumps({'upload_id': uploadId, 'error': 'Unknown upload id'})
+        try:
+            data = base64.b64decode(chunk, validate=True)
+            if len(data) > MAX_UPLOAD_CHUNK_SIZE:
+                raise ValueError(f"Chunk of {len(data)} bytes exceeds the limit of {MAX_UPLOAD_CHUNK_SIZE}")
+            session.append(offset, data)
+        except Exception as e:
+            error_msg = f"Error writing chunk of {session.file_name} at {offset}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            status = session.status()
+            status['error'] = str(e)
+            return json.dumps(status)
+        self.uploadProgress.emit(uploadId, session.received, session.total_size)
+        return json.dumps(session.status())
+
+    @pyqtSlot(str, result=str)
+    def getUploadStatus(self, uploadId):
+        """Return the status of an open upload as JSON, used to resume it."""
+        session = self._uploads.get(uploadId)
+        if session is None:
+            return json.dumps({'upload_id': uploadId, 'error': 'Unknown upload id'})
+        return json.dumps(session.status())
+
+    @pyqtSlot(str, result=str)
+    def commitUpload(self, uploadId):
+        """Move a completed upload into place and return its final status as JSON."""
+        session = self._uploads.get(uploadId)
+        if session is None:
+            return json.dumps({'upload_id': uploadId, 'error': 'Unknown upload id'})
+        try:
+            full_file_path = session.commit()
+        except Exception as e:
+            error_msg = f"Error committing upload of {session.file_name}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            status = session.status()
+            status['error'] = str(e)
+            return json.dumps(status)
+        self._uploads.pop(uploadId, None)
+        self._path_changed(full_file_path)
+        print(f"[DEBUG] Upload committed: {full_file_path}")
+        self.fileCreated.emit(os.path.relpath(full_file_path, self.base_path))
+        status = session.status()
+        status['path'] = os.path.relpath(full_file_path, self.base_path)
+        return json.dumps(status)
+
+    @pyqtSlot(str)
+    def abortUpload(self, uploadId):
+        """Discard an upload and its partial data."""
+        session = self._uploads.pop(uploadId, None)
+        if session is not None:
+            session.abort()
+
+    def _get_file_index(self):
+        """Open the filename index for base_path, reopening it if base_path changed."""
+        with self._file_index_lock:
+            if self._file_index is None or self._file_index.base_path != self.base_path:
+                if self._file_index is not None:
+                    self._file_index.close()
+                self._file_index = FileIndex(self.index_path, self.base_path)
+            return self._file_index
+
+    @pyqtSlot()
+    def startIndexing(self):
+        """Crawl base_path into the filename index; emits indexingFinished with crawl stats."""
+        self._dispatch(self._crawl_index)
+
+    def _crawl_index(self):
+        try:
+            index = self._get_file_index()
+            print(f"[DEBUG] Indexing {index.base_path}")
+            stats = index.crawl()
+            if stats is None:
+                print(f"[DEBUG] Indexing of {index.base_path} already running")
+                return
+            print(f"[DEBUG] Indexed {stats['files']} entries in {stats['elapsed']:.2f}s")
+            self.indexingFinished.emit(json.dumps(stats))
+        except Exception as e:
+            error_msg = f"Error indexing {self.base_path}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+
+    @pyqtSlot(str, int, result=str)
+    def searchFiles(self, query, limit):
+        """Return indexed entries whose names contain every word of query as JSON."""
+        try:
+            index = self._get_file_index()
+            results = index.search(query, limit if limit > 0 else DEFAULT_SEARCH_LIMIT)
+            return json.dumps({'query': query, 'results': results, 'indexing': index.crawling})
+        except Exception as e:
+            error_msg = f"Error searching for {query}: {str(e)}"
+            print(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return json.dumps({'query': query, 'results': [], 'error': str(e)})
 
     def __getattr__(self, name):
         """Intercept signal access for better debugging."""
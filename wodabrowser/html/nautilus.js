@@ -28,36 +28,328 @@ document.querySelectorAll('.crumb').forEach(crumb => {
 });
 
 // --- Real file/folder listing and navigation ---
-function renderFileArea(entries) {
-    const fileArea = document.getElementById('fileArea');
-    fileArea.innerHTML = '';
-    entries.forEach(entry => {
-        const div = document.createElement('div');
-        div.className = 'file-item ' + (entry.is_dir ? 'folder' : 'file');
-        div.innerHTML = `<span class="icon ${entry.is_dir ? 'folder' : 'file'}"></span><span class="file-name">${entry.name}</span>`;
-        div.dataset.path = entry.path;
-        div.addEventListener('click', e => {
-            e.stopPropagation();
-            if (entry.is_dir) {
-                listDirectory(entry.path);
+const LISTING_PAGE_SIZE = 500;
+// Fetch the next page once the user scrolls within this distance of the end
+const LISTING_PREFETCH_PX = 600;
+
+// --- Thumbnails, loaded only for tiles that scroll into view ---
+const THUMBNAIL_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp', 'tif', 'tiff', 'ico'];
+
+function isThumbnailable(name) {
+    const dot = name.lastIndexOf('.');
+    return dot > 0 && THUMBNAIL_EXTENSIONS.includes(name.substring(dot + 1).toLowerCase());
+}
+
+// Archives open as folders; their members are listed without unpacking them
+const ARCHIVE_SUFFIXES = ['.zip', '.jar', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz'];
+
+function isArchive(name) {
+    const lower = name.toLowerCase();
+    return ARCHIVE_SUFFIXES.some(suffix => lower.endsWith(suffix));
+}
+
+// The image streams from the woda-fs:// scheme, never through base64 strings
+const thumbnailObserver = new IntersectionObserver(items => {
+    items.forEach(item => {
+        if (!item.isIntersecting || !window.getFileUrl) return;
+        const div = item.target;
+        thumbnailObserver.unobserve(div);
+        const icon = div.querySelector('.icon');
+        const img = document.createElement('img');
+        img.className = 'thumbnail';
+        img.alt = '';
+        img.onload = () => {
+            div.dataset.thumbnail = 'loaded';
+            icon.replaceWith(img);
+        };
+        // Keep the generic icon when no thumbnail can be made
+        img.onerror = () => { div.dataset.thumbnail = 'failed'; };
+        img.src = window.getFileUrl(div.dataset.path) + '?thumbnail=normal';
+    });
+}, { root: document.getElementById('fileArea'), rootMargin: '200px' });
+
+function createFileItem(entry) {
+    const div = document.createElement('div');
+    div.className = 'file-item ' + (entry.is_dir ? 'folder' : 'file');
+    div.innerHTML = `<span class="icon ${entry.is_dir ? 'folder' : 'file'}"></span><span class="file-name">${entry.name}</span>`;
+    div.dataset.path = entry.path;
+    // Archive members are not files on disk, so the file scheme cannot serve them
+    if (!entry.is_dir && !entry.archive && isThumbnailable(entry.name)) {
+        div.dataset.thumbnail = 'pending';
+        thumbnailObserver.observe(div);
+    }
+    div.addEventListener('click', e => {
+        e.stopPropagation();
+        if (entry.is_dir || (!entry.archive && isArchive(entry.name))) {
+            listDirectory(entry.path);
+        } else {
+            // Select the file
+            document.querySelectorAll('.file-item.selected').forEach(el => el.classList.remove('selected'));
+            div.classList.add('selected');
+            
+            // Open the file with system's default application
+            if (window.fileSystemHandler && window.fileSystemHandler.openFile) {
+                console.log('[JS] Opening file:', entry.path);
+                window.fileSystemHandler.openFile(entry.path, pageRequestId());
             } else {
-                // Select the file
-                document.querySelectorAll('.file-item.selected').forEach(el => el.classList.remove('selected'));
-                div.classList.add('selected');
-                
-                // Open the file with system's default application
-                if (window.fileSystemHandler && window.fileSystemHandler.openFile) {
-                    console.log('[JS] Opening file:', entry.path);
-                    window.fileSystemHandler.openFile(entry.path);
-                } else {
-                    console.error('[JS] openFile method not available');
-                }
+                console.error('[JS] openFile method not available');
             }
+        }
+    });
+    return div;
+}
+
+function renderFileArea(entries, append) {
+    const fileArea = document.getElementById('fileArea');
+    if (!append) {
+        cancelFolderSizes();
+        fileArea.innerHTML = '';
+    }
+    const fragment = document.createDocumentFragment();
+    entries.forEach(entry => {
+        const div = createFileItem(entry);
+        if (entry.is_dir && !entry.archive) {
+            requestFolderSize(div, entry.path);
+        }
+        fragment.appendChild(div);
+    });
+    fileArea.appendChild(fragment);
+}
+
+// --- Folder sizes, computed in the background ---
+// Running size jobs by job id, each with the label it updates
+window.folderSizeJobs = window.folderSizeJobs || {};
+
+function formatSize(bytes) {
+    const units = ['B', 'KB', 'MB', 'GB', 'TB'];
+    let size = bytes;
+    let unit = 0;
+    while (size >= 1024 && unit < units.length - 1) {
+        size /= 1024;
+        unit++;
+    }
+    return (unit === 0 ? size : size.toFixed(1)) + ' ' + units[unit];
+}
+
+function connectFolderSizeUpdates() {
+    const handler = window.fileSystemHandler;
+    if (window.folderSizeUpdatesConnected || !handler || !handler.directorySizeUpdated) return;
+    window.folderSizeUpdatesConnected = true;
+    handler.directorySizeUpdated.connect((jobId, totalsJson) => {
+        const label = window.folderSizeJobs[jobId];
+        if (!label) return;
+        const totals = JSON.parse(totalsJson);
+        if (totals.done) {
+            delete window.folderSizeJobs[jobId];
+        }
+        if (totals.cancelled || totals.error) return;
+        // Partial totals are shown as a lower bound until the walk finishes
+        label.textContent = formatSize(totals.size) + (totals.done ? '' : '+');
+    });
+}
+
+// Sizes are only computed for folders scrolled into view, so a directory
+// with thousands of subfolders does not queue thousands of walks
+function folderSizeObserver() {
+    if (!window.folderSizeVisibility) {
+        window.folderSizeVisibility = new IntersectionObserver(entries => {
+            entries.forEach(entry => {
+                if (!entry.isIntersecting) return;
+                window.folderSizeVisibility.unobserve(entry.target);
+                startFolderSize(entry.target);
+            });
         });
-        fileArea.appendChild(div);
+    }
+    return window.folderSizeVisibility;
+}
+
+function requestFolderSize(div, path) {
+    const handler = window.fileSystemHandler;
+    if (!handler || !handler.computeDirectorySize) return;
+    div.dataset.sizePath = path;
+    folderSizeObserver().observe(div);
+}
+
+function startFolderSize(div) {
+    const handler = window.fileSystemHandler;
+    connectFolderSizeUpdates();
+    const label = document.createElement('span');
+    label.className = 'file-size';
+    div.appendChild(label);
+    handler.computeDirectorySize(div.dataset.sizePath, function(jobId) {
+        if (label.isConnected) {
+            window.folderSizeJobs[jobId] = label;
+        } else {
+            // The folder was rendered away before the job started
+            handler.cancelDirectorySize(jobId);
+        }
+    });
+}
+
+function cancelFolderSizes() {
+    const handler = window.fileSystemHandler;
+    Object.keys(window.folderSizeJobs).forEach(jobId => {
+        if (handler && handler.cancelDirectorySize) {
+            handler.cancelDirectorySize(jobId);
+        }
+    });
+    window.folderSizeJobs = {};
+    if (window.folderSizeVisibility) {
+        window.folderSizeVisibility.disconnect();
+    }
+}
+
+// Stream a directory page by page: the first page renders immediately and
+// further pages are fetched as the user scrolls towards the end.
+function streamDirectory(path) {
+    const handler = window.fileSystemHandler;
+    if (window.activeListing && window.activeListing.handle && !window.activeListing.done) {
+        handler.closeListing(window.activeListing.handle);
+    }
+    const listing = { path: path, handle: null, loading: false, done: false };
+    window.activeListing = listing;
+    window.directoryVersion = null;
+    unwatchCurrentDirectory();
+
+    handler.openListing(path, LISTING_PAGE_SIZE, function(handle) {
+        if (window.activeListing !== listing) {
+            // The user navigated elsewhere before the listing opened
+            if (handle) handler.closeListing(handle);
+            return;
+        }
+        if (!handle) {
+            // errorOccurred carries the reason
+            listing.done = true;
+            return;
+        }
+        listing.handle = handle;
+        updateBreadcrumb(path);
+        renderFileArea([]);
+        loadNextListingPage(listing);
+    });
+}
+
+function loadNextListingPage(listing) {
+    if (listing.loading || listing.done || window.activeListing !== listing) return;
+    listing.loading = true;
+    window.fileSystemHandler.nextListingPage(listing.handle, function(pageJson) {
+        listing.loading = false;
+        if (window.activeListing !== listing) return;
+        const page = JSON.parse(pageJson);
+        listing.done = page.done;
+        renderFileArea(page.entries, true);
+        if (page.version) {
+            window.directoryVersion = { path: listing.path, version: page.version };
+            watchCurrentDirectory(listing.path, page.version);
+        }
+        console.log('[JS] Listing page received:', page.offset + page.entries.length, 'entries so far');
+        // Keep going until the viewport is filled; the rest loads on scroll
+        const fileArea = document.getElementById('fileArea');
+        if (fileArea.scrollHeight - fileArea.clientHeight <= LISTING_PREFETCH_PX) {
+            loadNextListingPage(listing);
+        }
+    });
+}
+
+// Bring the shown directory up to date by applying only what changed
+// since the version of the listing the page already has.
+function refreshDirectory() {
+    const handler = window.fileSystemHandler;
+    const path = window.currentPath || '';
+    if (!handler || !handler.getDirectoryDelta) {
+        listDirectory(path);
+        return;
+    }
+    const known = window.directoryVersion;
+    const since = known && known.path === path ? known.version : '';
+    handler.getDirectoryDelta(path, since, function(deltaJson) {
+        if ((window.currentPath || '') !== path) return;
+        const delta = JSON.parse(deltaJson);
+        if (delta.error) return;
+        window.directoryVersion = { path: path, version: delta.version };
+        if (delta.full) {
+            if (window.activeListing && window.activeListing.handle && !window.activeListing.done) {
+                handler.closeListing(window.activeListing.handle);
+            }
+            window.activeListing = null;
+            renderFileArea(delta.entries);
+        } else {
+            applyDirectoryDelta(delta);
+        }
+    });
+}
+
+// Live updates: the shown directory is watched and its changes arrive as
+// deltas on the 'directoryChanged' data push topic, so nothing polls.
+function watchCurrentDirectory(path, version) {
+    const handler = window.fileSystemHandler;
+    if (!handler || !handler.watchDirectory) return;
+    unwatchCurrentDirectory();
+    const watch = { path: path, id: null };
+    window.directoryWatch = watch;
+    handler.watchDirectory(path, version || '', function(watchId) {
+        if (window.directoryWatch !== watch) {
+            // Navigated elsewhere before the watch started
+            if (watchId) handler.unwatchDirectory(watchId);
+            return;
+        }
+        watch.id = watchId;
     });
 }
 
+function unwatchCurrentDirectory() {
+    const watch = window.directoryWatch;
+    window.directoryWatch = null;
+    if (watch && watch.id && window.fileSystemHandler) {
+        window.fileSystemHandler.unwatchDirectory(watch.id);
+    }
+}
+
+function directoryChanged(change) {
+    const watch = window.directoryWatch;
+    if (!watch || watch.id !== change.watchId || change.error) return;
+    window.directoryVersion = { path: change.path, version: change.version };
+    if (change.full) {
+        if (window.activeListing && window.activeListing.handle && !window.activeListing.done) {
+            window.fileSystemHandler.closeListing(window.activeListing.handle);
+        }
+        window.activeListing = null;
+        renderFileArea(change.entries);
+    } else {
+        applyDirectoryDelta(change);
+    }
+}
+
+function applyDirectoryDelta(delta) {
+    const fileArea = document.getElementById('fileArea');
+    const items = {};
+    fileArea.querySelectorAll('.file-item').forEach(div => { items[div.dataset.path] = div; });
+    delta.removed.forEach(path => {
+        if (items[path]) items[path].remove();
+    });
+    // Replace any tile with the same path, so an entry reported twice is harmless
+    delta.changed.concat(delta.added).forEach(entry => {
+        const div = createFileItem(entry);
+        if (entry.is_dir) {
+            requestFolderSize(div, entry.path);
+        }
+        if (items[entry.path]) {
+            items[entry.path].replaceWith(div);
+        } else {
+            fileArea.appendChild(div);
+        }
+    });
+    console.log('[JS] Applied directory delta:', delta.added.length, 'added,', delta.removed.length, 'removed,', delta.changed.length, 'changed');
+}
+
+fileArea.addEventListener('scroll', () => {
+    const listing = window.activeListing;
+    if (!listing || listing.done || !listing.handle) return;
+    if (fileArea.scrollTop + fileArea.clientHeight >= fileArea.scrollHeight - LISTING_PREFETCH_PX) {
+        loadNextListingPage(listing);
+    }
+});
+
 function updateBreadcrumb(path) {
     const breadcrumb = document.querySelector('.breadcrumb');
     if (!breadcrumb) return;
@@ -117,11 +409,20 @@ function listDirectory(path) {
         console.log('[JS] Listing directory with path:', path);
         window.currentPath = path || '';
         
+        // Prefer the paginated listing so large directories render incrementally.
+        // Archives are indexed on a worker, which the pushed listing below waits for.
+        const inArchive = (path || '').split('/').some(isArchive);
+        if (window.fileSystemHandler.openListing && !inArchive) {
+            console.log('[JS] Using paginated listing with path:', path);
+            streamDirectory(path);
+            return;
+        }
+        
         // Use the new direct method that bypasses QWebChannel return values
         if (window.fileSystemHandler.requestDirectoryContents) {
             console.log('[JS] Using requestDirectoryContents with path:', path);
             // This method will set global variables and directly call rendering functions
-            window.fileSystemHandler.requestDirectoryContents(path);
+            window.fileSystemHandler.requestDirectoryContents(path, pageRequestId());
             return;
         }
         
@@ -254,24 +555,107 @@ function setupDirectListener() {
             return false;
         };
         
-        // First attempt
+        // Changes arrive through watchDirectory, so a single attempt is enough
         const path = '';
         if (!checkDirectContents(path)) {
-            // If failed, set up polling as a fallback
-            console.log('[JS] Setting up polling fallback');
-            window.directoryPoll = setInterval(function() {
-                if (window.fileSystemHandler && window.fileSystemHandler.getDirectoryContents) {
-                    checkDirectContents(window.currentPath || '');
-                }
-            }, 1000);
+            console.error('[JS] Could not load directory contents directly');
         }
     }
 }
 
+// Every page shares the data push channel; this page's requests carry its
+// id and pushes tagged with another page's id are ignored. browser_functions.js
+// may be injected after this script, so the id is made on first use.
+function pageRequestId() {
+    if (!window.pageRequestId) {
+        window.pageRequestId = Date.now().toString(36) + Math.random().toString(36).slice(2);
+    }
+    return window.pageRequestId;
+}
+
+// Data pushed from Python: listings, saved files and notifications
+function setupDataPushListeners() {
+    if (window.dataPushListenersSetUp || !window.onDataPush) return;
+    window.dataPushListenersSetUp = true;
+    window.onDataPush('directoryChanged', directoryChanged);
+    // Listings, saves and notifications for other pages arrive here too
+    window.onDataPush('directoryContents', function(listing) {
+        if (listing.requestId !== pageRequestId()) return;
+        window.directoryContents = listing.entries;
+        window.currentDirectoryPath = listing.path;
+        // Listings inside archives have no version and cannot be watched
+        if (listing.version) {
+            window.directoryVersion = { path: listing.path, version: listing.version };
+            watchCurrentDirectory(listing.path, listing.version);
+        }
+        updateBreadcrumb(listing.path);
+        renderFileArea(listing.entries);
+        window.dispatchEvent(new CustomEvent('directoryContentsUpdated', {
+            detail: { path: listing.path, entries: listing.entries, rendered: true }
+        }));
+    });
+    window.onDataPush('fileSaved', function(saved) {
+        if (saved.requestId !== pageRequestId()) return;
+        showNotification('File uploaded: ' + saved.name);
+        if ((window.currentPath || '') === saved.path) {
+            refreshDirectory();
+        }
+    });
+    window.onDataPush('notification', function(notification) {
+        if (notification.requestId !== pageRequestId()) return;
+        showNotification(notification.message, notification.type);
+    });
+    window.onDataPush('volumes', function(result) {
+        renderVolumes(result.volumes);
+    });
+}
+
+// --- Mounted volumes in the sidebar ---
+// listVolumes answers from a cache at once; fresh capacities follow on the 'volumes' topic
+function loadVolumes() {
+    const handler = window.fileSystemHandler;
+    if (!handler || !handler.listVolumes) return;
+    handler.listVolumes(function(resultJson) {
+        const result = JSON.parse(resultJson);
+        if (!result.error) renderVolumes(result.volumes);
+    });
+}
+
+function renderVolumes(volumes) {
+    const sections = document.querySelectorAll('.sidebar-section');
+    const lists = { local: sections[1] && sections[1].querySelector('ul'), network: sections[2] && sections[2].querySelector('ul') };
+    Object.values(lists).forEach(list => {
+        if (list) list.querySelectorAll('li.volume').forEach(li => li.remove());
+    });
+    volumes.forEach(volume => {
+        const list = volume.kind === 'network' ? lists.network : lists.local;
+        if (!list) return;
+        const li = document.createElement('li');
+        li.className = 'volume';
+        const icon = document.createElement('span');
+        icon.className = 'icon ' + (volume.kind === 'network' ? 'network' : 'drive');
+        li.appendChild(icon);
+        li.appendChild(document.createTextNode(' ' + (volume.mount_point === '/' ? 'Root' : volume.mount_point.split('/').pop())));
+        const capacity = volume.capacity;
+        li.title = volume.mount_point + ' (' + volume.fs_type + ')' + (volume.unresponsive ? ' - not responding' :
+            capacity && !capacity.error ? ' - ' + formatSize(capacity.available) + ' free of ' + formatSize(capacity.total) : '');
+        li.addEventListener('click', () => {
+            if (volume.path === null) {
+                showNotification(volume.mount_point + ' is outside the home folder', 'error');
+                return;
+            }
+            listDirectory(volume.path === '.' ? '' : volume.path);
+        });
+        list.appendChild(li);
+    });
+}
+
 // On QWebChannel ready, setup listeners and load home dir
 function waitForFSHandler() {
     if (window.fileSystemHandler) {
         console.log('[JS] FileSystemHandler available, loading directory');
+        setupDataPushListeners();
+        loadVolumes();
         // Only use requestDirectoryContents since it works well
         if (window.fileSystemHandler.requestDirectoryContents) {
             listDirectory('');
@@ -287,10 +671,56 @@ function waitForFSHandler() {
 }
 waitForFSHandler();
 
+// --- Search across the home tree through the filename index ---
+const SEARCH_RESULT_LIMIT = 200;
+const SEARCH_DEBOUNCE_MS = 150;
+
+document.addEventListener('DOMContentLoaded', function() {
+    const searchInput = document.querySelector('.search');
+    if (!searchInput) return;
+    let indexingStarted = false;
+    let debounceTimer = null;
+    let latestQuery = '';
+    
+    // Build or refresh the index the first time the user focuses search
+    searchInput.addEventListener('focus', () => {
+        if (!indexingStarted && window.fileSystemHandler && window.fileSystemHandler.startIndexing) {
+            indexingStarted = true;
+            window.fileSystemHandler.startIndexing();
+        }
+    });
+    
+    searchInput.addEventListener('input', () => {
+        clearTimeout(debounceTimer);
+        debounceTimer = setTimeout(() => {
+            const query = searchInput.value.trim();
+            latestQuery = query;
+            if (!query) {
+                listDirectory(window.currentPath || '');
+                return;
+            }
+            if (!window.fileSystemHandler || !window.fileSystemHandler.searchFiles) return;
+            window.fileSystemHandler.searchFiles(query, SEARCH_RESULT_LIMIT, function(resultJson) {
+                // Drop answers to queries the user has already typed past
+                if (query !== latestQuery) return;
+                const result = JSON.parse(resultJson);
+                if (window.activeListing && window.activeListing.handle && !window.activeListing.done) {
+                    window.fileSystemHandler.closeListing(window.activeListing.handle);
+                }
+                window.activeListing = null;
+                unwatchCurrentDirectory();
+                renderFileArea(result.results);
+                console.log('[JS] Search results for', query, ':', result.results.length, result.indexing ? '(indexing)' : '');
+            });
+        }, SEARCH_DEBOUNCE_MS);
+    });
+});
+
 // Add listener for our custom event
 window.addEventListener('directoryContentsUpdated', function(event) {
     console.log('[JS] Directory contents updated event received:', 
                event.detail.path, event.detail.entries.length, 'items');
+    if (event.detail.rendered) return;
     updateBreadcrumb(event.detail.path);
     renderFileArea(event.detail.entries);
 });
@@ -580,9 +1010,13 @@ document.addEventListener('DOMContentLoaded', function() {
     // Handle drop event
     fileArea.addEventListener('drop', handleDrop, false);
     
+    // Dropped files are sent in chunks so no file is ever held whole in memory
+    const UPLOAD_CHUNK_SIZE = 1024 * 1024;
+    const UPLOAD_CHUNK_RETRIES = 3;
+    
     function handleDrop(e) {
         const dt = e.dataTransfer;
-        const files = dt.files;
+        const files = Array.from(dt.files);
         
         if (files.length > 0) {
             // Show progress indicator
@@ -595,56 +1029,115 @@ document.addEventListener('DOMContentLoaded', function() {
             
             // Get current path
             const currentPath = window.currentPath || '';
+            const handler = window.fileSystemHandler;
             
-            // Process each file
-            Array.from(files).forEach((file, index) => {
-                // Set progress based on current file
+            if (!handler || !handler.beginUpload) {
+                console.error('[JS] beginUpload method not available');
+                showNotification('Upload feature not available', 'error');
+                return;
+            }
+            
+            // Progress covers the bytes of all dropped files together
+            const totalBytes = files.reduce((sum, file) => sum + file.size, 0);
+            let doneBytes = 0;
+            const setProgress = function(fileBytes) {
                 if (progressBarInner) {
-                    const percentComplete = ((index) / files.length) * 100;
+                    const percentComplete = totalBytes ? ((doneBytes + fileBytes) / totalBytes) * 100 : 100;
                     progressBarInner.style.width = percentComplete + '%';
                 }
-                
-                const reader = new FileReader();
-                reader.onload = function(event) {
-                    // Get file content as data URL
-                    const fileData = event.target.result;
-                    
-                    // Send to Python backend
-                    if (window.fileSystemHandler && window.fileSystemHandler.saveDroppedFile) {
-                        console.log(`[JS] Uploading file ${index+1}/${files.length}: ${file.name}`);
-                        window.fileSystemHandler.saveDroppedFile(currentPath, file.name, fileData);
-                        
-                        // Update progress
+            };
+            
+            // Upload one file at a time
+            files.reduce((previous, file, index) => previous.then(() => {
+                console.log(`[JS] Uploading file ${index+1}/${files.length}: ${file.name}`);
+                return uploadFile(handler, currentPath, file, setProgress).then(() => {
+                    doneBytes += file.size;
+                    showNotification(`File uploaded: ${file.name}`);
+                }, error => {
+                    console.error(`[JS] Error uploading file: ${file.name}`, error);
+                    showNotification(`Error uploading file ${file.name}: ${error.message}`, 'error');
+                });
+            }), Promise.resolve()).then(() => {
+                setProgress(0);
+                refreshDirectory();
+                // Hide progress when all files are processed
+                setTimeout(() => {
+                    if (progressIndicator) {
+                        progressIndicator.style.display = 'none';
                         if (progressBarInner) {
-                            const percentComplete = ((index + 1) / files.length) * 100;
-                            progressBarInner.style.width = percentComplete + '%';
-                        }
-                        
-                        // Hide progress when all files are processed
-                        if (index === files.length - 1) {
-                            setTimeout(() => {
-                                if (progressIndicator) {
-                                    progressIndicator.style.display = 'none';
-                                    if (progressBarInner) {
-                                        progressBarInner.style.width = '0%';
-                                    }
-                                }
-                            }, 1000);
+                            progressBarInner.style.width = '0%';
                         }
-                    } else {
-                        console.error('[JS] saveDroppedFile method not available');
-                        showNotification('Upload feature not available', 'error');
                     }
-                };
+                }, 1000);
+            });
+        }
+    }
+    
+    // Read a slice of a file as base64 without its data URL header
+    function readChunk(file, offset) {
+        return new Promise((resolve, reject) => {
+            const reader = new FileReader();
+            reader.onload = function(event) {
+                const dataUrl = event.target.result;
+                resolve(dataUrl.substring(dataUrl.indexOf(',') + 1));
+            };
+            reader.onerror = function() {
+                reject(new Error(`Error reading file: ${file.name}`));
+            };
+            reader.readAsDataURL(file.slice(offset, offset + UPLOAD_CHUNK_SIZE));
+        });
+    }
+    
+    function uploadFile(handler, dirPath, file, onProgress) {
+        return new Promise((resolve, reject) => {
+            handler.beginUpload(dirPath, file.name, file.size, function(statusJson) {
+                const status = JSON.parse(statusJson);
+                if (status.error) {
+                    reject(new Error(status.error));
+                    return;
+                }
+                const uploadId = status.upload_id;
+                let retries = 0;
                 
-                reader.onerror = function() {
-                    console.error(`[JS] Error reading file: ${file.name}`);
-                    showNotification(`Error reading file: ${file.name}`, 'error');
+                const fail = function(error) {
+                    handler.abortUpload(uploadId);
+                    reject(error);
                 };
                 
-                // Read file as data URL
-                reader.readAsDataURL(file);
+                // Send the chunk starting at offset; a failed chunk is resent
+                // from wherever the backend says the upload stands
+                const sendFrom = function(offset) {
+                    if (offset >= file.size) {
+                        handler.commitUpload(uploadId, function(resultJson) {
+                            const result = JSON.parse(resultJson);
+                            if (result.error) {
+                                fail(new Error(result.error));
+                            } else {
+                                resolve(result);
+                            }
+                        });
+                        return;
+                    }
+                    readChunk(file, offset).then(chunk => {
+                        handler.appendUploadChunk(uploadId, offset, chunk, function(chunkJson) {
+                            const chunkStatus = JSON.parse(chunkJson);
+                            if (chunkStatus.error) {
+                                if (chunkStatus.received === undefined || ++retries > UPLOAD_CHUNK_RETRIES) {
+                                    fail(new Error(chunkStatus.error));
+                                    return;
+                                }
+                                console.warn(`[JS] Retrying ${file.name} from ${chunkStatus.received}:`, chunkStatus.error);
+                                sendFrom(chunkStatus.received);
+                                return;
+                            }
+                            retries = 0;
+                            onProgress(chunkStatus.received);
+                            sendFrom(chunkStatus.received);
+                        });
+                    }, fail);
+                };
+                sendFrom(0);
             });
-        }
+        });
     }
 });
@@ -4,6 +4,35 @@
         window.qt = { webChannelTransport: null };
     }
 
+    // Listeners for data pushed from Python, by topic
+    window.dataPushListeners = window.dataPushListeners || {};
+
+    // Subscribe to a data push topic; returns a function that unsubscribes
+    window.onDataPush = function(topic, listener) {
+        (window.dataPushListeners[topic] = window.dataPushListeners[topic] || []).push(listener);
+        return function() {
+            const listeners = window.dataPushListeners[topic] || [];
+            const index = listeners.indexOf(listener);
+            if (index !== -1) listeners.splice(index, 1);
+        };
+    };
+
+    // Every page shares the channel, so replies pushed for a request carry
+    // its id: one per request, or this page's id for its page-wide pushes
+    window.newRequestId = function() {
+        return Date.now().toString(36) + Math.random().toString(36).slice(2);
+    };
+    window.pageRequestId = window.pageRequestId || window.newRequestId();
+
+    // Pages written before request ids set window.readFileCallback and call
+    // fileSystemHandler.readFile(path); its reply is pushed without an id
+    if (!window.legacyReadFileListener) {
+        window.legacyReadFileListener = window.onDataPush('fileRead', function(result) {
+            if (result.requestId || result.error || !window.readFileCallback) return;
+            window.readFileCallback(result.content);
+        });
+    }
+
     function initializeChannel() {
         new QWebChannel(qt.webChannelTransport, function(channel) {
             console.log('QWebChannel initialization started');
@@ -14,6 +43,20 @@
             window.fileSystemHandler = channel.objects.fileSystemHandler;
             window.codeExecutor = channel.objects.codeExecutor;
             
+            // Structured data pushed by Python arrives here and is handed to topic listeners
+            if (channel.objects.dataPush && !window.dataPushConnected) {
+                window.dataPushConnected = true;
+                channel.objects.dataPush.dataPushed.connect(function(topic, payload) {
+                    (window.dataPushListeners[topic] || []).forEach(listener => {
+                        try {
+                            listener(payload);
+                        } catch (e) {
+                            console.error('Error in data push listener for', topic, e);
+                        }
+                    });
+                });
+            }
+            
             // Add direct signal handling for directoryListed
             if (window.fileSystemHandler) {
                 // Create manual directoryListed signal handling 
@@ -375,16 +418,481 @@
                 });
             };
 
+            // Run many file operations in one round trip, e.g.
+            // executeBatch([{op: 'deleteFile', path: 'a.txt'}, ...], {transactional: true})
+            window.executeBatch = function(ops, options) {
+                console.log('executeBatch called with', ops.length, 'operations');
+                return new Promise((resolve, reject) => {
+                    const handler = window.fileSystemHandler;
+                    if (!handler || !handler.executeBatch || !handler.batchCompleted) {
+                        reject(new Error("executeBatch is not available"));
+                        return;
+                    }
+                    // One listener serves every batch; results are matched by batch id
+                    if (!window.pendingBatches) {
+                        window.pendingBatches = {};
+                        window.earlyBatchResults = {};
+                        handler.batchCompleted.connect(function(batchId, resultJson) {
+                            const pending = window.pendingBatches[batchId];
+                            if (pending) {
+                                delete window.pendingBatches[batchId];
+                                pending(resultJson);
+                            } else {
+                                window.earlyBatchResults[batchId] = resultJson;
+                            }
+                        });
+                    }
+                    const settle = function(resultJson) {
+                        const result = JSON.parse(resultJson);
+                        if (result.error) {
+                            reject(new Error(result.error));
+                        } else {
+                            resolve(result);
+                        }
+                    };
+                    const request = {ops: ops, transactional: !!(options && options.transactional)};
+                    handler.executeBatch(JSON.stringify(request), function(batchId) {
+                        if (batchId in window.earlyBatchResults) {
+                            const resultJson = window.earlyBatchResults[batchId];
+                            delete window.earlyBatchResults[batchId];
+                            settle(resultJson);
+                        } else {
+                            window.pendingBatches[batchId] = settle;
+                        }
+                    });
+                });
+            };
+
+            // Copy, move and recursive delete run as background jobs; onProgress
+            // receives {bytes_done, bytes_total, files_done, files_total, eta}
+            window.pendingFileJobs = {};
+            window.earlyFileJobEvents = {};
+            function runFileJob(start, onProgress) {
+                return new Promise((resolve, reject) => {
+                    const handler = window.fileSystemHandler;
+                    if (!handler || !handler.fileJobProgress) {
+                        reject(new Error("File jobs are not available"));
+                        return;
+                    }
+                    if (!window.fileJobListenerConnected) {
+                        window.fileJobListenerConnected = true;
+                        handler.fileJobProgress.connect(function(jobId, progressJson) {
+                            const listener = window.pendingFileJobs[jobId];
+                            if (listener) {
+                                listener(JSON.parse(progressJson));
+                            } else {
+                                (window.earlyFileJobEvents[jobId] = window.earlyFileJobEvents[jobId] || []).push(progressJson);
+                            }
+                        });
+                    }
+                    const listener = function(progress) {
+                        if (!progress.done) {
+                            if (onProgress) onProgress(progress);
+                            return;
+                        }
+                        delete window.pendingFileJobs[progress.jobId];
+                        if (progress.error) {
+                            reject(new Error(progress.error));
+                        } else if (progress.cancelled) {
+                            reject(new Error("Cancelled"));
+                        } else {
+                            resolve(progress);
+                        }
+                    };
+                    start(function(jobId) {
+                        if (!jobId) {
+                            // Refused before a job was created, e.g. deleting the base path
+                            reject(new Error("File operation refused"));
+                            return;
+                        }
+                        window.pendingFileJobs[jobId] = function(progress) {
+                            progress.jobId = jobId;
+                            listener(progress);
+                        };
+                        (window.earlyFileJobEvents[jobId] || []).forEach(event => window.pendingFileJobs[jobId](JSON.parse(event)));
+                        delete window.earlyFileJobEvents[jobId];
+                        if (onProgress) onProgress({jobId: jobId, started: true});
+                    });
+                });
+            }
+
+            window.copyPath = function(sourcePath, destinationPath, onProgress) {
+                console.log('copyPath called', sourcePath, destinationPath);
+                return runFileJob(callback => window.fileSystemHandler.copyPath(sourcePath, destinationPath, callback), onProgress);
+            };
+
+            window.movePath = function(sourcePath, destinationPath, onProgress) {
+                console.log('movePath called', sourcePath, destinationPath);
+                return runFileJob(callback => window.fileSystemHandler.movePath(sourcePath, destinationPath, callback), onProgress);
+            };
+
+            window.deletePath = function(path, onProgress) {
+                console.log('deletePath called', path);
+                return runFileJob(callback => window.fileSystemHandler.deletePath(path, callback), onProgress);
+            };
+
+            window.cancelFileJob = function(jobId) {
+                window.fileSystemHandler.cancelFileJob(jobId);
+            };
+
+            // Sorted listing with only the requested columns, e.g.
+            // getDirectoryListing('Documents', {columns: ['name', 'size'], sort: 'size', descending: true})
+            window.getDirectoryListing = function(dirPath, options) {
+                console.log('getDirectoryListing called', dirPath, options);
+                return new Promise((resolve, reject) => {
+                    window.fileSystemHandler.getDirectoryListing(dirPath, JSON.stringify(options || {}), function(listingJson) {
+                        const listing = JSON.parse(listingJson);
+                        if (listing.error) {
+                            reject(new Error(listing.error));
+                        } else {
+                            resolve(listing);
+                        }
+                    });
+                });
+            };
+
+            // Filter a directory in Python, e.g.
+            // queryDirectory('Downloads', {glob: '*.iso', min_size: 1e9, include_hidden: false, limit: 50})
+            window.queryDirectory = function(dirPath, query) {
+                console.log('queryDirectory called', dirPath, query);
+                return new Promise((resolve, reject) => {
+                    window.fileSystemHandler.queryDirectory(dirPath, JSON.stringify(query || {}), function(resultJson) {
+                        const result = JSON.parse(resultJson);
+                        if (result.error) {
+                            reject(new Error(result.error));
+                        } else {
+                            resolve(result);
+                        }
+                    });
+                });
+            };
+
+            // List a subtree in one request, e.g. listTree('project', 3, 5000, nodes => addToTree(nodes)).
+            // onNodes receives breadth-first batches of nodes ({name, path, is_dir, depth, parent});
+            // the promise resolves with the summary ({count, truncated}) when the walk ends.
+            window.listTree = function(dirPath, maxDepth, maxEntries, onNodes) {
+                console.log('listTree called', dirPath, maxDepth, maxEntries);
+                return new Promise((resolve, reject) => {
+                    let jobId = null;
+                    const early = [];
+                    const handle = function(batch) {
+                        if (!batch.done) {
+                            if (onNodes) onNodes(batch.nodes);
+                            return;
+                        }
+                        unsubscribe();
+                        if (batch.error) {
+                            reject(new Error(batch.error));
+                        } else {
+                            resolve(batch);
+                        }
+                    };
+                    // Batches can arrive before the job id does
+                    const unsubscribe = window.onDataPush('treeNodes', function(batch) {
+                        if (jobId === null) {
+                            early.push(batch);
+                        } else if (batch.jobId === jobId) {
+                            handle(batch);
+                        }
+                    });
+                    window.fileSystemHandler.listTree(dirPath, maxDepth, maxEntries || 0, function(id) {
+                        jobId = id;
+                        early.filter(batch => batch.jobId === id).forEach(handle);
+                    });
+                });
+            };
+
+            // Search file contents, e.g. searchContents('src', 'TODO', {glob: '*.py', maxResults: 500}, onMatches).
+            // onMatches(matches, jobId) gets each batch; the promise resolves with the summary
+            window.searchContents = function(root, pattern, options, onMatches) {
+                console.log('searchContents called', root, pattern, options);
+                return new Promise((resolve, reject) => {
+                    let jobId = null;
+                    const early = [];
+                    const handle = function(batch) {
+                        if (!batch.done) {
+                            if (onMatches) onMatches(batch.matches, batch.jobId);
+                            return;
+                        }
+                        unsubscribe();
+                        if (batch.error) {
+                            reject(new Error(batch.error));
+                        } else {
+                            resolve(batch);
+                        }
+                    };
+                    // Batches can arrive before the job id does
+                    const unsubscribe = window.onDataPush('searchResults', function(batch) {
+                        if (jobId === null) {
+                            early.push(batch);
+                        } else if (batch.jobId === jobId) {
+                            handle(batch);
+                        }
+                    });
+                    window.fileSystemHandler.searchContents(root, pattern, JSON.stringify(options || {}), function(id) {
+                        if (!id) {
+                            unsubscribe();
+                            reject(new Error("Could not start search for " + pattern));
+                            return;
+                        }
+                        jobId = id;
+                        early.filter(batch => batch.jobId === id).forEach(handle);
+                    });
+                });
+            };
+
+            window.cancelSearch = function(jobId) {
+                window.fileSystemHandler.cancelSearch(jobId);
+            };
+
+            // Find files with identical content under root. onProgress(progress) gets the phase
+            // and counters, onGroups(groups) each batch of duplicate groups, largest waste first
+            window.findDuplicates = function(root, onProgress, onGroups) {
+                console.log('findDuplicates called', root);
+                return new Promise((resolve, reject) => {
+                    let jobId = null;
+                    const early = [];
+                    const handle = function(event) {
+                        if (!event.done) {
+                            if (event.groups.length) {
+                                if (onGroups) onGroups(event.groups);
+                            } else if (onProgress) {
+                                onProgress(event);
+                            }
+                            return;
+                        }
+                        unsubscribe();
+                        if (event.error) {
+                            reject(new Error(event.error));
+                        } else {
+                            resolve(event);
+                        }
+                    };
+                    // Events can arrive before the job id does
+                    const unsubscribe = window.onDataPush('duplicates', function(event) {
+                        if (jobId === null) {
+                            early.push(event);
+                        } else if (event.jobId === jobId) {
+                            handle(event);
+                        }
+                    });
+                    window.fileSystemHandler.findDuplicates(root, function(id) {
+                        jobId = id;
+                        early.filter(event => event.jobId === id).forEach(handle);
+                    });
+                });
+            };
+
+            window.cancelDuplicates = function(jobId) {
+                window.fileSystemHandler.cancelDuplicates(jobId);
+            };
+
+            // Turn a columnar listing into one object per entry where that is more convenient
+            window.listingRows = function(listing) {
+                const names = Object.keys(listing.columns);
+                const rows = [];
+                for (let i = 0; i < listing.count; i++) {
+                    const row = {};
+                    names.forEach(name => { row[name] = listing.columns[name][i]; });
+                    rows.push(row);
+                }
+                return rows;
+            };
+
             window.readFile = function(filePath) {
                 console.log('readFile called', filePath);
                 return new Promise((resolve, reject) => {
-                    window.readFileCallback = (content) => {
-                        resolve(content);
+                    if (!window.fileSystemHandler) {
+                        reject(new Error("File system handler is not available"));
+                        return;
+                    }
+                    // Other pages' reads arrive on the same topic; only this request's reply counts
+                    const requestId = window.newRequestId();
+                    const unsubscribe = window.onDataPush('fileRead', function(result) {
+                        if (result.requestId !== requestId) return;
+                        unsubscribe();
+                        if (result.error) {
+                            reject(new Error(result.error));
+                        } else {
+                            resolve(result.content);
+                        }
+                    });
+                    window.fileSystemHandler.readFile(filePath, requestId);
+                });
+            };
+
+            // Contents already read through readFileCached, by path, with their hashes
+            window.fileContentCache = window.fileContentCache || {};
+
+            // Read a text file, transferring the content only when it changed since the last read
+            window.readFileCached = function(filePath) {
+                console.log('readFileCached called', filePath);
+                return new Promise((resolve, reject) => {
+                    const known = window.fileContentCache[filePath];
+                    window.fileSystemHandler.readFileIfChanged(filePath, known ? known.hash : '', function(resultJson) {
+                        const result = JSON.parse(resultJson);
+                        if (result.error) {
+                            delete window.fileContentCache[filePath];
+                            reject(new Error(result.error));
+                        } else if (result.unchanged) {
+                            resolve(known.content);
+                        } else {
+                            window.fileContentCache[filePath] = { hash: result.hash, content: result.content };
+                            resolve(result.content);
+                        }
+                    });
+                });
+            };
+
+            // Read a file for editing: {content, hash, size, mtimeNs} of the bytes on disk,
+            // with CRLF line endings kept so offsets into content match the file
+            window.readFileForEdit = function(filePath) {
+                console.log('readFileForEdit called', filePath);
+                return new Promise((resolve, reject) => {
+                    window.fileSystemHandler.readFileForEdit(filePath, function(resultJson) {
+                        const result = JSON.parse(resultJson);
+                        if (result.error) {
+                            reject(new Error(result.error));
+                        } else {
+                            resolve(result);
+                        }
+                    });
+                });
+            };
+
+            // Apply edits ({offset, delete, insert} in UTF-8 byte offsets into the content
+            // from readFileForEdit) to a file. expect may hold expectedMtimeNs, expectedSize
+            // or expectedHash; a file that changed since rejects with an error whose
+            // conflict property is set
+            window.applyEdits = function(filePath, edits, expect) {
+                console.log('applyEdits called', filePath, edits.length);
+                return new Promise((resolve, reject) => {
+                    const handler = window.fileSystemHandler;
+                    if (!handler || !handler.applyEdits || !handler.editsApplied) {
+                        reject(new Error("applyEdits is not available"));
+                        return;
+                    }
+                    // One listener serves every edit; results are matched by edit id
+                    if (!window.pendingEdits) {
+                        window.pendingEdits = {};
+                        window.earlyEditResults = {};
+                        handler.editsApplied.connect(function(editId, resultJson) {
+                            const pending = window.pendingEdits[editId];
+                            if (pending) {
+                                delete window.pendingEdits[editId];
+                                pending(resultJson);
+                            } else {
+                                window.earlyEditResults[editId] = resultJson;
+                            }
+                        });
+                    }
+                    const settle = function(resultJson) {
+                        const result = JSON.parse(resultJson);
+                        delete window.fileContentCache[filePath];
+                        if (result.error) {
+                            const error = new Error(result.error);
+                            error.conflict = !!result.conflict;
+                            reject(error);
+                        } else {
+                            resolve(result);
+                        }
                     };
-                    window.fileSystemHandler.readFile(filePath);
+                    const request = Object.assign({ edits: edits }, expect || {});
+                    handler.applyEdits(filePath, JSON.stringify(request), function(editId) {
+                        if (editId in window.earlyEditResults) {
+                            const resultJson = window.earlyEditResults[editId];
+                            delete window.earlyEditResults[editId];
+                            settle(resultJson);
+                        } else {
+                            window.pendingEdits[editId] = settle;
+                        }
+                    });
+                });
+            };
+
+            window.readFileRange = function(filePath, offset, length, encoding) {
+                console.log('readFileRange called', filePath, offset, length);
+                return new Promise((resolve, reject) => {
+                    if (!window.fileSystemHandler || !window.fileSystemHandler.readFileRange) {
+                        reject(new Error("readFileRange is not available"));
+                        return;
+                    }
+                    // Empty encoding returns the raw bytes base64-encoded
+                    window.fileSystemHandler.readFileRange(filePath, offset, length, encoding || '', function(resultJson) {
+                        const result = JSON.parse(resultJson);
+                        if (result.error) {
+                            reject(new Error(result.error));
+                        } else {
+                            resolve(result);
+                        }
+                    });
                 });
             };
 
+            // Follow a growing file like tail -f. onData receives each batch of
+            // appended text ({data, offset, truncated, rotated}); fromOffset -1
+            // starts at the current end. Resolves to an object with stop().
+            window.followFile = function(filePath, fromOffset, onData) {
+                console.log('followFile called', filePath, fromOffset);
+                return new Promise((resolve, reject) => {
+                    // Batches may arrive before the follow id does; keep them until it is known
+                    let followId = null;
+                    const early = [];
+                    const unsubscribe = window.onDataPush('fileAppended', function(batch) {
+                        if (followId === null) {
+                            early.push(batch);
+                        } else if (batch.followId === followId) {
+                            onData(batch);
+                        }
+                    });
+                    const start = fromOffset === undefined ? -1 : fromOffset;
+                    window.fileSystemHandler.followFile(filePath, start, function(id) {
+                        if (!id) {
+                            unsubscribe();
+                            reject(new Error("Cannot follow " + filePath));
+                            return;
+                        }
+                        followId = id;
+                        early.filter(batch => batch.followId === id).forEach(onData);
+                        resolve({
+                            id: id,
+                            stop: function() {
+                                unsubscribe();
+                                window.fileSystemHandler.unfollowFile(id);
+                            }
+                        });
+                    });
+                });
+            };
+
+            // Read a window of lines, e.g. the visible part of a large file viewer
+            window.readFileLines = function(filePath, startLine, count, encoding) {
+                console.log('readFileLines called', filePath, startLine, count);
+                return new Promise((resolve, reject) => {
+                    window.fileSystemHandler.getLineOffsets(filePath, startLine, count, function(offsetsJson) {
+                        const index = JSON.parse(offsetsJson);
+                        if (index.error) {
+                            reject(new Error(index.error));
+                            return;
+                        }
+                        const start = index.offsets[0];
+                        const end = index.offsets[index.offsets.length - 1];
+                        window.readFileRange(filePath, start, end - start, encoding || 'utf-8').then(range => {
+                            const lines = range.data.split('\n');
+                            // The window's last line keeps its newline, leaving an empty tail
+                            if (lines.length > index.offsets.length - 1) lines.pop();
+                            resolve({lines: lines, startLine: index.start_line, lineCount: index.line_count});
+                        }, reject);
+                    });
+                });
+            };
+
+            // URL that streams a file under the home directory straight from disk,
+            // usable as an img/video src or a download link
+            window.getFileUrl = function(filePath) {
+                return 'woda-fs:///' + filePath.replace(/^\/+/, '').split('/').map(encodeURIComponent).join('/');
+            };
+
             window.executePython = function(code) {
                 console.log('executePython called', code);
                 return new Promise((resolve, reject) => {
@@ -407,9 +915,8 @@
                 },
                 
                 readFile: function(filePath, callback) {
-                    window.readFileCallback = callback;
                     if (typeof window.fileSystemHandler !== 'undefined') {
-                        window.fileSystemHandler.readFile(filePath);
+                        window.readFile(filePath).then(callback);
                     }
                 }
             };
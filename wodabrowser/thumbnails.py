@@ -0,0 +1,144 @@
+import hashlib
+import os
+import struct
+import threading
+import typing
+from PyQt6.QtCore import QObject, QRunnable, QSize, QThreadPool, QUrl, Qt, pyqtSignal
+from PyQt6.QtGui import QImageReader
+
+# Freedesktop thumbnail sizes by cache subdirectory
+THUMBNAIL_SIZES = {'normal': 128, 'large': 256}
+
+# Thumbnailing is decode-bound, so keep it off the filesystem worker pool
+THUMBNAIL_POOL_SIZE = 4
+
+
+def default_thumbnail_dir() -> str:
+    """The shared XDG thumbnail cache, e.g. ~/.cache/thumbnails."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'thumbnails')
+
+
+def thumbnail_path(thumbnail_dir: str, full_path: str, size_name: str) -> str:
+    """Where the thumbnail of a file lives: <size>/<md5 of its file URI>.png."""
+    uri = QUrl.fromLocalFile(os.path.abspath(full_path)).toString(QUrl.ComponentFormattingOption.FullyEncoded)
+    return os.path.join(thumbnail_dir, size_name, hashlib.md5(uri.encode('utf-8')).hexdigest() + '.png')
+
+
+def _png_text(path: str) -> typing.Dict[str, str]:
+    """Read the tEXt chunks that precede a PNG's image data.
+
+    QImageReader.text() splits keys at ':', so it cannot look up the
+    ``Thumb::`` keys; reading the chunks directly also skips the pixels.
+    """
+    text = {}
+    with open(path, 'rb') as f:
+        if f.read(8) != b'\x89PNG\r\n\x1a\n':
+            return text
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            length, chunk_type = struct.unpack('>I4s', header)
+            if chunk_type in (b'IDAT', b'IEND'):
+                break
+            data = f.read(length)
+            f.seek(4, os.SEEK_CUR)  # CRC
+            if chunk_type == b'tEXt' and b'\0' in data:
+                key, value = data.split(b'\0', 1)
+                text[key.decode('latin-1')] = value.decode('latin-1')
+    return text
+
+
+def _is_current(thumb_path: str, stat: os.stat_result) -> bool:
+    """Whether a cached thumbnail was made from a file with this mtime and size."""
+    try:
+        text = _png_text(thumb_path)
+    except OSError:
+        return False
+    return text.get('Thumb::MTime') == str(int(stat.st_mtime)) and text.get('Thumb::Size') == str(stat.st_size)
+
+
+def ensure_thumbnail(thumbnail_dir: str, full_path: str, size_name: str = 'normal') -> str:
+    """Return the path of an up-to-date thumbnail, generating it if needed.
+
+    The image is decoded at reduced scale where the format supports it
+    (JPEG decodes straight to the smaller size), oriented by its EXIF data
+    and written atomically, so concurrent readers never see a partial PNG.
+    Raises ValueError if the file cannot be read as an image.
+    """
+    stat = os.stat(full_path)
+    thumb_path = thumbnail_path(thumbnail_dir, full_path, size_name)
+    if _is_current(thumb_path, stat):
+        return thumb_path
+
+    max_size = THUMBNAIL_SIZES[size_name]
+    reader = QImageReader(full_path)
+    reader.setAutoTransform(True)
+    source_size = reader.size()
+    if source_size.isValid() and (source_size.width() > max_size or source_size.height() > max_size):
+        reader.setScaledSize(source_size.scaled(QSize(max_size, max_size), Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"Cannot read image {full_path}: {reader.errorString()}")
+    if image.width() > max_size or image.height() > max_size:
+        # Formats without scaled reads, or unknown source sizes, are scaled after decoding
+        image = image.scaled(max_size, max_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+    image.setText('Thumb::URI', QUrl.fromLocalFile(os.path.abspath(full_path)).toString(QUrl.ComponentFormattingOption.FullyEncoded))
+    image.setText('Thumb::MTime', str(int(stat.st_mtime)))
+    image.setText('Thumb::Size', str(stat.st_size))
+    os.makedirs(os.path.dirname(thumb_path), mode=0o700, exist_ok=True)
+    temp_path = f"{thumb_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if not image.save(temp_path, 'PNG'):
+        raise ValueError(f"Cannot write thumbnail {thumb_path}")
+    os.chmod(temp_path, 0o600)
+    os.replace(temp_path, thumb_path)
+    return thumb_path
+
+
+class ThumbnailTask(QRunnable):
+    """Generates one thumbnail on the service's pool."""
+
+    def __init__(self, service: 'ThumbnailService', request_id: int, full_path: str, size_name: str) -> None:
+        super().__init__()
+        self.service = service
+        self.request_id = request_id
+        self.full_path = full_path
+        self.size_name = size_name
+
+    def run(self) -> None:
+        try:
+            thumb_path = ensure_thumbnail(self.service.thumbnail_dir, self.full_path, self.size_name)
+        except Exception as e:
+            print(f"Error generating thumbnail for {self.full_path}: {str(e)}")
+            thumb_path = ''
+        self.service.thumbnailReady.emit(self.request_id, thumb_path)
+
+
+class ThumbnailService(QObject):
+    """Generates thumbnails on a thread pool and reports them by request id.
+
+    thumbnailReady(request_id, path) is emitted from the pool and so reaches
+    receivers on the GUI thread queued; the path is empty on failure.
+    """
+
+    thumbnailReady = pyqtSignal(int, str, name='thumbnailReady')
+
+    def __init__(self, thumbnail_dir: typing.Optional[str] = None, parent=None) -> None:
+        super().__init__(parent)
+        self.thumbnail_dir = thumbnail_dir or default_thumbnail_dir()
+        self._next_request_id = 0
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(THUMBNAIL_POOL_SIZE)
+
+    def request(self, full_path: str, size_name: str = 'normal') -> int:
+        """Queue a thumbnail and return the id its thumbnailReady will carry."""
+        if size_name not in THUMBNAIL_SIZES:
+            raise ValueError(f"Unknown thumbnail size: {size_name}")
+        self._next_request_id += 1
+        self._pool.start(ThumbnailTask(self, self._next_request_id, full_path, size_name))
+        return self._next_request_id
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
@@ -0,0 +1,113 @@
+import os
+import threading
+import typing
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from .directory_listing import entry_record
+except ImportError:
+    from directory_listing import entry_record
+
+# Directories of one level listed at the same time
+TREE_PARALLEL_DIRS = 8
+
+# Nodes per streamed batch
+TREE_BATCH_SIZE = 500
+
+
+class TreeListingJob:
+    """Lists a directory tree breadth first, down to a depth and entry limit.
+
+    All directories of a level are listed in parallel and their nodes are
+    handed to ``batch_callback`` in batches of up to TREE_BATCH_SIZE, level
+    by level, so the shallow part of the tree arrives first. Each node is a
+    listing entry plus its ``depth`` (1 for the children of the root) and
+    ``parent`` path. Symlinked directories are listed but not descended
+    into, and subdirectories that cannot be read are counted in ``errors``.
+    ``scandir`` may be replaced to walk other trees than the disk, e.g. archives.
+    """
+
+    def __init__(self, full_path: str, base_path: str, max_depth: int, max_entries: int,
+                 batch_callback: typing.Optional[typing.Callable[[typing.List[dict]], None]] = None) -> None:
+        self.full_path = os.path.normpath(full_path)
+        self.base_path = base_path
+        self.max_depth = max(1, max_depth)
+        self.max_entries = max(0, max_entries)
+        self.batch_callback = batch_callback
+        self.errors = 0
+        self._errors_lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self.scandir = os.scandir
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _list(self, full_path: str) -> typing.List[typing.Tuple[dict, bool, str]]:
+        """Return (entry, descend, full path) for each child of a directory."""
+        if self.cancelled:
+            return []
+        rel_dir = os.path.relpath(full_path, self.base_path)
+        children = []
+        try:
+            with self.scandir(full_path) as it:
+                for entry in it:
+                    try:
+                        children.append((entry_record(entry, rel_dir), entry.is_dir(follow_symlinks=False), entry.path))
+                    except OSError as e:
+                        print(f"Error processing entry {entry.name}: {e}")
+        except OSError as e:
+            if full_path == self.full_path:
+                raise
+            print(f"Error listing {full_path}: {e}")
+            with self._errors_lock:
+                self.errors += 1
+        return children
+
+    def run(self) -> dict:
+        """Walk the tree and return a summary: count, truncated, cancelled, errors."""
+        if self.scandir is os.scandir and not os.path.isdir(self.full_path):
+            raise NotADirectoryError(f"Not a directory: {self.full_path}")
+        count = 0
+        truncated = False
+        batch = []
+
+        def flush():
+            nonlocal batch
+            if batch and self.batch_callback:
+                self.batch_callback(batch)
+            batch = []
+
+        level = [self.full_path]
+        depth = 1
+        with ThreadPoolExecutor(max_workers=TREE_PARALLEL_DIRS) as executor:
+            while level and depth <= self.max_depth and not truncated:
+                next_level = []
+                # map yields in submission order, so the output does not depend on timing
+                for children in executor.map(self._list, level):
+                    if self.cancelled:
+                        break
+                    for record, descend, child_path in children:
+                        if count >= self.max_entries:
+                            truncated = True
+                            break
+                        record['depth'] = depth
+                        record['parent'] = os.path.dirname(record['path'])
+                        batch.append(record)
+                        count += 1
+                        if descend and depth < self.max_depth:
+                            next_level.append(child_path)
+                        if len(batch) >= TREE_BATCH_SIZE:
+                            flush()
+                    if truncated:
+                        # Leaving map cancels the listings still queued
+                        break
+                if self.cancelled:
+                    break
+                flush()
+                level = next_level
+                depth += 1
+        flush()
+        return {'count': count, 'truncated': truncated, 'cancelled': self.cancelled, 'errors': self.errors}
@@ -0,0 +1,67 @@
+import os
+import time
+import uuid
+
+
+class UploadSession:
+    """A chunked upload written straight to a temp file next to its target.
+
+    Chunks must arrive in order, but a chunk may be re-sent from any offset at
+    or before the bytes received so far, which is how a client resumes after
+    a failed chunk. ``commit`` renames the temp file over the target
+    atomically, so a partial upload never appears under the real name.
+    """
+
+    def __init__(self, dir_path: str, file_name: str, total_size: int) -> None:
+        self.upload_id = uuid.uuid4().hex
+        self.file_name = os.path.basename(file_name)
+        if not self.file_name or self.file_name in ('.', '..'):
+            raise ValueError(f"Invalid file name: {file_name}")
+        if not os.path.isdir(dir_path):
+            raise ValueError(f"Directory does not exist: {dir_path}")
+        self.dir_path = dir_path
+        self.target_path = os.path.join(dir_path, self.file_name)
+        self.temp_path = os.path.join(dir_path, f".{self.file_name}.{self.upload_id}.part")
+        self.total_size = total_size
+        self.received = 0
+        self.last_activity = time.monotonic()
+        # Create the temp file up front so a bad target directory fails at begin
+        open(self.temp_path, 'wb').close()
+
+    def append(self, offset: int, data: bytes) -> int:
+        """Write a chunk at offset and return the number of bytes received so far."""
+        if offset < 0 or offset > self.received:
+            raise ValueError(f"Chunk offset {offset} does not continue the upload at {self.received}")
+        if self.total_size >= 0 and offset + len(data) > self.total_size:
+            raise ValueError(f"Chunk at {offset} runs past the declared size {self.total_size}")
+        with open(self.temp_path, 'r+b') as f:
+            f.seek(offset)
+            f.write(data)
+        self.received = max(self.received, offset + len(data))
+        self.last_activity = time.monotonic()
+        return self.received
+
+    def commit(self) -> str:
+        """Move the completed upload into place and return its path."""
+        if self.total_size >= 0 and self.received != self.total_size:
+            raise ValueError(f"Upload incomplete: {self.received} of {self.total_size} bytes received")
+        # Drop anything past the last byte received in case a resend overshot
+        os.truncate(self.temp_path, self.received)
+        os.replace(self.temp_path, self.target_path)
+        return self.target_path
+
+    def abort(self) -> None:
+        """Discard the partial upload."""
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+    def status(self) -> dict:
+        """Return the upload's progress; ``received`` is where the next chunk must start."""
+        return {
+            'upload_id': self.upload_id,
+            'file_name': self.file_name,
+            'received': self.received,
+            'total': self.total_size
+        }
@@ -0,0 +1,190 @@
+import os
+import re
+import threading
+import time
+import typing
+
+MOUNTINFO_PATH = '/proc/self/mountinfo'
+
+# Seconds capacity figures stay fresh before a background refresh
+VOLUME_CACHE_TTL = 10.0
+
+# Seconds to wait for statvfs before reporting a mount as unresponsive
+STATVFS_TIMEOUT = 2.0
+
+NETWORK_FS_TYPES = {
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', '9p', 'afs', 'ceph', 'glusterfs',
+    'davfs', 'fuse.sshfs', 'fuse.rclone', 'fuse.s3fs', 'fuse.davfs2'
+}
+
+# Kernel and virtual filesystems that are not volumes a user would browse
+PSEUDO_FS_TYPES = {
+    'proc', 'sysfs', 'devtmpfs', 'devpts', 'tmpfs', 'ramfs', 'cgroup', 'cgroup2',
+    'securityfs', 'pstore', 'debugfs', 'tracefs', 'configfs', 'fusectl', 'mqueue',
+    'hugetlbfs', 'bpf', 'autofs', 'binfmt_misc', 'efivarfs', 'rpc_pipefs', 'nsfs',
+    'selinuxfs', 'squashfs', 'fuse.gvfsd-fuse', 'fuse.portal'
+}
+PSEUDO_MOUNT_PREFIXES = ('/proc', '/sys', '/dev', '/run/user', '/snap')
+
+_OCTAL_ESCAPE = re.compile(r'\\([0-7]{3})')
+
+
+def _unescape(field: str) -> str:
+    """Undo mountinfo's octal escapes for spaces, tabs, newlines and backslashes."""
+    return _OCTAL_ESCAPE.sub(lambda m: chr(int(m.group(1), 8)), field)
+
+
+def parse_mountinfo(text: str) -> typing.List[dict]:
+    """Parse /proc/<pid>/mountinfo into one dict per mount."""
+    mounts = []
+    for line in text.splitlines():
+        fields = line.split()
+        if '-' not in fields:
+            continue
+        separator = fields.index('-')
+        if separator < 6 or len(fields) < separator + 3:
+            continue
+        mounts.append({
+            'mount_id': int(fields[0]),
+            'device': fields[2],
+            'root': _unescape(fields[3]),
+            'mount_point': _unescape(fields[4]),
+            'read_only': 'ro' in fields[5].split(','),
+            'fs_type': fields[separator + 1],
+            'source': _unescape(fields[separator + 2])
+        })
+    return mounts
+
+
+def _is_removable_device(source: str) -> bool:
+    """Whether a block device (or the disk holding a partition) is marked removable."""
+    if not source.startswith('/dev/'):
+        return False
+    name = os.path.basename(os.path.realpath(source))
+    sys_path = os.path.realpath(os.path.join('/sys/class/block', name))
+    # A partition's directory sits inside its disk's, which holds the flag
+    for directory in (sys_path, os.path.dirname(sys_path)):
+        try:
+            with open(os.path.join(directory, 'removable')) as f:
+                return f.read().strip() == '1'
+        except OSError:
+            continue
+    return False
+
+
+def classify_mount(mount: dict) -> typing.Optional[str]:
+    """Return 'network', 'removable' or 'local', or None for pseudo filesystems."""
+    fs_type = mount['fs_type']
+    if fs_type in NETWORK_FS_TYPES or fs_type.split('.', 1)[0] in ('nfs', 'cifs'):
+        return 'network'
+    mount_point = mount['mount_point']
+    if fs_type in PSEUDO_FS_TYPES or any(
+            mount_point == prefix or mount_point.startswith(prefix + '/') for prefix in PSEUDO_MOUNT_PREFIXES):
+        return None
+    if mount_point.startswith(('/media/', '/run/media/')) or _is_removable_device(mount['source']):
+        return 'removable'
+    return 'local'
+
+
+def _capacity(stat: os.statvfs_result) -> dict:
+    return {
+        'total': stat.f_blocks * stat.f_frsize,
+        'free': stat.f_bfree * stat.f_frsize,
+        'available': stat.f_bavail * stat.f_frsize
+    }
+
+
+class VolumeMonitor:
+    """Mounted volumes with capacity figures cached for VOLUME_CACHE_TTL.
+
+    ``volumes`` only reads the mount table and the cache, so it never
+    touches a mount and cannot hang. ``refresh`` runs statvfs for every
+    volume, each in its own daemon thread with a timeout, so an
+    unresponsive network mount is reported as such instead of blocking.
+    A mount counts as unresponsive only once its own call has run past
+    the timeout; while that call is still stuck it is not queried again.
+    """
+
+    def __init__(self, mountinfo_path: str = MOUNTINFO_PATH, ttl: float = VOLUME_CACHE_TTL,
+                 statvfs_timeout: float = STATVFS_TIMEOUT) -> None:
+        self.mountinfo_path = mountinfo_path
+        self.ttl = ttl
+        self.statvfs_timeout = statvfs_timeout
+        self._lock = threading.Lock()
+        self._capacity = {}  # mount point -> (capacity dict, time taken)
+        self._pending = {}  # mount point -> start time of its statvfs call still running
+        self._refreshing = False
+
+    def _mounts(self) -> typing.List[dict]:
+        with open(self.mountinfo_path) as f:
+            mounts = parse_mountinfo(f.read())
+        volumes = {}
+        for mount in mounts:
+            kind = classify_mount(mount)
+            if kind is None:
+                continue
+            mount['kind'] = kind
+            # A later mount on the same point hides the earlier one
+            volumes[mount['mount_point']] = mount
+        return list(volumes.values())
+
+    def volumes(self) -> typing.List[dict]:
+        """Current volumes with their last known capacity (None if not known yet)."""
+        result = []
+        now = time.monotonic()
+        with self._lock:
+            for mount in self._mounts():
+                cached = self._capacity.get(mount['mount_point'])
+                mount['capacity'] = cached[0] if cached else None
+                mount['stale'] = cached is None or now - cached[1] > self.ttl
+                started = self._pending.get(mount['mount_point'])
+                mount['unresponsive'] = started is not None and now - started >= self.statvfs_timeout
+                result.append(mount)
+        return result
+
+    def needs_refresh(self) -> bool:
+        """Whether any capacity is missing or stale and no refresh is running."""
+        with self._lock:
+            if self._refreshing:
+                return False
+            pending = set(self._pending)
+        return any(volume['stale'] and volume['mount_point'] not in pending for volume in self.volumes())
+
+    def start_refresh(self) -> bool:
+        """Claim the refresh; returns False if one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+            return True
+
+    def refresh(self) -> typing.List[dict]:
+        """Update capacities of all volumes and return the volumes."""
+        self.start_refresh()
+        try:
+            threads = []
+            for volume in self.volumes():
+                mount_point = volume['mount_point']
+                with self._lock:
+                    if mount_point in self._pending:
+                        continue
+                    self._pending[mount_point] = time.monotonic()
+                thread = threading.Thread(target=self._stat, args=(mount_point,), daemon=True)
+                thread.start()
+                threads.append(thread)
+            deadline = time.monotonic() + self.statvfs_timeout
+            for thread in threads:
+                thread.join(max(0.0, deadline - time.monotonic()))
+        finally:
+            with self._lock:
+                self._refreshing = False
+        return self.volumes()
+
+    def _stat(self, mount_point: str) -> None:
+        try:
+            capacity = _capacity(os.statvfs(mount_point))
+        except OSError as e:
+            capacity = {'error': str(e)}
+        with self._lock:
+            self._capacity[mount_point] = (capacity, time.monotonic())
+            self._pending.pop(mount_point, None)